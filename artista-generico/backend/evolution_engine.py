@@ -1,11 +1,19 @@
 import random
 import copy
+import heapq
+import time
 from typing import List, Tuple
 
+import numpy as np
 from PIL import Image
 
 from artwork import Artwork, Polygon
+from fitness_cache import FitnessCache
 import image_processor
+from evolution_core import GeneticAlgorithm, evaluate_batched, make_executor
+from instrumentation import timed, rate
+
+GENERATION_RATE = rate("generations_per_second", "Gerações por segundo")
 
 # --- Constantes do Algoritmo Genético ---
 POPULATION_SIZE = 20
@@ -19,6 +27,25 @@ REMOVE_POLYGON_RATE = 0.02
 MUTATE_COLOR_RATE = 0.1
 MUTATE_VERTICES_RATE = 0.1
 
+# Elitismo e seleção dos pais vêm do núcleo compartilhado: os 2 melhores são
+# mantidos e os pais são sorteados entre a melhor metade da população.
+# Crossover e mutação continuam aqui, pois atuam sobre listas de polígonos
+# de tamanho variável e não sobre uma matriz de genomas.
+genetic_algorithm = GeneticAlgorithm(elite_count=2, selection="truncation", truncation_fraction=0.5)
+
+# Remove do genoma de cada filho os polígonos que não aparecem na imagem (fora
+# da tela ou cobertos, veja image_processor.prepare_render). Desligado por
+# padrão: um polígono coberto ainda pode voltar a aparecer após mutações.
+PRUNE_DEAD_GENES = False
+
+# Avalia as obras bloco a bloco e interrompe a comparação das que já não podem
+# ser selecionadas (veja TiledArtworkFitness). A seleção é a mesma da avaliação
+# completa, mas a fitness das obras rejeitadas é só um limite superior, o que
+# eleva a fitness média informada. Desligado por padrão: os vértices podem
+# estar em qualquer ponto da tela, então quase todo filho muda todos os blocos
+# e fica a poucos % do limiar; ~99% dos pixels ainda são comparados.
+EARLY_REJECTION = False
+
 # --- Funções de Criação ---
 
 def create_random_polygon(width: int, height: int) -> Polygon:
@@ -93,40 +120,164 @@ def mutate(artwork: Artwork, width: int, height: int) -> Artwork:
 
     return mutated_artwork
 
+def prune_dead_genes(artwork: Artwork, width: int, height: int) -> int:
+    """Remove da obra os polígonos que não alteram a imagem renderizada.
+    Retorna quantos foram removidos."""
+    culled = image_processor.prepare_render(artwork, width, height).culled
+    for i, _ in reversed(culled):
+        artwork.polygons.pop(i)
+    return len(culled)
+
+# --- Avaliação ---
+
+class ArtworkFitness:
+    """Avaliador em lote: renderiza cada obra e a compara com a imagem alvo.
+    Pode ser enviado a processos de trabalho (é serializável)."""
+    def __init__(self, target_image: Image.Image):
+        self.target_image = target_image
+
+    def __call__(self, artworks: List[Artwork]) -> List[float]:
+        width, height = self.target_image.size
+        return [
+            image_processor.calculate_fitness(image_processor.render_artwork(artwork, width, height), self.target_image)
+            for artwork in artworks
+        ]
+
+class TiledArtworkFitness:
+    """Avaliador em lote com rejeição antecipada.
+
+    Cada obra é comparada com a obra de referência (a melhor da geração
+    anterior, da qual a população descende): só os blocos que ela pode ter
+    mudado são comparados com o alvo, do maior para o menor erro da
+    referência; os demais têm o erro dos blocos da referência.
+
+    Só as `keep` obras mais aptas da população podem ser selecionadas. A
+    comparação para quando o erro parcial passa do erro da `keep`-ésima melhor
+    obra já conhecida no lote (ou em `known_fitness`, a fitness das obras que
+    não precisam ser avaliadas): essas `keep` obras são todas melhores, então a
+    obra rejeitada não seria selecionada de qualquer forma.
+
+    Devolve, por obra, (fitness, fração dos pixels comparados, rejeitada); a
+    fitness de uma obra rejeitada é o limite superior dado pelo erro parcial.
+    """
+    def __init__(self, target_image: Image.Image, keep: int, reference: Artwork = None,
+                 known_fitness: List[float] = ()):
+        self.target_image = target_image
+        self.keep = keep
+        self.reference = reference
+        self.known_fitness = list(known_fitness)
+
+    def __call__(self, artworks: List[Artwork]) -> List[Tuple[float, float, bool]]:
+        width, height = self.target_image.size
+        scorer = image_processor.TileScorer(self.target_image)
+        if self.reference is not None:
+            reference_errors = scorer.tile_errors(image_processor.render_artwork(self.reference, width, height))
+        # Os `keep` menores erros conhecidos, como heap de máximo (valores negados)
+        best = [-e for e in sorted(scorer.error(f) for f in self.known_fitness)[:self.keep]]
+        heapq.heapify(best)
+
+        results = []
+        for artwork in artworks:
+            image = image_processor.render_artwork(artwork, width, height)
+            if self.reference is None:
+                tiles, base_error = np.arange(scorer.rows * scorer.cols), 0
+            else:
+                changed = scorer.changed_tiles(self.reference, artwork)
+                tiles = np.flatnonzero(changed)
+                tiles = tiles[np.argsort(-reference_errors[tiles], kind="stable")]
+                base_error = int(reference_errors[~changed].sum())
+            threshold = -best[0] if len(best) >= self.keep else np.inf
+            error, pixels, complete = scorer.score(image, tiles, base_error, threshold)
+            results.append((scorer.fitness(error), pixels / (width * height), not complete))
+            if not complete:
+                continue
+            if len(best) < self.keep:
+                heapq.heappush(best, -error)
+            elif error < -best[0]:
+                heapq.heapreplace(best, -error)
+        return results
+
+def selection_size(population_size: int) -> int:
+    """Quantas das obras mais aptas podem ser escolhidas como elite ou pais."""
+    if genetic_algorithm.selection != "truncation":
+        return population_size # No torneio, qualquer obra pode ganhar
+    return max(genetic_algorithm.elite_count, 1, int(population_size * genetic_algorithm.truncation_fraction))
+
+def evaluate_population(population: List[Artwork], target_image: Image.Image, executor=None,
+                        cache: FitnessCache = None, early_rejection: bool = False) -> np.ndarray:
+    """Fitness de cada obra, avaliada em lotes pelo executor (serial, threads ou processos).
+    Com um cache, só as obras com genoma ainda não visto são renderizadas.
+    Com `early_rejection`, usa TiledArtworkFitness; as obras rejeitadas não entram no cache."""
+    if cache is not None:
+        cache.set_target(target_image)
+        keys, fitness, pending = cache.lookup(population)
+    else:
+        fitness, pending = np.full(len(population), np.nan), list(range(len(population)))
+
+    rejected = np.zeros(len(population), dtype=bool)
+    if pending:
+        start = time.perf_counter()
+        artworks = [population[i] for i in pending]
+        if early_rejection:
+            known = fitness[~np.isnan(fitness)].tolist()
+            # Depois da primeira geração, a primeira obra é a melhor da anterior (elite), da qual as outras descendem
+            fitness_fn = TiledArtworkFitness(target_image, selection_size(len(population)), population[0], known)
+            scores = evaluate_batched(fitness_fn, artworks, executor)
+            fitness[pending], rejected[pending] = scores[:, 0], scores[:, 2] > 0
+            image_processor.score_stats.record(scores[:, 1], rejected[pending])
+        else:
+            fitness[pending] = evaluate_batched(ArtworkFitness(target_image), artworks, executor)
+        if cache is None:
+            return fitness
+        cache.record_evaluations(len(pending), time.perf_counter() - start)
+        for i in pending:
+            if not rejected[i]:
+                cache.put(keys[i], float(fitness[i]))
+
+    # Cópias de obras avaliadas nesta mesma geração
+    evaluated = {keys[i]: fitness[i] for i in pending}
+    for i in np.flatnonzero(np.isnan(fitness)):
+        fitness[i] = evaluated[keys[i]]
+    return fitness
+
 # --- Loop Principal da Geração ---
 
-def run_generation(population: List[Artwork], target_image: Image.Image) -> Tuple[List[Artwork], List[float]]:
-    """Executa um ciclo de geração completo: avaliação, seleção, crossover, mutação."""
+@timed("evolve")
+def run_generation(population: List[Artwork], target_image: Image.Image, executor=None,
+                   cache: FitnessCache = None, prune: bool = None,
+                   early_rejection: bool = None) -> Tuple[List[Artwork], List[float]]:
+    """Executa um ciclo de geração completo: avaliação, seleção, crossover, mutação.
+    Com `prune` (padrão: PRUNE_DEAD_GENES), os genes mortos dos filhos são removidos.
+    Com `early_rejection` (padrão: EARLY_REJECTION), as obras que não podem ser
+    selecionadas não são comparadas até o fim."""
     width, height = target_image.size
+    if prune is None:
+        prune = PRUNE_DEAD_GENES
+    if early_rejection is None:
+        early_rejection = EARLY_REJECTION
 
     # 1. Avaliação (Calcular Fitness)
-    fitness_scores = []
-    for artwork in population:
-        rendered_image = image_processor.render_artwork(artwork, width, height)
-        fitness = image_processor.calculate_fitness(rendered_image, target_image)
-        fitness_scores.append(fitness)
-
-    # Emparelha cada obra com sua pontuação
-    population_with_fitness = list(zip(population, fitness_scores))
-
-    # Ordena por fitness (maior primeiro)
-    population_with_fitness.sort(key=lambda x: x[1], reverse=True)
+    if cache is not None:
+        cache.start_generation()
+    image_processor.render_stats.start_generation()
+    image_processor.score_stats.start_generation()
+    fitness_scores = evaluate_population(population, target_image, executor, cache, early_rejection)
 
     # 2. Seleção (Elitismo + Pais)
-    new_population = []
     # Mantém os 2 melhores indivíduos (elitismo)
-    new_population.append(copy.deepcopy(population_with_fitness[0][0]))
-    new_population.append(copy.deepcopy(population_with_fitness[1][0]))
+    new_population = [copy.deepcopy(population[i]) for i in genetic_algorithm.elite(fitness_scores)]
 
-    # Seleciona os pais do resto da população para preencher o restante
-    parents = [item[0] for item in population_with_fitness[:len(population_with_fitness)//2]]
+    # Sorteia um par de pais para cada filho
+    num_children = max(0, POPULATION_SIZE - len(new_population))
+    parents = genetic_algorithm.select(fitness_scores, 2 * num_children)
 
     # 3. Crossover e Mutação
-    while len(new_population) < POPULATION_SIZE:
-        parent1 = random.choice(parents)
-        parent2 = random.choice(parents)
-        child = crossover(parent1, parent2)
+    for i, j in zip(parents[:num_children], parents[num_children:]):
+        child = crossover(population[i], population[j])
         mutated_child = mutate(child, width, height)
+        if prune:
+            image_processor.render_stats.record_pruned(prune_dead_genes(mutated_child, width, height))
         new_population.append(mutated_child)
 
-    return new_population, fitness_scores
\ No newline at end of file
+    GENERATION_RATE.tick()
+    return new_population, fitness_scores.tolist()
@@ -0,0 +1,120 @@
+import hashlib
+from collections import OrderedDict
+from typing import List, Optional
+
+import numpy as np
+from PIL import Image
+
+from artwork import Artwork
+
+def genome_key(artwork: Artwork) -> bytes:
+    """Hash do conteúdo do genoma: número de vértices, cor e vértices de cada
+    polígono, na ordem de desenho. Obras iguais têm a mesma chave mesmo sendo
+    cópias (deepcopy) diferentes."""
+    values = []
+    for p in artwork.polygons:
+        values.append(len(p.vertices))
+        values.extend(p.color)
+        for x, y in p.vertices:
+            values.append(x)
+            values.append(y)
+    return hashlib.blake2b(np.array(values, dtype=np.int32).tobytes(), digest_size=16).digest()
+
+def target_key(target_image: Image.Image) -> bytes:
+    """Identifica a imagem alvo e a resolução: a fitness só vale para esse par."""
+    digest = hashlib.blake2b(target_image.tobytes(), digest_size=16)
+    digest.update(f"{target_image.size}{target_image.mode}".encode())
+    return digest.digest()
+
+class FitnessCache:
+    """Cache LRU de fitness indexado pelo conteúdo do genoma.
+
+    Elites copiados para a próxima geração e filhos idênticos (por exemplo,
+    crossover de pais iguais sem mutação) não são renderizados de novo.
+    Trocar a imagem alvo ou a resolução esvazia o cache.
+    """
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.target = None
+        self.target_id = None
+        # Tempo médio de uma avaliação, usado para estimar o tempo economizado
+        self.seconds_per_evaluation = 0.0
+        self.evaluations = 0
+        self.hits = self.misses = 0
+        self.saved_seconds = 0.0
+        self.start_generation()
+
+    def set_target(self, target_image: Image.Image):
+        # O hash da imagem só é recalculado quando o objeto alvo muda
+        if target_image is self.target_id:
+            return
+        key = target_key(target_image)
+        if key != self.target:
+            self.entries.clear()
+            self.target = key
+        self.target_id = target_image
+
+    def start_generation(self):
+        self.generation_hits = self.generation_misses = 0
+        self.generation_saved_seconds = 0.0
+
+    def count_hit(self):
+        self.hits += 1
+        self.generation_hits += 1
+        self.saved_seconds += self.seconds_per_evaluation
+        self.generation_saved_seconds += self.seconds_per_evaluation
+
+    def get(self, key: bytes) -> Optional[float]:
+        fitness = self.entries.get(key)
+        if fitness is None:
+            self.misses += 1
+            self.generation_misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.count_hit()
+        return fitness
+
+    def put(self, key: bytes, fitness: float):
+        self.entries[key] = fitness
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def record_evaluations(self, count: int, seconds: float):
+        """Atualiza o custo médio de uma avaliação (renderização + comparação)."""
+        if count:
+            total = self.seconds_per_evaluation * self.evaluations + seconds
+            self.evaluations += count
+            self.seconds_per_evaluation = total / self.evaluations
+
+    def stats(self) -> dict:
+        lookups = self.generation_hits + self.generation_misses
+        total_lookups = self.hits + self.misses
+        return {
+            "hits": self.generation_hits,
+            "misses": self.generation_misses,
+            "hit_rate": self.generation_hits / lookups if lookups else 0.0,
+            "saved_seconds": self.generation_saved_seconds,
+            "total_hit_rate": self.hits / total_lookups if total_lookups else 0.0,
+            "total_saved_seconds": self.saved_seconds,
+            "size": len(self.entries)
+        }
+
+    def lookup(self, population: List[Artwork]):
+        """Chaves de cada obra, fitness já conhecida (NaN se não) e os índices
+        das obras a avaliar, sem repetir genomas iguais."""
+        keys = [genome_key(artwork) for artwork in population]
+        fitness = np.full(len(population), np.nan)
+        pending = {}
+        for i, key in enumerate(keys):
+            if key in pending:
+                # Igual a outra obra ainda não avaliada nesta geração
+                self.count_hit()
+                continue
+            cached = self.get(key)
+            if cached is None:
+                pending[key] = i
+            else:
+                fitness[i] = cached
+        return keys, fitness, list(pending.values())
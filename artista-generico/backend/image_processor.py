@@ -1,7 +1,12 @@
+import threading
+import time
+from typing import List, NamedTuple, Tuple
+
 import numpy as np
 from PIL import Image, ImageDraw
 
-from artwork import Artwork
+from artwork import Artwork, Polygon
+from instrumentation import timed
 
 # Carrega a imagem alvo e a converte para um formato que facilita a comparação
 target_image_cache = None
@@ -13,19 +18,213 @@ def load_target_image(path: str) -> Image.Image:
         target_image_cache = Image.open(path).convert("RGBA")
     return target_image_cache
 
-def render_artwork(artwork: Artwork, width: int, height: int) -> Image.Image:
-    """Renderiza uma obra de arte em uma nova imagem Pillow."""
+# --- Preparação da renderização (culling) ---
+
+# Polígonos com alfa abaixo disso não são desenhados. 0 desliga: o Pillow não
+# mistura cores ao desenhar numa imagem RGBA, o pixel recebe a cor e o alfa do
+# polígono, então mesmo um polígono com alfa 0 altera a imagem comparada.
+MIN_ALPHA = 0
+# Polígonos com área (fórmula do laço) abaixo disso não são desenhados. 0 desliga:
+# o Pillow ainda pinta a borda de um polígono de área zero (uma linha de pixels),
+# então descartá-los é uma aproximação.
+MIN_AREA = 0.0
+# Motivos de descarte, na ordem em que são testados
+CULL_REASONS = ("transparent", "off_canvas", "degenerate", "covered")
+
+class RenderPlan(NamedTuple):
+    """Resultado da preparação: o que desenhar, em ordem, e o que foi descartado."""
+    drawable: List[Polygon]
+    culled: List[Tuple[int, str]] # (índice do polígono, motivo)
+
+def polygon_bounds(artwork: Artwork):
+    """Caixa delimitadora (cantos mínimo e máximo, arrays (n, 2)) e área de cada
+    polígono, calculadas de uma vez sobre todos os vértices da obra. A área
+    usa a fórmula do laço (shoelace)."""
+    counts = np.array([len(p.vertices) for p in artwork.polygons])
+    coords = np.array([v for p in artwork.polygons for v in p.vertices], dtype=np.int64)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    lo = np.minimum.reduceat(coords, starts)
+    hi = np.maximum.reduceat(coords, starts)
+
+    # Vértice seguinte de cada vértice, voltando ao primeiro do mesmo polígono
+    following = np.arange(1, len(coords) + 1)
+    following[starts + counts - 1] = starts
+    x, y = coords[:, 0], coords[:, 1]
+    area = np.abs(np.add.reduceat(x * y[following] - x[following] * y, starts)) / 2
+    return lo, hi, area
+
+def convex_edges(vertices):
+    """Arestas (x, y, dx, dy) orientadas para que o interior fique à esquerda,
+    se o polígono for convexo; None caso contrário (inclui estrelas e polígonos
+    que se cruzam)."""
+    n = len(vertices)
+    edges = []
+    orientation = 0
+    for i in range(n):
+        (x1, y1), (x2, y2) = vertices[i], vertices[(i + 1) % n]
+        dx, dy = x2 - x1, y2 - y1
+        if dx == 0 and dy == 0:
+            return None
+        for j in range(n):
+            cross = dx * (vertices[j][1] - y1) - dy * (vertices[j][0] - x1)
+            if cross == 0:
+                continue
+            sign = 1 if cross > 0 else -1
+            if orientation == 0:
+                orientation = sign
+            elif sign != orientation:
+                return None
+        edges.append((x1, y1, dx, dy))
+    if orientation == 0:
+        return None
+    return [(x, y, dx * orientation, dy * orientation) for x, y, dx, dy in edges]
+
+def contains_rect(edges, lo, hi) -> bool:
+    """Se o polígono convexo contém estritamente o retângulo [lo, hi]."""
+    for px, py in ((lo[0], lo[1]), (hi[0], lo[1]), (lo[0], hi[1]), (hi[0], hi[1])):
+        for x, y, dx, dy in edges:
+            if dx * (py - y) - dy * (px - x) <= 0:
+                return False
+    return True
+
+def prepare_render(artwork: Artwork, width: int, height: int,
+                   min_alpha: int = MIN_ALPHA, min_area: float = MIN_AREA) -> RenderPlan:
+    """Decide quais polígonos precisam ser desenhados.
+
+    São descartados os que não podem alterar a imagem: todos fora da tela ou
+    cobertos por um polígono convexo desenhado depois deles (cada polígono
+    sobrescreve os pixels que pinta). Os limites de alfa e de área, se
+    ligados, descartam também polígonos que contribuem pouco.
+    """
+    polygons = artwork.polygons
+    n = len(polygons)
+    if n == 0:
+        return RenderPlan([], [])
+    lo, hi, area = polygon_bounds(artwork)
+    alpha = np.array([p.color[3] for p in polygons])
+
+    # Índice do motivo de descarte em CULL_REASONS, -1 = desenhar. Atribuídos
+    # do menos ao mais prioritário, para que o primeiro motivo da lista prevaleça.
+    reason = np.full(n, -1)
+    reason[area < min_area] = CULL_REASONS.index("degenerate")
+    reason[(lo >= (width, height)).any(axis=1) | (hi < 0).any(axis=1)] = CULL_REASONS.index("off_canvas")
+    reason[alpha < min_alpha] = CULL_REASONS.index("transparent")
+
+    # Pixels que cada polígono pode pintar: a caixa recortada à tela e aumentada
+    # em um pixel, para não depender de como o Pillow trata pixels na borda.
+    # Candidatos a cobri-la: polígonos desenhados depois cuja caixa a contém.
+    rect_lo = np.maximum(lo - 1, 0)
+    rect_hi = np.minimum(hi + 1, (width - 1, height - 1))
+    drawn = reason < 0
+    candidates = ((rect_lo[:, None, 0] > lo[None, :, 0]) & (rect_lo[:, None, 1] > lo[None, :, 1])
+                  & (rect_hi[:, None, 0] < hi[None, :, 0]) & (rect_hi[:, None, 1] < hi[None, :, 1]))
+    candidates &= np.triu(drawn[:, None] & drawn[None, :], 1)
+
+    # Só os candidatos passam pelo teste exato contra as arestas do polígono convexo
+    edges = {}
+    covered = set()
+    rect_lo, rect_hi = rect_lo.tolist(), rect_hi.tolist()
+    for i, j in zip(*np.nonzero(candidates)):
+        i, j = int(i), int(j)
+        if i in covered:
+            continue
+        if j not in edges:
+            edges[j] = convex_edges(polygons[j].vertices)
+        if edges[j] is not None and contains_rect(edges[j], rect_lo[i], rect_hi[i]):
+            covered.add(i)
+    reason[list(covered)] = CULL_REASONS.index("covered")
+
+    drawable = [polygons[i] for i in np.flatnonzero(reason < 0)]
+    culled = [(int(i), CULL_REASONS[reason[i]]) for i in np.flatnonzero(reason >= 0)]
+    return RenderPlan(drawable, culled)
+
+class RenderStats:
+    """Contagem de polígonos descartados (na renderização ou podados do
+    genoma) e estimativa do tempo de desenho economizado: descartados x tempo
+    médio de desenho de um polígono. O custo da própria preparação aparece
+    em "prepare_seconds", para comparar com o que ela economiza.
+
+    Só conta renderizações feitas neste processo: com o executor de processos,
+    as dos trabalhadores não aparecem aqui.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.drawn = 0
+        self.draw_seconds = 0.0
+        self.start_generation()
+
+    def start_generation(self):
+        with self.lock:
+            self.renders = 0
+            self.polygons = 0
+            self.culled = dict.fromkeys(CULL_REASONS, 0)
+            self.pruned = 0
+            self.prepare_seconds = 0.0
+
+    def record(self, polygons: int, plan: RenderPlan, prepare_seconds: float, draw_seconds: float):
+        with self.lock:
+            self.renders += 1
+            self.polygons += polygons
+            if plan is not None:
+                for _, reason in plan.culled:
+                    self.culled[reason] += 1
+            self.prepare_seconds += prepare_seconds
+            self.drawn += polygons if plan is None else len(plan.drawable)
+            self.draw_seconds += draw_seconds
+
+    def record_pruned(self, count: int):
+        with self.lock:
+            self.pruned += count
+
+    def stats(self) -> dict:
+        with self.lock:
+            culled = sum(self.culled.values())
+            seconds_per_polygon = self.draw_seconds / self.drawn if self.drawn else 0.0
+            return {
+                "renders": self.renders,
+                "polygons": self.polygons,
+                "culled": culled,
+                "culled_by_reason": dict(self.culled),
+                "pruned": self.pruned,
+                "prepare_seconds": self.prepare_seconds,
+                "saved_seconds": (culled + self.pruned) * seconds_per_polygon
+            }
+
+render_stats = RenderStats()
+
+# Se render_artwork passa pela preparação. Desligado por padrão: com os polígonos
+# aleatórios do artista quase nenhum é descartável e, na resolução do alvo
+# (128x128), o Pillow desenha um polígono em ~10 µs, menos do que a preparação
+# custa por polígono.
+CULL_POLYGONS = False
+
+@timed("render")
+def render_artwork(artwork: Artwork, width: int, height: int, cull: bool = None) -> Image.Image:
+    """Renderiza uma obra de arte em uma nova imagem Pillow.
+    Com `cull` (padrão: CULL_POLYGONS), só desenha os polígonos que prepare_render mantém."""
     # Cria uma imagem em branco com fundo preto
     image = Image.new("RGBA", (width, height), (0, 0, 0, 255))
     draw = ImageDraw.Draw(image, "RGBA")
 
-    for p in artwork.polygons:
+    if cull is None:
+        cull = CULL_POLYGONS
+    start = time.perf_counter()
+    plan = None
+    polygons = artwork.polygons
+    if cull:
+        plan = prepare_render(artwork, width, height)
+        polygons = plan.drawable
+    prepared = time.perf_counter()
+
+    for p in polygons:
         # O método polygon do Pillow precisa de uma lista simples de coordenadas, ex: [x1, y1, x2, y2, ...]
         flat_vertices = [coord for vertex in p.vertices for coord in vertex]
         draw.polygon(flat_vertices, fill=p.color)
-    
+    render_stats.record(len(artwork.polygons), plan, prepared - start, time.perf_counter() - prepared)
+
     return image
 
+@timed("fitness")
 def calculate_fitness(rendered_image: Image.Image, target_image: Image.Image) -> float:
     """
     Calcula a fitness comparando duas imagens.
@@ -42,4 +241,127 @@ def calculate_fitness(rendered_image: Image.Image, target_image: Image.Image) ->
     # A fitness é o inverso do erro. Adicionamos 1 para evitar divisão por zero.
     fitness = 1.0 / (1.0 + mse)
 
-    return fitness
\ No newline at end of file
+    return fitness
+
+# --- Avaliação por blocos com rejeição antecipada ---
+
+# Lado, em pixels, dos blocos em que a imagem é comparada
+TILE_SIZE = 16
+# Os blocos são comparados em até este número de etapas; a rejeição é testada
+# entre elas. Testar bloco a bloco custaria mais em chamadas ao NumPy do que
+# a comparação de um bloco de 16x16.
+TILE_STEPS = 8
+
+class TileScorer:
+    """Erro quadrático da imagem renderizada em relação ao alvo, somado bloco a
+    bloco e interrompido assim que passa de um limite.
+
+    O alvo é dividido em blocos uma só vez. A soma é feita em inteiros, então o
+    erro não depende da ordem dos blocos nem de quais foram comparados de novo.
+    Lados que não são múltiplos de `tile_size` são completados com zeros nas
+    duas imagens (erro zero).
+    """
+    def __init__(self, target_image: Image.Image, tile_size: int = TILE_SIZE, steps: int = TILE_STEPS):
+        self.width, self.height = target_image.size
+        self.tile_size = tile_size
+        self.rows = -(-self.height // tile_size)
+        self.cols = -(-self.width // tile_size)
+        self.steps = steps
+        self.target = self.tiles(np.asarray(target_image.convert("RGBA"))).astype(np.int32)
+        # Pixels reais (sem o preenchimento) de cada bloco
+        tile_heights = np.minimum(tile_size, self.height - np.arange(self.rows) * tile_size)
+        tile_widths = np.minimum(tile_size, self.width - np.arange(self.cols) * tile_size)
+        self.tile_pixels = np.outer(tile_heights, tile_widths).ravel()
+
+    def tiles(self, array: np.ndarray) -> np.ndarray:
+        """Array (linhas, colunas, lado, lado, canais) com os blocos da imagem."""
+        size = self.tile_size
+        pad_y, pad_x = self.rows * size - self.height, self.cols * size - self.width
+        if pad_y or pad_x:
+            array = np.pad(array, ((0, pad_y), (0, pad_x), (0, 0)))
+        return array.reshape(self.rows, size, self.cols, size, -1).swapaxes(1, 2)
+
+    def tile_errors(self, image: Image.Image) -> np.ndarray:
+        """Erro quadrático de cada bloco, em ordem de linha."""
+        diff = self.tiles(np.asarray(image)).astype(np.int32) - self.target
+        return np.einsum("rcyxk,rcyxk->rc", diff, diff, dtype=np.int64).ravel()
+
+    def changed_tiles(self, reference: Artwork, artwork: Artwork) -> np.ndarray:
+        """Máscara dos blocos em que a imagem de `artwork` pode diferir da de
+        `reference`: os que tocam a caixa (aumentada em um pixel) de algum
+        polígono que difere entre as duas, na mesma posição da ordem de
+        desenho. Fora dessas caixas, os dois pixels recebem os mesmos
+        polígonos na mesma ordem e são iguais."""
+        common = min(len(reference.polygons), len(artwork.polygons))
+        changed = [p for a, b in zip(reference.polygons, artwork.polygons)
+                   if a.color != b.color or a.vertices != b.vertices for p in (a, b)]
+        changed += reference.polygons[common:] + artwork.polygons[common:]
+        mask = np.zeros((self.rows, self.cols), dtype=bool)
+        size = self.tile_size
+        for p in changed:
+            xs = [x for x, _ in p.vertices]
+            ys = [y for _, y in p.vertices]
+            x0, x1 = max(min(xs) - 1, 0) // size, min(max(xs) + 1, self.width - 1) // size
+            y0, y1 = max(min(ys) - 1, 0) // size, min(max(ys) + 1, self.height - 1) // size
+            if x0 > x1 or y0 > y1:
+                continue # Fora da tela
+            mask[y0:y1 + 1, x0:x1 + 1] = True
+            if mask.all():
+                break # Todos os blocos já mudaram
+        return mask.ravel()
+
+    def score(self, image: Image.Image, tiles: np.ndarray, base_error: int = 0,
+              max_error: float = np.inf) -> Tuple[int, int, bool]:
+        """Soma a `base_error` (o erro, já conhecido, dos blocos não listados) o
+        erro dos blocos `tiles`, na ordem dada, em até `steps` etapas.
+        Devolve (erro, pixels comparados, completo). Se a soma parcial passar
+        de `max_error`, a comparação para e o erro devolvido é só um limite
+        inferior do erro real."""
+        image_tiles = self.tiles(np.asarray(image))
+        rows, cols = np.divmod(tiles, self.cols)
+        error, pixels = base_error, 0
+        chunks = np.array_split(np.arange(len(tiles)), min(self.steps, len(tiles)) or 1)
+        for step, chunk in enumerate(chunks):
+            diff = image_tiles[rows[chunk], cols[chunk]].astype(np.int32) - self.target[rows[chunk], cols[chunk]]
+            error += int(np.einsum("tyxk,tyxk->", diff, diff, dtype=np.int64))
+            pixels += int(self.tile_pixels[tiles[chunk]].sum())
+            if error > max_error and step < len(chunks) - 1:
+                return error, pixels, False
+        return error, pixels, True
+
+    def fitness(self, error: float) -> float:
+        """A mesma fórmula de calculate_fitness."""
+        return 1.0 / (1.0 + error / (self.width * self.height))
+
+    def error(self, fitness: float) -> float:
+        """Inverso de `fitness`."""
+        return (1.0 / fitness - 1.0) * self.width * self.height
+
+class ScoreStats:
+    """Quantas avaliações foram interrompidas e a fração média dos pixels
+    comparados por candidato, na geração atual."""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.start_generation()
+
+    def start_generation(self):
+        with self.lock:
+            self.candidates = 0
+            self.rejected = 0
+            self.evaluated_fraction = 0.0
+
+    def record(self, evaluated_fractions, rejected):
+        with self.lock:
+            self.candidates += len(evaluated_fractions)
+            self.rejected += int(np.sum(rejected))
+            self.evaluated_fraction += float(np.sum(evaluated_fractions))
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "candidates": self.candidates,
+                "rejected": self.rejected,
+                "average_evaluated_fraction": self.evaluated_fraction / self.candidates if self.candidates else 1.0
+            }
+
+score_stats = ScoreStats()
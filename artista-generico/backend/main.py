@@ -1,3 +1,11 @@
+import os
+import sys
+
+# O ponto de entrada torna importável o código compartilhado pelos projetos
+# (evolution_core, instrumentation, na raiz do repositório); os outros módulos
+# e os testes já o esperam no sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
 import base64
 import io
 from fastapi import FastAPI, HTTPException
@@ -5,6 +13,9 @@ from fastapi.middleware.cors import CORSMiddleware
 
 import image_processor
 import evolution_engine
+from evolution_engine import make_executor
+from fitness_cache import FitnessCache
+from instrumentation.web import instrument_app
 
 # --- Configuração e Estado Global ---
 
@@ -12,12 +23,19 @@ ASSETS_DIR = "../assets"
 TARGET_IMAGE_PATH = f"{ASSETS_DIR}/target_2.png"
 
 app = FastAPI()
+# Histogramas de latência das requisições e GET /metrics
+instrument_app(app)
 
 # Estado da simulação (armazenado em memória)
 state = {
     "target_image": None,
     "population": [],
-    "generation": 0
+    "generation": 0,
+    "executor": None,
+    # Fitness por genoma: elites e cópias idênticas não são renderizados de novo
+    "fitness_cache": None,
+    # Interrompe a avaliação das obras que não podem ser selecionadas
+    "early_rejection": False
 }
 
 # --- Middlewares ---
@@ -47,13 +65,25 @@ def get_target_image():
         raise HTTPException(status_code=404, detail="Imagem alvo não encontrada no servidor.")
 
 @app.post("/evolution/start")
-def start_evolution():
-    """Inicia o processo de evolução, criando a população inicial."""
+def start_evolution(executor: str = "serial", workers: int = None, early_rejection: bool = False):
+    """Inicia o processo de evolução, criando a população inicial.
+    `executor` define onde a fitness é avaliada: "serial", "thread" ou "process".
+    `early_rejection` liga a avaliação por blocos com rejeição antecipada."""
+    try:
+        new_executor = make_executor(executor, workers)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if state["executor"] is not None:
+        state["executor"].close()
+    state["executor"] = new_executor
+
     print("Iniciando a evolução...")
     state["target_image"] = image_processor.load_target_image(TARGET_IMAGE_PATH)
     width, height = state["target_image"].size
     state["population"] = evolution_engine.create_initial_population(width, height)
     state["generation"] = 0
+    state["fitness_cache"] = FitnessCache()
+    state["early_rejection"] = early_rejection
     print("População inicial criada.")
     return {"message": "Evolução iniciada com sucesso."}
 
@@ -69,7 +99,10 @@ def get_next_generation():
     # Roda o motor de evolução
     new_population, fitness_scores = evolution_engine.run_generation(
         state["population"],
-        state["target_image"]
+        state["target_image"],
+        state["executor"],
+        state["fitness_cache"],
+        early_rejection=state["early_rejection"]
     )
     state["population"] = new_population
 
@@ -91,5 +124,16 @@ def get_next_generation():
         "generation": state["generation"],
         "best_fitness": float(best_fitness),
         "average_fitness": float(avg_fitness),
-        "best_artwork_image": encoded_image
+        "best_artwork_image": encoded_image,
+        # Acertos do cache de fitness nesta geração e tempo de renderização economizado
+        "fitness_cache": state["fitness_cache"].stats(),
+        # Polígonos descartados na renderização ou podados do genoma nesta geração
+        "render_culling": image_processor.render_stats.stats(),
+        # Obras rejeitadas antes do fim da comparação e fração média dos pixels comparados
+        "early_rejection": image_processor.score_stats.stats()
     }
+
+@app.on_event("shutdown")
+def close_executor():
+    if state["executor"] is not None:
+        state["executor"].close()
@@ -0,0 +1,72 @@
+import sys
+import os
+import copy
+import random
+import numpy as np
+
+# Adiciona o backend e a raiz do repositório (evolution_core/instrumentation compartilhados) ao path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import evolution_engine
+import image_processor
+from artwork import Artwork, Polygon
+
+WIDTH, HEIGHT = 64, 48
+
+def random_color():
+    return (random.randint(0, 255), random.randint(0, 255), random.randint(0, 255), random.randint(0, 255))
+
+def artwork_with_dead_genes(seed):
+    """Polígonos aleatórios intercalados com quadriláteros grandes que cobrem
+    parte deles e com polígonos fora da tela."""
+    random.seed(seed)
+    polygons = [evolution_engine.create_random_polygon(WIDTH, HEIGHT) for _ in range(20)]
+    for _ in range(4):
+        # Quadrilátero convexo grande, inserido depois de alguns polígonos
+        x0, y0 = random.randint(-20, WIDTH // 2), random.randint(-20, HEIGHT // 2)
+        x1, y1 = random.randint(WIDTH // 2, WIDTH + 20), random.randint(HEIGHT // 2, HEIGHT + 20)
+        quad = Polygon(color=random_color(), vertices=[(x0, y0), (x1, y0 + random.randint(-3, 3)), (x1, y1), (x0, y1)])
+        polygons.insert(random.randint(0, len(polygons)), quad)
+    for _ in range(3):
+        dx, dy = random.choice([(WIDTH + 5, 0), (-WIDTH - 5, 0), (0, HEIGHT + 5), (0, -HEIGHT - 5)])
+        vertices = [(x + dx, y + dy) for x, y in evolution_engine.create_random_polygon(WIDTH, HEIGHT).vertices]
+        polygons.insert(random.randint(0, len(polygons)), Polygon(color=random_color(), vertices=vertices))
+    # Polígonos pequenos desenhados antes dos quadriláteros (candidatos a ficarem cobertos)
+    for _ in range(6):
+        cx, cy = random.randint(WIDTH // 3, 2 * WIDTH // 3), random.randint(HEIGHT // 3, 2 * HEIGHT // 3)
+        small = Polygon(color=random_color(), vertices=[(cx, cy), (cx + 3, cy), (cx + 1, cy + 3)])
+        polygons.insert(random.randint(0, 5), small)
+    return Artwork(polygons=polygons)
+
+def pixels(image):
+    return np.asarray(image)
+
+def test_culled_render_is_pixel_identical():
+    reasons = set()
+    for seed in range(200):
+        artwork = artwork_with_dead_genes(seed)
+        reasons.update(reason for _, reason in image_processor.prepare_render(artwork, WIDTH, HEIGHT).culled)
+        full = image_processor.render_artwork(artwork, WIDTH, HEIGHT, cull=False)
+        culled = image_processor.render_artwork(artwork, WIDTH, HEIGHT, cull=True)
+        assert np.array_equal(pixels(full), pixels(culled)), seed
+    # Os casos gerados exercitam os dois motivos de descarte
+    assert {"covered", "off_canvas"} <= reasons
+
+def test_pruning_keeps_the_rendered_image():
+    pruned_total = 0
+    for seed in range(200):
+        artwork = artwork_with_dead_genes(seed)
+        before = image_processor.render_artwork(artwork, WIDTH, HEIGHT, cull=False)
+        pruned = copy.deepcopy(artwork)
+        count = evolution_engine.prune_dead_genes(pruned, WIDTH, HEIGHT)
+        assert len(pruned.polygons) == len(artwork.polygons) - count
+        assert np.array_equal(pixels(before), pixels(image_processor.render_artwork(pruned, WIDTH, HEIGHT, cull=False))), seed
+        # Depois da poda não sobra nada para descartar
+        assert image_processor.prepare_render(pruned, WIDTH, HEIGHT).culled == []
+        pruned_total += count
+    assert pruned_total > 0
+
+if __name__ == "__main__":
+    test_culled_render_is_pixel_identical()
+    test_pruning_keeps_the_rendered_image()
@@ -0,0 +1,128 @@
+import sys
+import os
+import copy
+import random
+import numpy as np
+from PIL import Image
+
+# Adiciona o backend e a raiz do repositório (evolution_core/instrumentation compartilhados) ao path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import evolution_engine
+import image_processor
+from artwork import Polygon
+from evolution_core import elite_indices, make_executor
+from fitness_cache import FitnessCache
+
+GENERATIONS = 8
+
+def random_target(width=96, height=64, seed=0):
+    rng = np.random.default_rng(seed)
+    return Image.fromarray(rng.integers(0, 256, (height, width, 4), dtype=np.uint8), "RGBA")
+
+def small_mutations(population, width, height):
+    """A população com os filhos trocados por mutações de um só polígono da
+    primeira obra: mudam poucos blocos, então algumas obras são rejeitadas."""
+    children = []
+    for _ in range(len(population) - evolution_engine.genetic_algorithm.elite_count):
+        child = copy.deepcopy(population[0])
+        polygon = random.choice(child.polygons)
+        if random.random() < 0.5:
+            polygon.color = tuple(random.randint(0, 255) for _ in range(4))
+        else:
+            x, y = random.randrange(width), random.randrange(height)
+            polygon.vertices = [(x, y), (x + 8, y + 3), (x + 3, y + 9)]
+        children.append(child)
+    return population[:evolution_engine.genetic_algorithm.elite_count] + children
+
+def evolved_populations(target, generations=GENERATIONS, seed=0):
+    """Populações de gerações seguidas (a primeira obra de cada uma, depois da
+    primeira geração, é a melhor da anterior), cada uma também com filhos
+    de mutações pequenas."""
+    random.seed(seed)
+    evolution_engine.genetic_algorithm.rng = np.random.default_rng(seed)
+    width, height = target.size
+    population = [evolution_engine.create_random_artwork(width, height) for _ in range(evolution_engine.POPULATION_SIZE)]
+    for _ in range(generations):
+        yield population
+        yield small_mutations(population, width, height)
+        population, _ = evolution_engine.run_generation(population, target, early_rejection=False)
+
+def exact_fitness(population, target):
+    # Sem referência e com `keep` igual ao tamanho da população, nada é rejeitado
+    scores = evolution_engine.TiledArtworkFitness(target, len(population))(population)
+    assert not any(rejected for _, _, rejected in scores)
+    return np.array([fitness for fitness, _, _ in scores])
+
+def check_selection_matches(cache=None, executor=None):
+    target = random_target()
+    rejected = 0
+    for population in evolved_populations(target):
+        keep = evolution_engine.selection_size(len(population))
+        exact = exact_fitness(population, target)
+        plain = evolution_engine.evaluate_population(population, target)
+        image_processor.score_stats.start_generation()
+        early = evolution_engine.evaluate_population(population, target, executor, cache, early_rejection=True)
+        rejected += image_processor.score_stats.stats()["rejected"]
+
+        selected = set(elite_indices(plain, keep))
+        assert set(elite_indices(early, keep)) == selected
+        # As obras selecionadas têm a fitness exata; as demais, no máximo um limite superior dela
+        assert np.array_equal(early[list(selected)], exact[list(selected)])
+        assert np.all(early >= exact)
+        assert np.allclose(plain, exact, rtol=1e-5)
+    return rejected
+
+def test_selection_matches_without_cache():
+    # As gerações do teste chegam a rejeitar obras
+    assert check_selection_matches() > 0
+
+def test_selection_matches_with_cache():
+    assert check_selection_matches(cache=FitnessCache()) > 0
+
+def test_selection_matches_with_batching_executor():
+    # Cada lote só conhece as próprias obras (e as do cache), então rejeita menos
+    executor = make_executor("thread", 2)
+    try:
+        check_selection_matches(executor=executor)
+        check_selection_matches(cache=FitnessCache(), executor=executor)
+    finally:
+        executor.close()
+
+def test_unchanged_tiles_have_equal_pixels():
+    target = random_target()
+    width, height = target.size
+    scorer = image_processor.TileScorer(target)
+    random.seed(1)
+    checked = 0
+    for _ in range(100):
+        parent = evolution_engine.create_random_artwork(width, height)
+        child = copy.deepcopy(parent)
+        i = random.randrange(len(child.polygons))
+        x, y = random.randrange(width), random.randrange(height)
+        mutation = random.choice(["color", "vertices", "add", "remove"])
+        if mutation == "color":
+            child.polygons[i].color = (255 - child.polygons[i].color[0],) + tuple(child.polygons[i].color[1:])
+        elif mutation == "vertices":
+            child.polygons[i].vertices = [(x, y), (x + 6, y + 2), (x + 2, y + 7)]
+        elif mutation == "add":
+            child.polygons.append(Polygon(color=(255, 0, 0, 200), vertices=[(x, y), (x + 6, y + 2), (x + 2, y + 7)]))
+        else:
+            child.polygons.pop(i)
+
+        unchanged = ~scorer.changed_tiles(parent, child)
+        parent_tiles = scorer.tiles(np.asarray(image_processor.render_artwork(parent, width, height)))
+        child_tiles = scorer.tiles(np.asarray(image_processor.render_artwork(child, width, height)))
+        parent_tiles = parent_tiles.reshape(scorer.rows * scorer.cols, -1)
+        child_tiles = child_tiles.reshape(scorer.rows * scorer.cols, -1)
+        assert np.array_equal(parent_tiles[unchanged], child_tiles[unchanged]), mutation
+        checked += int(unchanged.sum())
+    # Os casos gerados têm blocos fora da mudança
+    assert checked > 0
+
+if __name__ == "__main__":
+    test_selection_matches_without_cache()
+    test_selection_matches_with_cache()
+    test_selection_matches_with_batching_executor()
+    test_unchanged_tiles_have_equal_pixels()
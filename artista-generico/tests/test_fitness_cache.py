@@ -0,0 +1,86 @@
+import sys
+import os
+import copy
+import random
+import numpy as np
+from PIL import Image
+
+# Adiciona o backend e a raiz do repositório (evolution_core/instrumentation compartilhados) ao path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import evolution_engine
+import image_processor
+from fitness_cache import FitnessCache, genome_key
+
+def random_target(width=48, height=32, seed=0):
+    rng = np.random.default_rng(seed)
+    return Image.fromarray(rng.integers(0, 256, (height, width, 4), dtype=np.uint8), "RGBA")
+
+def random_artworks(count, width, height, seed=0):
+    random.seed(seed)
+    return [evolution_engine.create_random_artwork(width, height) for _ in range(count)]
+
+def test_least_recently_used_entry_is_evicted():
+    cache = FitnessCache(max_entries=2)
+    cache.put(b"a", 1.0)
+    cache.put(b"b", 2.0)
+    assert cache.get(b"a") == 1.0 # "a" passa a ser o usado mais recentemente
+    cache.put(b"c", 3.0)
+    assert len(cache.entries) == 2
+    assert cache.get(b"b") is None
+    assert cache.get(b"a") == 1.0 and cache.get(b"c") == 3.0
+
+def test_changing_the_target_clears_the_cache():
+    cache = FitnessCache()
+    target = random_target()
+    cache.set_target(target)
+    cache.put(b"a", 1.0)
+
+    cache.set_target(target.copy()) # Mesma imagem, outro objeto
+    assert cache.get(b"a") == 1.0
+    cache.set_target(random_target(seed=1))
+    assert cache.get(b"a") is None
+
+    cache.put(b"a", 1.0)
+    cache.set_target(random_target(seed=1).resize((24, 16)))
+    assert cache.get(b"a") is None
+
+def test_duplicates_in_a_generation_are_rendered_once():
+    target = random_target()
+    width, height = target.size
+    artworks = random_artworks(4, width, height)
+    # Cópias (deepcopy) são objetos diferentes com o mesmo genoma
+    population = artworks + [copy.deepcopy(artworks[0]), copy.deepcopy(artworks[0]), copy.deepcopy(artworks[2])]
+    assert genome_key(population[4]) == genome_key(artworks[0])
+
+    cache = FitnessCache()
+    cache.start_generation()
+    image_processor.render_stats.start_generation()
+    fitness = evolution_engine.evaluate_population(population, target, cache=cache)
+    assert image_processor.render_stats.stats()["renders"] == 4
+    assert cache.stats()["hits"] == 3 and cache.stats()["misses"] == 4
+    assert fitness[4] == fitness[5] == fitness[0] and fitness[6] == fitness[2]
+
+    # Na geração seguinte, todas estão no cache
+    cache.start_generation()
+    image_processor.render_stats.start_generation()
+    assert np.array_equal(evolution_engine.evaluate_population(population, target, cache=cache), fitness)
+    assert image_processor.render_stats.stats()["renders"] == 0
+    assert cache.stats()["hits"] == len(population)
+
+def test_cached_fitness_matches_uncached():
+    target = random_target()
+    width, height = target.size
+    population = random_artworks(6, width, height, seed=3)
+    population += [copy.deepcopy(population[1])]
+    uncached = evolution_engine.evaluate_population(population, target)
+    cache = FitnessCache()
+    for _ in range(2): # Primeiro falhas, depois acertos
+        assert np.array_equal(evolution_engine.evaluate_population(population, target, cache=cache), uncached)
+
+if __name__ == "__main__":
+    test_least_recently_used_entry_is_evicted()
+    test_changing_the_target_clears_the_cache()
+    test_duplicates_in_a_generation_are_rendered_once()
+    test_cached_fitness_matches_uncached()
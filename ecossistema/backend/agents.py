@@ -2,59 +2,92 @@ import numpy as np
 import uuid
 import math
 
+# Used when no per-simulation generator is passed in
+default_rng = np.random.default_rng()
+
 class NeuralNetwork:
-    def __init__(self, input_size, hidden_size, output_size):
+    def __init__(self, input_size, hidden_size, output_size, genome=None, rng=None):
+        # hidden_size may be a single layer width or a sequence of widths
+        hidden_sizes = (hidden_size,) if np.isscalar(hidden_size) else tuple(hidden_size)
         self.input_size = input_size
-        self.hidden_size = hidden_size
+        self.hidden_sizes = hidden_sizes
+        self.hidden_size = hidden_sizes[0] if hidden_sizes else output_size
         self.output_size = output_size
-        
-        # Initialize weights with random values
-        self.weights_ih = np.random.uniform(-1, 1, (self.hidden_size, self.input_size))
-        self.weights_ho = np.random.uniform(-1, 1, (self.output_size, self.hidden_size))
-        
-        # Biases
-        self.bias_h = np.random.uniform(-1, 1, (self.hidden_size, 1))
-        self.bias_o = np.random.uniform(-1, 1, (self.output_size, 1))
+        self.layer_sizes = (input_size,) + hidden_sizes + (output_size,)
+        
+        # All weights and biases live in one flat genome vector; the matrices
+        # below are views into it, so evolution can work on whole populations
+        # as a (population, genome_size) matrix without copying per agent.
+        self.genome_size = NeuralNetwork.genome_length(self.layer_sizes)
+        if genome is None:
+            # Initialize weights with random values
+            rng = rng if rng is not None else default_rng
+            genome = rng.uniform(-1, 1, self.genome_size)
+        self.set_genome(genome)
+
+    @staticmethod
+    def genome_length(layer_sizes):
+        return sum(fan_out * fan_in + fan_out for fan_in, fan_out in zip(layer_sizes[:-1], layer_sizes[1:]))
+
+    def set_genome(self, genome):
+        if genome.shape != (self.genome_size,):
+            raise ValueError(f"Genome must have shape ({self.genome_size},), got {genome.shape}")
+        self.genome = genome
+        
+        # Each layer is (weights, bias), laid out one after the other
+        self.layers = []
+        offset = 0
+        for fan_in, fan_out in zip(self.layer_sizes[:-1], self.layer_sizes[1:]):
+            weights = genome[offset:offset + fan_out * fan_in].reshape(fan_out, fan_in)
+            offset += fan_out * fan_in
+            bias = genome[offset:offset + fan_out]
+            offset += fan_out
+            self.layers.append((weights, bias))
+
+        # Names used by the API for the first and last layers
+        self.weights_ih = self.layers[0][0]
+        self.bias_h = self.layers[0][1].reshape(-1, 1)
+        self.weights_ho = self.layers[-1][0]
+        self.bias_o = self.layers[-1][1].reshape(-1, 1)
 
     def forward(self, inputs):
-        # Input to Hidden
-        inputs = np.array(inputs).reshape(-1, 1)
-        hidden = np.dot(self.weights_ih, inputs) + self.bias_h
-        hidden = np.tanh(hidden)  # Activation function
-        
-        # Hidden to Output
-        output = np.dot(self.weights_ho, hidden) + self.bias_o
-        output = np.tanh(output)  # Activation function (outputs between -1 and 1)
-        
-        return output.flatten()
-
-    def mutate(self, rate=0.1):
-        def mutate_matrix(matrix):
-            mutation_mask = np.random.rand(*matrix.shape) < rate
-            mutation_values = np.random.normal(0, 0.1, matrix.shape)
-            matrix[mutation_mask] += mutation_values[mutation_mask]
-            # Clamp weights to keep them stable? Maybe not strictly necessary but good practice
-            # matrix = np.clip(matrix, -1, 1) 
-            return matrix
-
-        self.weights_ih = mutate_matrix(self.weights_ih)
-        self.weights_ho = mutate_matrix(self.weights_ho)
-        self.bias_h = mutate_matrix(self.bias_h)
-        self.bias_o = mutate_matrix(self.bias_o)
+        x = np.asarray(inputs, dtype=float).reshape(-1)
+        for weights, bias in self.layers:
+            x = np.tanh(np.dot(weights, x) + bias)  # Activation function (outputs between -1 and 1)
+        return x
+
+    @staticmethod
+    def forward_batch(layer_sizes, genomes, inputs):
+        """Evaluates one network per row of `genomes` on the matching row of `inputs`."""
+        n = len(genomes)
+        x = inputs
+        offset = 0
+        for fan_in, fan_out in zip(layer_sizes[:-1], layer_sizes[1:]):
+            weights = genomes[:, offset:offset + fan_out * fan_in].reshape(n, fan_out, fan_in)
+            offset += fan_out * fan_in
+            bias = genomes[:, offset:offset + fan_out]
+            offset += fan_out
+            x = np.tanh(np.einsum('noi,ni->no', weights, x) + bias)
+        return x
+
+    def mutate(self, rate=0.1, rng=None):
+        rng = rng if rng is not None else default_rng
+        # Mutating the genome in place updates every weight matrix view at once
+        mutation_mask = rng.random(self.genome_size) < rate
+        self.genome[mutation_mask] += rng.normal(0, 0.1, mutation_mask.sum())
 
     def copy(self):
-        new_nn = NeuralNetwork(self.input_size, self.hidden_size, self.output_size)
-        new_nn.weights_ih = self.weights_ih.copy()
-        new_nn.weights_ho = self.weights_ho.copy()
-        new_nn.bias_h = self.bias_h.copy()
-        new_nn.bias_o = self.bias_o.copy()
-        return new_nn
+        return NeuralNetwork(self.input_size, self.hidden_sizes, self.output_size, self.genome.copy())
 
 class Agent:
-    def __init__(self, x, y):
+    # Per-agent state saved in snapshots (see Simulation.snapshot)
+    STATE_FIELDS = ("position", "velocity", "acceleration", "energy", "alive", "age")
+
+    def __init__(self, x, y, rng=None):
+        rng = rng if rng is not None else default_rng
         self.id = str(uuid.uuid4())
         self.position = np.array([float(x), float(y)])
-        self.velocity = np.random.uniform(-1, 1, 2)
+        self.velocity = rng.uniform(-1, 1, 2)
         self.acceleration = np.zeros(2)
         self.max_speed = 4.0
         self.max_force = 0.2
@@ -63,6 +96,11 @@ class Agent:
         self.age = 0
         self.radius = 10
 
+    @classmethod
+    def brain_layout(cls, hidden_sizes=(8,), sensor_sectors=0):
+        """(input_size, hidden_sizes, output_size) for this agent type's brain."""
+        return (cls.BASE_INPUTS + cls.SENSOR_CHANNELS * sensor_sectors, hidden_sizes, 2)
+
     def apply_force(self, force):
         self.acceleration += force
 
@@ -75,7 +113,8 @@ class Agent:
         # Limit speed
         speed = np.linalg.norm(self.velocity)
         if speed > self.max_speed:
-            self.velocity = (self.velocity / speed) * self.max_speed
+            # In place: the velocity may be a view into the simulation's agent pool
+            self.velocity[:] = (self.velocity / speed) * self.max_speed
             
         self.position += self.velocity
         self.acceleration *= 0  # Reset acceleration
@@ -105,77 +144,37 @@ class Agent:
         }
 
 class Prey(Agent):
-    def __init__(self, x, y):
-        super().__init__(x, y)
+    BASE_INPUTS = 4 # Inputs (built for all prey at once in Simulation.update): Closest Predator (x,y), Closest Food (x,y)
+    SENSOR_CHANNELS = 2 # Per sensor sector: Predator, Food
+    STATE_FIELDS = Agent.STATE_FIELDS + ("fitness", "food_eaten")
+
+    def __init__(self, x, y, brain=None, hidden_sizes=(8,), sensor_sectors=0, rng=None):
+        super().__init__(x, y, rng)
         self.max_speed = 5.0
-        self.brain = NeuralNetwork(4, 8, 2) # Inputs: Closest Predator (x,y), Closest Food (x,y)
+        self.brain = brain if brain is not None else NeuralNetwork(*self.brain_layout(hidden_sizes, sensor_sectors), rng=rng)
         self.fitness = 0
         self.food_eaten = 0
 
-    def think(self, closest_predator, closest_food):
-        inputs = []
-        
-        # Vector to closest predator
-        if closest_predator:
-            d_pred = closest_predator.position - self.position
-            # Normalize
-            dist = np.linalg.norm(d_pred)
-            if dist > 0:
-                d_pred = d_pred / dist
-            inputs.extend([d_pred[0], d_pred[1]])
-        else:
-            inputs.extend([0, 0])
-            
-        # Vector to closest food
-        if closest_food is not None: # Food is just a position array usually
-            d_food = closest_food - self.position
-            dist = np.linalg.norm(d_food)
-            if dist > 0:
-                d_food = d_food / dist
-            inputs.extend([d_food[0], d_food[1]])
-        else:
-            inputs.extend([0, 0])
-            
-        outputs = self.brain.forward(inputs)
-        
-        # Output is force vector
-        force = np.array([outputs[0], outputs[1]])
-        self.apply_force(force * self.max_force)
-
     def eat(self):
         self.energy += 20
         self.food_eaten += 1
         self.fitness += 10
 
 class Predator(Agent):
-    def __init__(self, x, y):
-        super().__init__(x, y)
+    BASE_INPUTS = 2 # Inputs (built for all predators at once in Simulation.update): Closest Prey (x,y)
+    SENSOR_CHANNELS = 1 # Per sensor sector: Prey
+    STATE_FIELDS = Agent.STATE_FIELDS + ("fitness", "prey_eaten", "distance_since_meal")
+
+    def __init__(self, x, y, brain=None, hidden_sizes=(8,), sensor_sectors=0, rng=None):
+        super().__init__(x, y, rng)
         self.max_speed = 4.5
-        self.brain = NeuralNetwork(2, 8, 2) # Inputs: Closest Prey (x,y)
+        self.brain = brain if brain is not None else NeuralNetwork(*self.brain_layout(hidden_sizes, sensor_sectors), rng=rng)
         self.fitness = 0
         self.prey_eaten = 0
         self.radius = 15
         self.distance_since_meal = 0
         self.max_starvation_distance = 2000
 
-    def think(self, closest_prey):
-        inputs = []
-        
-        # Vector to closest prey
-        if closest_prey:
-            d_prey = closest_prey.position - self.position
-            dist = np.linalg.norm(d_prey)
-            if dist > 0:
-                d_prey = d_prey / dist
-            inputs.extend([d_prey[0], d_prey[1]])
-        else:
-            inputs.extend([0, 0])
-            
-        outputs = self.brain.forward(inputs)
-        
-        force = np.array([outputs[0], outputs[1]])
-        self.apply_force(force * self.max_force)
-
     def update(self, width, height):
         if not self.alive:
             return
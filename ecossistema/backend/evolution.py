@@ -1,80 +1,37 @@
 import numpy as np
-import random
-import copy
-from .agents import Prey, Predator
+from .agents import Prey, Predator, NeuralNetwork, default_rng
+from evolution_core import GeneticAlgorithm
 
-class Evolution:
-    def __init__(self, mutation_rate=0.1):
-        self.mutation_rate = mutation_rate
+class Evolution(GeneticAlgorithm):
+    def __init__(self, mutation_rate=0.1, mutation_scale=0.1, tournament_size=3, elite_count=2, crossover="uniform", rng=None):
+        super().__init__(mutation_rate, mutation_scale, tournament_size, elite_count, crossover,
+                         rng=rng if rng is not None else default_rng)
 
-    def next_generation(self, old_agents, agent_class, population_size, width, height):
-        # 1. Calculate Fitness (already done in agents, but we can normalize if needed)
-        # Filter out dead agents if we want, or keep them with low fitness?
-        # Usually we take the best performing ones.
-        
+    def next_generation(self, old_agents, agent_class, population_size, width, height, brain_layout=None):
         # If no agents survived, create random ones
         if not old_agents:
-            return [agent_class(random.uniform(0, width), random.uniform(0, height)) for _ in range(population_size)]
+            brain_layout = brain_layout or agent_class.brain_layout()
+            return [agent_class(self.rng.uniform(0, width), self.rng.uniform(0, height),
+                                brain=NeuralNetwork(*brain_layout, rng=self.rng), rng=self.rng)
+                    for _ in range(population_size)]
 
-        # Sort by fitness
-        old_agents.sort(key=lambda x: x.fitness, reverse=True)
-        
-        # Elitism: Keep top %?
-        # Let's just select parents based on fitness probability
-        
-        new_agents = []
-        
-        # Elitism: Keep best 2
-        new_agents.append(self.clone_agent(old_agents[0], width, height))
-        if len(old_agents) > 1:
-            new_agents.append(self.clone_agent(old_agents[1], width, height))
-            
-        while len(new_agents) < population_size:
-            parent1 = self.select_parent(old_agents)
-            parent2 = self.select_parent(old_agents)
-            
-            child = self.crossover(parent1, parent2, agent_class, width, height)
-            child.brain.mutate(self.mutation_rate)
-            new_agents.append(child)
-            
-        return new_agents
+        # The whole population is handled as one (n_agents, genome_size) matrix
+        genomes = np.stack([a.brain.genome for a in old_agents])
+        fitness = np.array([a.fitness for a in old_agents], dtype=float)
 
-    def select_parent(self, agents):
-        # Tournament selection
-        tournament_size = 3
-        tournament = random.sample(agents, min(len(agents), tournament_size))
-        return max(tournament, key=lambda x: x.fitness)
+        new_genomes = self.evolve_genomes(genomes, fitness, population_size)
 
-    def crossover(self, parent1, parent2, agent_class, width, height):
-        child = agent_class(random.uniform(0, width), random.uniform(0, height))
-        
-        # Crossover weights
-        # Simple average or random pick? Let's do random pick per weight matrix
-        if random.random() < 0.5:
-            child.brain.weights_ih = parent1.brain.weights_ih.copy()
-        else:
-            child.brain.weights_ih = parent2.brain.weights_ih.copy()
-            
-        if random.random() < 0.5:
-            child.brain.weights_ho = parent1.brain.weights_ho.copy()
-        else:
-            child.brain.weights_ho = parent2.brain.weights_ho.copy()
-            
-        # Biases
-        if random.random() < 0.5:
-            child.brain.bias_h = parent1.brain.bias_h.copy()
-        else:
-            child.brain.bias_h = parent2.brain.bias_h.copy()
-            
-        if random.random() < 0.5:
-            child.brain.bias_o = parent1.brain.bias_o.copy()
-        else:
-            child.brain.bias_o = parent2.brain.bias_o.copy()
-            
-        return child
+        # Brains are views into rows of the new matrix, so no weights are copied here
+        brain = old_agents[0].brain
+        shape = (brain.input_size, brain.hidden_sizes, brain.output_size)
+        xs = self.rng.uniform(0, width, population_size)
+        ys = self.rng.uniform(0, height, population_size)
+        return [
+            agent_class(xs[i], ys[i], brain=NeuralNetwork(*shape, genome=new_genomes[i]), rng=self.rng)
+            for i in range(population_size)
+        ]
 
-    def clone_agent(self, agent, width, height):
-        # Create new agent with same brain but reset state
-        new_agent = type(agent)(random.uniform(0, width), random.uniform(0, height))
-        new_agent.brain = agent.brain.copy()
-        return new_agent
+    def evolve_genomes(self, genomes, fitness, population_size):
+        """Builds the next generation's genome matrix from the current one
+        (see GeneticAlgorithm.next_genomes)."""
+        return self.next_genomes(genomes, fitness, population_size)
@@ -1,11 +1,23 @@
-from fastapi import FastAPI, BackgroundTasks
+import os
+import sys
+
+# The entry point makes the code shared by all projects (evolution_core,
+# instrumentation, at the repository root) importable; other modules and the
+# tests expect it on sys.path already
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from fastapi import FastAPI, BackgroundTasks, HTTPException
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 import asyncio
 import uvicorn
 from .simulation import Simulation
+from .recorder import Replayer
+from instrumentation.web import instrument_app
 
 app = FastAPI()
+# Request latency histograms and GET /metrics
+instrument_app(app)
 
 # CORS
 app.add_middleware(
@@ -20,6 +32,9 @@ app.add_middleware(
 sim = Simulation()
 simulation_running = False
 
+RECORDINGS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'recordings')
+replayers = {}
+
 # Background Task for Simulation Loop
 async def run_simulation():
     global simulation_running
@@ -33,8 +48,19 @@ async def startup_event():
     asyncio.create_task(run_simulation())
 
 @app.get("/simulation/state")
-async def get_state():
-    return sim.get_state()
+async def get_state(x: float = None, y: float = None, width: float = None, height: float = None,
+                    max_entities: int = None):
+    # Optional viewport (all four of x, y, width, height) and entity budget; see Simulation.get_state
+    viewport = (x, y, width, height)
+    if all(v is None for v in viewport):
+        viewport = None
+    elif any(v is None for v in viewport):
+        raise HTTPException(status_code=400, detail="A viewport needs x, y, width and height")
+    elif width <= 0 or height <= 0:
+        raise HTTPException(status_code=400, detail="Viewport width and height must be positive")
+    if max_entities is not None and max_entities < 1:
+        raise HTTPException(status_code=400, detail="max_entities must be at least 1")
+    return sim.get_state(viewport, max_entities)
 
 @app.post("/simulation/start")
 async def start_simulation():
@@ -49,16 +75,77 @@ async def pause_simulation():
     return {"message": "Simulation paused"}
 
 @app.post("/simulation/reset")
-async def reset_simulation():
+async def reset_simulation(seed: int = None):
     global simulation_running
     simulation_running = False
-    sim.reset()
-    return {"message": "Simulation reset"}
+    sim.reset(seed)
+    return {"message": "Simulation reset", "seed": sim.seed}
+
+@app.post("/recording/start/{name}")
+async def start_recording(name: str, frames: bool = True, frame_interval: int = 1):
+    os.makedirs(RECORDINGS_DIR, exist_ok=True)
+    path = os.path.join(RECORDINGS_DIR, f"{os.path.basename(name)}.rec")
+    replayers.pop(path, None)
+    sim.start_recording(path, frames, frame_interval)
+    return {"message": f"Recording to {name}"}
+
+@app.post("/recording/stop")
+async def stop_recording():
+    sim.stop_recording()
+    return {"message": "Recording stopped"}
+
+def get_replayer(name):
+    path = os.path.join(RECORDINGS_DIR, f"{os.path.basename(name)}.rec")
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Recording not found")
+    if sim.recorder and sim.recorder.path == path:
+        raise HTTPException(status_code=409, detail="Recording still in progress")
+    if path not in replayers:
+        replayers[path] = Replayer(path)
+    return replayers[path]
+
+@app.get("/replay/{name}")
+async def get_replay(name: str):
+    replayer = get_replayer(name)
+    return {"frames": len(replayer), "generations": replayer.generations(), "config": replayer.config}
+
+@app.get("/replay/{name}/frame/{index}")
+async def get_replay_frame(name: str, index: int):
+    replayer = get_replayer(name)
+    if not 0 <= index < len(replayer):
+        raise HTTPException(status_code=404, detail="Frame not found")
+    return replayer.frame(index)
+
+@app.post("/replay/{name}/generation/{generation}")
+def replay_generation(name: str, generation: int):
+    # Re-run a recorded generation headlessly, e.g. to profile it.
+    # Uses its own Replayer so it can run in a worker thread.
+    replayer = Replayer(get_replayer(name).path)
+    try:
+        replayed = replayer.replay_generation(generation)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Generation not recorded")
+    finally:
+        replayer.close()
+    return replayed.get_stats()
 
 @app.get("/simulation/stats")
 async def get_stats():
     return sim.get_stats()
 
+def brain_state(brain):
+    return {
+        "input_size": brain.input_size,
+        "hidden_size": brain.hidden_size,
+        "output_size": brain.output_size,
+        "layer_sizes": list(brain.layer_sizes),
+        "weights_ih": brain.weights_ih.tolist(),
+        "weights_ho": brain.weights_ho.tolist(),
+        "bias_h": brain.bias_h.tolist(),
+        "bias_o": brain.bias_o.tolist(),
+        "layers": [{"weights": w.tolist(), "bias": b.tolist()} for w, b in brain.layers]
+    }
+
 @app.get("/agent/{agent_id}")
 async def get_agent(agent_id: str):
     # Search in prey
@@ -67,15 +154,7 @@ async def get_agent(agent_id: str):
             return {
                 "id": p.id,
                 "type": "Prey",
-                "brain": {
-                    "input_size": p.brain.input_size,
-                    "hidden_size": p.brain.hidden_size,
-                    "output_size": p.brain.output_size,
-                    "weights_ih": p.brain.weights_ih.tolist(),
-                    "weights_ho": p.brain.weights_ho.tolist(),
-                    "bias_h": p.brain.bias_h.tolist(),
-                    "bias_o": p.brain.bias_o.tolist()
-                }
+                "brain": brain_state(p.brain)
             }
     # Search in predators
     for p in sim.predators:
@@ -83,15 +162,7 @@ async def get_agent(agent_id: str):
             return {
                 "id": p.id,
                 "type": "Predator",
-                "brain": {
-                    "input_size": p.brain.input_size,
-                    "hidden_size": p.brain.hidden_size,
-                    "output_size": p.brain.output_size,
-                    "weights_ih": p.brain.weights_ih.tolist(),
-                    "weights_ho": p.brain.weights_ho.tolist(),
-                    "bias_h": p.brain.bias_h.tolist(),
-                    "bias_o": p.brain.bias_o.tolist()
-                }
+                "brain": brain_state(p.brain)
             }
     return {"error": "Agent not found"}
 
@@ -0,0 +1,133 @@
+import numpy as np
+
+class SlotPool:
+    """A fixed number of slots with an alive mask and a free list.
+
+    Taking and releasing a slot is O(1) and allocates nothing: free slots sit
+    on a stack in a preallocated array. `live()` gives the occupied slots in
+    slot order; it is recomputed only after the pool changed, so per-step code
+    iterates just over live slots without checking a flag per item.
+    """
+    def __init__(self, capacity):
+        self.capacity = 0
+        self.alive = np.zeros(0, dtype=bool)
+        self.free = np.zeros(0, dtype=np.intp)
+        self.n_free = 0
+        self.count = 0
+        self.live_slots = None
+        self.grow(capacity)
+
+    def __len__(self):
+        return self.count
+
+    def grow(self, capacity):
+        """Raises the capacity to at least `capacity` (the only call that allocates)."""
+        if capacity <= self.capacity:
+            return
+        old = self.capacity
+        self.alive = np.concatenate([self.alive, np.zeros(capacity - old, dtype=bool)])
+        # New slots go under the existing free ones, lowest slot on top
+        free = np.empty(capacity, dtype=np.intp)
+        free[:capacity - old] = np.arange(capacity - 1, old - 1, -1)
+        free[capacity - old:capacity - old + self.n_free] = self.free[:self.n_free]
+        self.free = free
+        self.n_free += capacity - old
+        self.capacity = capacity
+        self.resize(old, capacity)
+
+    def resize(self, old_capacity, capacity):
+        """Hook for subclasses to grow their per-slot arrays."""
+
+    def acquire(self):
+        if self.n_free == 0:
+            raise IndexError("pool is full")
+        self.n_free -= 1
+        slot = int(self.free[self.n_free])
+        self.alive[slot] = True
+        self.count += 1
+        self.live_slots = None
+        return slot
+
+    def release(self, slot):
+        if not self.alive[slot]:
+            return
+        self.alive[slot] = False
+        self.free[self.n_free] = slot
+        self.n_free += 1
+        self.count -= 1
+        self.live_slots = None
+
+    def clear(self):
+        self.alive[:] = False
+        self.free[:] = np.arange(self.capacity - 1, -1, -1)
+        self.n_free = self.capacity
+        self.count = 0
+        self.live_slots = None
+
+    def live(self):
+        if self.live_slots is None:
+            self.live_slots = np.flatnonzero(self.alive)
+        return self.live_slots
+
+class FoodPool(SlotPool):
+    """Food positions in a (capacity, 2) array."""
+    def __init__(self, capacity):
+        self.positions = np.zeros((0, 2))
+        super().__init__(capacity)
+
+    def resize(self, old_capacity, capacity):
+        self.positions = np.concatenate([self.positions, np.zeros((capacity - old_capacity, 2))])
+
+    def spawn(self, x, y):
+        slot = self.acquire()
+        self.positions[slot] = x, y
+        return slot
+
+    def live_positions(self):
+        return self.positions[self.live()]
+
+class AgentPool(SlotPool):
+    """One species' agents for the current generation.
+
+    Positions, velocities and genomes live in pool arrays, and each added
+    agent's `position`, `velocity` and brain genome become views of its slot's
+    rows, so the simulation gathers them for all live agents with one index
+    instead of stacking per-agent arrays. Dead agents release their slot but
+    stay in the simulation's agent list, which evolution still needs.
+    """
+    def __init__(self, capacity, genome_size):
+        self.agents = []
+        self.positions = np.zeros((0, 2))
+        self.velocities = np.zeros((0, 2))
+        self.genomes = np.zeros((0, genome_size))
+        super().__init__(capacity)
+
+    def resize(self, old_capacity, capacity):
+        extra = capacity - old_capacity
+        self.agents.extend([None] * extra)
+        self.positions = np.concatenate([self.positions, np.zeros((extra, 2))])
+        self.velocities = np.concatenate([self.velocities, np.zeros((extra, 2))])
+        self.genomes = np.concatenate([self.genomes, np.zeros((extra, self.genomes.shape[1]))])
+
+    def fill(self, agents):
+        """Replaces the pool's contents with `agents`; agent i gets slot i."""
+        self.clear()
+        self.grow(len(agents))
+        self.agents[:] = [None] * self.capacity
+        for agent in agents:
+            slot = self.acquire()
+            self.positions[slot] = agent.position
+            self.velocities[slot] = agent.velocity
+            self.genomes[slot] = agent.brain.genome
+            agent.position = self.positions[slot]
+            agent.velocity = self.velocities[slot]
+            agent.brain.set_genome(self.genomes[slot])
+            self.agents[slot] = agent
+        # Released only now, so the slots of dead agents are not handed to the next ones
+        for slot, agent in enumerate(agents):
+            if not agent.alive:
+                self.release(slot)
+
+    def live_agents(self, slots=None):
+        slots = self.live() if slots is None else slots
+        return [self.agents[s] for s in slots]
@@ -0,0 +1,164 @@
+import json
+import struct
+import numpy as np
+
+# File layout: MAGIC, then a stream of records, each a 1-byte kind and a
+# uint32 payload length followed by the payload.
+#   C - config: JSON with the Simulation constructor arguments (once, first)
+#   K - keyframe: full simulation state (genomes, agents, food, RNG state),
+#       written whenever recording starts and at the start of every generation
+#   F - frame: float32 positions/velocities of live agents and food for one step
+MAGIC = b"ECOREC1\n"
+CONFIG, KEYFRAME, FRAME = b"C", b"K", b"F"
+RECORD_HEADER = struct.Struct("<cI")
+FRAME_HEADER = struct.Struct("<IIIII") # generation, step, n_prey, n_predators, n_food
+
+def pack_arrays(meta, arrays):
+    meta = dict(meta, arrays=[[name, a.dtype.str, list(a.shape)] for name, a in arrays.items()])
+    header = json.dumps(meta).encode()
+    chunks = [struct.pack("<I", len(header)), header]
+    chunks.extend(np.ascontiguousarray(a).tobytes() for a in arrays.values())
+    return b"".join(chunks)
+
+def unpack_arrays(payload):
+    (header_len,) = struct.unpack_from("<I", payload)
+    meta = json.loads(payload[4:4 + header_len])
+    offset = 4 + header_len
+    arrays = {}
+    for name, dtype, shape in meta.pop("arrays"):
+        dtype = np.dtype(dtype)
+        count = int(np.prod(shape))
+        arrays[name] = np.frombuffer(payload, dtype, count, offset).reshape(shape).copy()
+        offset += count * dtype.itemsize
+    return meta, arrays
+
+class Recorder:
+    """Streams a simulation run to disk.
+
+    Records are written straight to a buffered file, so memory use does not
+    grow with the length of the run. With frames=False only the keyframes
+    (seed, genomes and RNG state per generation) are kept, which is enough to
+    replay any generation; frames add per-step positions for scrubbing in the
+    viewer, every `frame_interval` steps.
+    """
+    def __init__(self, path, config, frames=True, frame_interval=1, buffer_size=1 << 20):
+        self.path = path
+        self.frames = frames
+        self.frame_interval = max(1, frame_interval)
+        self.file = open(path, "wb", buffering=buffer_size)
+        self.file.write(MAGIC)
+        self.write_record(CONFIG, json.dumps(config).encode())
+
+    def write_record(self, kind, payload):
+        self.file.write(RECORD_HEADER.pack(kind, len(payload)))
+        self.file.write(payload)
+
+    def write_keyframe(self, sim):
+        meta, arrays = sim.snapshot()
+        self.write_record(KEYFRAME, pack_arrays(meta, arrays))
+        self.file.flush()
+
+    def write_frame(self, sim):
+        if not self.frames or sim.steps % self.frame_interval:
+            return
+        def agents(pool):
+            slots = pool.live()
+            return np.hstack([pool.positions[slots], pool.velocities[slots]]).astype(np.float32)
+
+        header = FRAME_HEADER.pack(sim.generation, sim.steps, len(sim.prey_pool), len(sim.predator_pool), len(sim.food))
+        self.write_record(FRAME, header + b"".join([
+            agents(sim.prey_pool).tobytes(),
+            agents(sim.predator_pool).tobytes(),
+            sim.food.live_positions().astype(np.float32).tobytes(),
+        ]))
+
+    def close(self):
+        self.file.close()
+
+class Replayer:
+    """Reads a recording. Only record offsets are indexed up front; payloads
+    are read on demand, so opening large recordings is cheap."""
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        if self.file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a simulation recording")
+
+        self.config = None
+        keyframes, frames = [], []
+        while True:
+            header = self.file.read(RECORD_HEADER.size)
+            if len(header) < RECORD_HEADER.size:
+                break
+            kind, length = RECORD_HEADER.unpack(header)
+            offset = self.file.tell()
+            if kind == CONFIG:
+                self.config = json.loads(self.file.read(length))
+            elif kind == KEYFRAME:
+                keyframes.append(offset)
+            elif kind == FRAME:
+                generation, step = struct.unpack("<II", self.file.read(8))
+                frames.append((generation, step, offset))
+            self.file.seek(offset + length)
+
+        self.keyframe_offsets = keyframes
+        self.frame_index = np.array(frames, dtype=np.int64).reshape(-1, 3)
+
+    def __len__(self):
+        return len(self.frame_index)
+
+    def read_payload(self, offset):
+        self.file.seek(offset - RECORD_HEADER.size)
+        _, length = RECORD_HEADER.unpack(self.file.read(RECORD_HEADER.size))
+        return self.file.read(length)
+
+    def keyframe(self, index):
+        return unpack_arrays(self.read_payload(self.keyframe_offsets[index]))
+
+    def generations(self):
+        return sorted({int(g) for g in self.frame_index[:, 0]} |
+                      {self.keyframe(i)[0]["generation"] for i in range(len(self.keyframe_offsets))})
+
+    def frame(self, index):
+        """One recorded step, in the same shape as Simulation.get_state."""
+        payload = self.read_payload(int(self.frame_index[index, 2]))
+        generation, step, n_prey, n_predators, n_food = FRAME_HEADER.unpack_from(payload)
+        data = np.frombuffer(payload, np.float32, offset=FRAME_HEADER.size)
+        prey = data[:n_prey * 4].reshape(-1, 4)
+        predators = data[n_prey * 4:(n_prey + n_predators) * 4].reshape(-1, 4)
+        food = data[(n_prey + n_predators) * 4:].reshape(-1, 2)
+
+        def agents(rows, kind):
+            return [
+                {"id": f"{kind}-{i}", "x": float(x), "y": float(y), "vx": float(vx), "vy": float(vy), "type": kind}
+                for i, (x, y, vx, vy) in enumerate(rows)
+            ]
+
+        return {
+            "generation": generation,
+            "steps": step,
+            "prey": agents(prey, "Prey"),
+            "predators": agents(predators, "Predator"),
+            "food": [{"x": float(x), "y": float(y)} for x, y in food]
+        }
+
+    def simulation_at(self, generation):
+        """A Simulation restored from the first keyframe of `generation`."""
+        from .simulation import Simulation
+        for i in range(len(self.keyframe_offsets)):
+            meta, arrays = self.keyframe(i)
+            if meta["generation"] == generation:
+                sim = Simulation(**self.config)
+                sim.restore(meta, arrays)
+                return sim
+        raise KeyError(f"No keyframe for generation {generation}")
+
+    def replay_generation(self, generation):
+        """Re-runs a generation headlessly at full speed and returns the simulation at its end."""
+        sim = self.simulation_at(generation)
+        while sim.steps < sim.max_steps_per_gen:
+            sim.update()
+        return sim
+
+    def close(self):
+        self.file.close()
@@ -0,0 +1,123 @@
+import numpy as np
+
+class SpatialGrid:
+    """Uniform grid of buckets over the world.
+
+    Items are sorted by cell once per step, so neighbourhood queries for many
+    points at once only look at the cells around each point instead of at
+    every item.
+    """
+    def __init__(self, positions, cell_size, width, height):
+        self.positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        self.cell_size = float(cell_size)
+        self.cols = max(1, int(np.ceil(width / self.cell_size)))
+        self.rows = max(1, int(np.ceil(height / self.cell_size)))
+
+        cx, cy = self.cell_coords(self.positions)
+        cells = cy * self.cols + cx
+        self.order = np.argsort(cells, kind="stable")
+        self.counts = np.bincount(cells, minlength=self.cols * self.rows)
+        self.starts = np.cumsum(self.counts) - self.counts
+
+    def __len__(self):
+        return len(self.positions)
+
+    def cell_coords(self, points):
+        cx = np.clip((points[:, 0] // self.cell_size).astype(np.intp), 0, self.cols - 1)
+        cy = np.clip((points[:, 1] // self.cell_size).astype(np.intp), 0, self.rows - 1)
+        return cx, cy
+
+    def candidates(self, points, reach=1):
+        """(point_idx, item_idx) for every item in the cells within `reach` cells of each point."""
+        cx, cy = self.cell_coords(points)
+        offsets = np.arange(-reach, reach + 1)
+        ncx = cx[:, None, None] + offsets[None, :, None]
+        ncy = cy[:, None, None] + offsets[None, None, :]
+        ncx, ncy = np.broadcast_arrays(ncx, ncy)
+        valid = (ncx >= 0) & (ncx < self.cols) & (ncy >= 0) & (ncy < self.rows)
+
+        point_idx = np.broadcast_to(np.arange(len(points))[:, None, None], ncx.shape)[valid]
+        cells = (ncy * self.cols + ncx)[valid]
+        counts = self.counts[cells]
+        # One pair per item stored in each (point, cell)
+        return np.repeat(point_idx, counts), self.items_in_cells(cells)
+
+    def items_in_cells(self, cells):
+        """Indices of the items stored in each of `cells`, cell after cell."""
+        counts = self.counts[cells]
+        total = counts.sum()
+        run_starts = np.repeat(np.cumsum(counts) - counts, counts)
+        slots = np.repeat(self.starts[cells], counts) + np.arange(total) - run_starts
+        return self.order[slots]
+
+    def query_rect(self, x0, y0, x1, y1):
+        """Indices (ascending) of the items inside the rectangle [x0, x1] x [y0, y1]."""
+        corners = np.array([[x0, y0], [x1, y1]], dtype=float)
+        (cx0, cx1), (cy0, cy1) = self.cell_coords(corners)
+        cells = (np.arange(cy0, cy1 + 1)[:, None] * self.cols + np.arange(cx0, cx1 + 1)).ravel()
+        items = self.items_in_cells(cells)
+        p = self.positions[items]
+        inside = (p[:, 0] >= x0) & (p[:, 0] <= x1) & (p[:, 1] >= y0) & (p[:, 1] <= y1)
+        return np.sort(items[inside])
+
+    def query_radius(self, points, radius):
+        """All (point, item) pairs closer than `radius`, with their offset and distance."""
+        point_idx, item_idx = self.candidates(points, int(np.ceil(radius / self.cell_size)))
+        delta = self.positions[item_idx] - points[point_idx]
+        dist = np.hypot(delta[:, 0], delta[:, 1])
+        keep = dist < radius
+        return point_idx[keep], item_idx[keep], delta[keep], dist[keep]
+
+    def nearest(self, points, chunk_size=1_000_000):
+        """Index of (and distance to) the nearest item for each point, -1/inf if there are none."""
+        n = len(points)
+        nearest_idx = np.full(n, -1, dtype=np.intp)
+        nearest_dist = np.full(n, np.inf)
+        if n == 0 or len(self.positions) == 0:
+            return nearest_idx, nearest_dist
+
+        point_idx, item_idx = self.candidates(points, 1)
+        if len(point_idx):
+            delta = self.positions[item_idx] - points[point_idx]
+            dist = np.hypot(delta[:, 0], delta[:, 1])
+            # First pair per point after sorting by distance (ties go to the lower item index)
+            order = np.lexsort((item_idx, dist, point_idx))
+            sorted_points = point_idx[order]
+            first = order[np.r_[True, sorted_points[1:] != sorted_points[:-1]]]
+            nearest_idx[point_idx[first]] = item_idx[first]
+            nearest_dist[point_idx[first]] = dist[first]
+
+        # Items outside the 3x3 block are at least one cell away, so only points
+        # without a hit that close need the brute force search
+        unsure = np.flatnonzero(nearest_dist > self.cell_size)
+        rows_per_chunk = max(1, chunk_size // len(self.positions))
+        for start in range(0, len(unsure), rows_per_chunk):
+            chunk = unsure[start:start + rows_per_chunk]
+            delta = self.positions[None, :, :] - points[chunk, None, :]
+            dist = np.hypot(delta[..., 0], delta[..., 1])
+            best = np.argmin(dist, axis=1)
+            nearest_idx[chunk] = best
+            nearest_dist[chunk] = dist[np.arange(len(chunk)), best]
+        return nearest_idx, nearest_dist
+
+class SectorSensor:
+    """Splits the area around an agent into equal angular sectors relative to its
+    heading and reports, per sector, how close the nearest entity is
+    (1 = touching, 0 = nothing within range)."""
+    def __init__(self, sectors, sensor_range):
+        self.sectors = sectors
+        self.sensor_range = float(sensor_range)
+
+    def sense(self, positions, headings, grid):
+        n = len(positions)
+        readings = np.zeros(n * self.sectors)
+        if n == 0 or self.sectors == 0 or len(grid) == 0:
+            return readings.reshape(n, self.sectors)
+
+        point_idx, _, delta, dist = grid.query_radius(positions, self.sensor_range)
+        angle = np.arctan2(delta[:, 1], delta[:, 0]) - headings[point_idx]
+        sector = (np.mod(angle, 2 * np.pi) * (self.sectors / (2 * np.pi))).astype(np.intp)
+        np.minimum(sector, self.sectors - 1, out=sector)
+
+        np.maximum.at(readings, point_idx * self.sectors + sector, 1.0 - dist / self.sensor_range)
+        return readings.reshape(n, self.sectors)
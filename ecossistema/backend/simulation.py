@@ -1,40 +1,97 @@
 import numpy as np
-import random
-from .agents import Prey, Predator
+from .agents import Prey, Predator, NeuralNetwork
 from .evolution import Evolution
+from .pools import FoodPool, AgentPool
+from .recorder import Recorder
+from .sensors import SpatialGrid, SectorSensor
+from .state_view import KINDS, StateIndex, density_cells
+from instrumentation import timer, rate
+
+STEP_RATE = rate("simulation_steps_per_second", "Simulation steps per second")
+GENERATION_RATE = rate("generations_per_second", "Generations per second")
+
+def unit_vectors(delta):
+    # Direction vectors, left as-is where the distance is zero
+    dist = np.hypot(delta[:, 0], delta[:, 1])
+    safe = np.where(dist > 0, dist, 1.0)
+    return delta / safe[:, None]
 
 class Simulation:
-    def __init__(self, width=800, height=600, n_prey=20, n_predators=5):
+    def __init__(self, width=800, height=600, n_prey=20, n_predators=5,
+                 prey_hidden=(8,), predator_hidden=(8,), sensor_sectors=0, sensor_range=100.0, seed=None):
+        # Constructor arguments, stored so recordings can rebuild the same simulation
+        self.config = {
+            "width": width, "height": height, "n_prey": n_prey, "n_predators": n_predators,
+            "prey_hidden": list(prey_hidden), "predator_hidden": list(predator_hidden),
+            "sensor_sectors": sensor_sectors, "sensor_range": sensor_range, "seed": seed
+        }
+        # All randomness goes through this generator, so a seeded run is reproducible
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        self.recorder = None
+
         self.width = width
         self.height = height
         self.n_prey = n_prey
         self.n_predators = n_predators
+
+        # Brains: hidden layer widths per species, plus optional sector sensors
+        # that add SENSOR_CHANNELS inputs per sector
+        self.prey_layout = Prey.brain_layout(prey_hidden, sensor_sectors)
+        self.predator_layout = Predator.brain_layout(predator_hidden, sensor_sectors)
+        self.sensor = SectorSensor(sensor_sectors, sensor_range)
         
+        # Every agent of the current generation, dead ones included (evolution
+        # needs their fitness); the pools track which are still alive
         self.prey = []
         self.predators = []
-        self.food = []
+        self.prey_pool = AgentPool(n_prey, NeuralNetwork.genome_length(self.layout_sizes(self.prey_layout)))
+        self.predator_pool = AgentPool(n_predators, NeuralNetwork.genome_length(self.layout_sizes(self.predator_layout)))
         self.food_spawn_rate = 0.1
         self.max_food = 50
+        self.food = FoodPool(self.max_food)
+        # Spatial index for viewport state queries, rebuilt after the world changes
+        self.state_index = None
         
         self.generation = 1
         self.steps = 0
         self.max_steps_per_gen = 2000
         
-        self.evolution = Evolution(mutation_rate=0.1)
+        self.evolution = Evolution(mutation_rate=0.1, rng=self.rng)
         
         self.reset()
 
-    def reset(self):
-        self.prey = [Prey(random.uniform(0, self.width), random.uniform(0, self.height)) for _ in range(self.n_prey)]
-        self.predators = [Predator(random.uniform(0, self.width), random.uniform(0, self.height)) for _ in range(self.n_predators)]
-        self.food = []
+    def reset(self, seed=None):
+        if seed is not None:
+            self.seed = self.config["seed"] = seed
+            self.rng = self.evolution.rng = np.random.default_rng(seed)
+
+        self.prey = [self.new_agent(Prey, self.prey_layout) for _ in range(self.n_prey)]
+        self.predators = [self.new_agent(Predator, self.predator_layout) for _ in range(self.n_predators)]
+        self.prey_pool.fill(self.prey)
+        self.predator_pool.fill(self.predators)
+        self.food.clear()
         for _ in range(20):
             self.spawn_food()
         self.steps = 0
+        self.state_index = None
+
+        if self.recorder:
+            self.recorder.write_keyframe(self)
+
+    @staticmethod
+    def layout_sizes(layout):
+        input_size, hidden_sizes, output_size = layout
+        return (input_size, *hidden_sizes, output_size)
+
+    def new_agent(self, agent_class, layout):
+        x, y = self.rng.uniform(0, self.width), self.rng.uniform(0, self.height)
+        return agent_class(x, y, brain=NeuralNetwork(*layout, rng=self.rng), rng=self.rng)
 
     def spawn_food(self):
         if len(self.food) < self.max_food:
-            self.food.append(np.array([random.uniform(0, self.width), random.uniform(0, self.height)]))
+            self.food.grow(self.max_food)
+            self.food.spawn(self.rng.uniform(0, self.width), self.rng.uniform(0, self.height))
 
     def update(self):
         if self.steps >= self.max_steps_per_gen:
@@ -42,92 +99,230 @@ class Simulation:
             return
 
         self.steps += 1
+        self.state_index = None
         
         # Spawn food
-        if random.random() < self.food_spawn_rate:
+        if self.rng.random() < self.food_spawn_rate:
             self.spawn_food()
 
+        # Sensing and thinking run for every agent of a species at once: positions
+        # go into spatial grids, and all brains are evaluated in one batched pass.
+        # Cell size matches the sensor range so sector queries only touch 3x3 cells.
+        cell_size = max(self.sensor.sensor_range, 1.0)
+
         # Update Prey
-        for p in self.prey:
-            if not p.alive: continue
-            
-            # Find closest predator
-            closest_pred = None
-            min_dist = float('inf')
-            for pred in self.predators:
-                if not pred.alive: continue
-                dist = np.linalg.norm(p.position - pred.position)
-                if dist < min_dist:
-                    min_dist = dist
-                    closest_pred = pred
-            
-            # Find closest food
-            closest_food = None
-            min_dist_food = float('inf')
-            for f in self.food:
-                dist = np.linalg.norm(p.position - f)
-                if dist < min_dist_food:
-                    min_dist_food = dist
-                    closest_food = f
-            
-            p.think(closest_pred, closest_food)
-            p.update(self.width, self.height)
-            
+        # Only live slots are visited; slot arrays are copied because agents
+        # dying during the step release their slots
+        prey_slots = self.prey_pool.live().copy()
+        predator_slots = self.predator_pool.live().copy()
+        if len(prey_slots):
+            prey = self.prey_pool.live_agents(prey_slots)
+            with timer("sense"):
+                prey_pos = self.prey_pool.positions[prey_slots]
+                predator_grid = SpatialGrid(self.predator_pool.positions[predator_slots], cell_size, self.width, self.height)
+                food_grid = SpatialGrid(self.food.live_positions(), cell_size, self.width, self.height)
+
+                inputs = [np.zeros((len(prey), 2)), np.zeros((len(prey), 2))]
+                # Vector to closest predator
+                idx, _ = predator_grid.nearest(prey_pos)
+                found = idx >= 0
+                inputs[0][found] = unit_vectors(predator_grid.positions[idx[found]] - prey_pos[found])
+                # Vector to closest food
+                idx, _ = food_grid.nearest(prey_pos)
+                found = idx >= 0
+                inputs[1][found] = unit_vectors(food_grid.positions[idx[found]] - prey_pos[found])
+
+                if self.sensor.sectors:
+                    velocities = self.prey_pool.velocities[prey_slots]
+                    headings = np.arctan2(velocities[:, 1], velocities[:, 0])
+                    inputs.append(self.sensor.sense(prey_pos, headings, predator_grid))
+                    inputs.append(self.sensor.sense(prey_pos, headings, food_grid))
+
+            with timer("think"):
+                outputs = NeuralNetwork.forward_batch(prey[0].brain.layer_sizes, self.prey_pool.genomes[prey_slots], np.hstack(inputs))
+            with timer("move"):
+                for p, force in zip(prey, outputs):
+                    # Output is force vector
+                    p.apply_force(force * p.max_force)
+                    p.update(self.width, self.height)
+
             # Eat food
-            # Check collision with food
-            # Simple collision check
-            for i in range(len(self.food) - 1, -1, -1):
-                if np.linalg.norm(p.position - self.food[i]) < p.radius + 5:
-                    p.eat()
-                    self.food.pop(i)
+            # Each food item goes to the first prey touching it
+            if len(self.food):
+                food_slots = self.food.live()
+                prey_pos = self.prey_pool.positions[prey_slots]
+                eat_grid = SpatialGrid(self.food.positions[food_slots], cell_size, self.width, self.height)
+                radii = np.array([p.radius for p in prey])
+                pairs, items, _, dist = eat_grid.query_radius(prey_pos, radii.max() + 5)
+                touching = dist < radii[pairs] + 5
+                pairs, items = pairs[touching], items[touching]
+                order = np.lexsort((pairs, items))
+                first = order[np.r_[True, items[order][1:] != items[order][:-1]]] if len(order) else order
+                for i in pairs[first]:
+                    prey[i].eat()
+                for slot in food_slots[items[first]].tolist():
+                    self.food.release(slot)
+
+            for slot, p in zip(prey_slots.tolist(), prey):
+                if not p.alive:
+                    self.prey_pool.release(slot)
 
         # Update Predators
-        for pred in self.predators:
-            if not pred.alive: continue
-            
-            # Find closest prey
-            closest_prey = None
-            min_dist = float('inf')
-            for p in self.prey:
-                if not p.alive: continue
-                dist = np.linalg.norm(pred.position - p.position)
-                if dist < min_dist:
-                    min_dist = dist
-                    closest_prey = p
-            
-            pred.think(closest_prey)
-            pred.update(self.width, self.height)
-            
-            # Eat Prey
-            if closest_prey and min_dist < pred.radius + closest_prey.radius:
-                pred.eat()
-                closest_prey.alive = False
-
-        # Remove dead agents? No, keep them for stats until end of gen?
-        # Actually, we can just ignore them in update loop (which we do)
+        prey_slots = self.prey_pool.live().copy()
+        if len(predator_slots):
+            predators = self.predator_pool.live_agents(predator_slots)
+            prey = self.prey_pool.live_agents(prey_slots)
+            with timer("sense"):
+                pred_pos = self.predator_pool.positions[predator_slots]
+                prey_grid = SpatialGrid(self.prey_pool.positions[prey_slots], cell_size, self.width, self.height)
+
+                # Find closest prey
+                idx, min_dist = prey_grid.nearest(pred_pos)
+                found = idx >= 0
+                inputs = [np.zeros((len(predators), 2))]
+                inputs[0][found] = unit_vectors(prey_grid.positions[idx[found]] - pred_pos[found])
+
+                if self.sensor.sectors:
+                    velocities = self.predator_pool.velocities[predator_slots]
+                    headings = np.arctan2(velocities[:, 1], velocities[:, 0])
+                    inputs.append(self.sensor.sense(pred_pos, headings, prey_grid))
+
+            with timer("think"):
+                outputs = NeuralNetwork.forward_batch(predators[0].brain.layer_sizes, self.predator_pool.genomes[predator_slots], np.hstack(inputs))
+            with timer("move"):
+                for k, pred in enumerate(predators):
+                    pred.apply_force(outputs[k] * pred.max_force)
+                    pred.update(self.width, self.height)
+                    if not pred.alive:
+                        self.predator_pool.release(predator_slots[k])
+
+                    # Eat Prey
+                    if found[k]:
+                        closest_prey = prey[idx[k]]
+                        if closest_prey.alive and min_dist[k] < pred.radius + closest_prey.radius:
+                            pred.eat()
+                            closest_prey.alive = False
+                            self.prey_pool.release(prey_slots[idx[k]])
+
+        if self.recorder:
+            self.recorder.write_frame(self)
+        STEP_RATE.tick()
 
     def evolve(self):
         print(f"Evolving Generation {self.generation}")
         
-        # Evolve Prey
-        self.prey = self.evolution.next_generation(self.prey, Prey, self.n_prey, self.width, self.height)
-        
-        # Evolve Predators
-        self.predators = self.evolution.next_generation(self.predators, Predator, self.n_predators, self.width, self.height)
+        with timer("evolve"):
+            # Evolve Prey
+            self.prey = self.evolution.next_generation(self.prey, Prey, self.n_prey, self.width, self.height, self.prey_layout)
+
+            # Evolve Predators
+            self.predators = self.evolution.next_generation(self.predators, Predator, self.n_predators, self.width, self.height, self.predator_layout)
+            self.prey_pool.fill(self.prey)
+            self.predator_pool.fill(self.predators)
+        GENERATION_RATE.tick()
         
         self.generation += 1
         self.steps = 0
-        self.food = [] # Reset food? Or keep it? Let's reset to fair start
+        self.food.clear() # Reset food? Or keep it? Let's reset to fair start
+        self.state_index = None
         for _ in range(20):
             self.spawn_food()
 
-    def get_state(self):
+        if self.recorder:
+            self.recorder.write_keyframe(self)
+
+    def start_recording(self, path, frames=True, frame_interval=1):
+        """Streams this run to `path`; see recorder.Recorder."""
+        self.stop_recording()
+        self.recorder = Recorder(path, self.config, frames, frame_interval)
+        self.recorder.write_keyframe(self)
+
+    def stop_recording(self):
+        if self.recorder:
+            self.recorder.close()
+            self.recorder = None
+
+    def snapshot(self):
+        """Full simulation state as (meta, arrays), enough to resume the run exactly."""
+        meta = {
+            "generation": self.generation,
+            "steps": self.steps,
+            "max_steps_per_gen": self.max_steps_per_gen,
+            "max_food": self.max_food,
+            "food_spawn_rate": self.food_spawn_rate,
+            "rng": self.rng.bit_generator.state
+        }
+        arrays = {"food": self.food.live_positions()}
+        for name, agent_class, layout in (("prey", Prey, self.prey_layout), ("predators", Predator, self.predator_layout)):
+            agents = getattr(self, name)
+            genome_size = NeuralNetwork.genome_length(self.layout_sizes(layout))
+            arrays[f"{name}.genome"] = np.array([a.brain.genome for a in agents], dtype=float).reshape(-1, genome_size)
+            for field in agent_class.STATE_FIELDS:
+                arrays[f"{name}.{field}"] = np.array([getattr(a, field) for a in agents])
+        return meta, arrays
+
+    def restore(self, meta, arrays):
+        for key in ("generation", "steps", "max_steps_per_gen", "max_food", "food_spawn_rate"):
+            setattr(self, key, meta[key])
+        self.food.clear()
+        self.food.grow(len(arrays["food"]))
+        for x, y in arrays["food"]:
+            self.food.spawn(x, y)
+        for name, agent_class, layout in (("prey", Prey, self.prey_layout), ("predators", Predator, self.predator_layout)):
+            agents = []
+            for i, genome in enumerate(arrays[f"{name}.genome"]):
+                agent = agent_class(0, 0, brain=NeuralNetwork(*layout, genome=genome.copy()))
+                for field in agent_class.STATE_FIELDS:
+                    value = arrays[f"{name}.{field}"][i]
+                    setattr(agent, field, value.copy() if value.ndim else value.item())
+                agents.append(agent)
+            setattr(self, name, agents)
+        self.prey_pool.fill(self.prey)
+        self.predator_pool.fill(self.predators)
+        self.state_index = None
+        # Restore the generator last: building agents above draws from it
+        self.rng.bit_generator.state = meta["rng"]
+
+    def get_state(self, viewport=None, max_entities=None):
+        """Live agents and food, for the viewer.
+
+        With a viewport (x, y, width, height) only entities inside it are
+        returned, found through a spatial index. With max_entities, dense
+        regions are summarized as density cells (see state_view.density_cells)
+        so the response never holds more than that many entries.
+        """
+        if viewport is None and max_entities is None:
+            return {
+                "generation": self.generation,
+                "steps": self.steps,
+                "prey": [p.get_state() for p in self.prey_pool.live_agents()],
+                "predators": [p.get_state() for p in self.predator_pool.live_agents()],
+                "food": [{"x": x, "y": y} for x, y in self.food.live_positions().tolist()]
+            }
+
+        if viewport is None:
+            viewport = (0, 0, self.width, self.height)
+        if self.state_index is None:
+            self.state_index = StateIndex(self)
+        found = self.state_index.query(*viewport)
+
+        cells = []
+        total = sum(len(slots) for slots, _ in found.values())
+        if max_entities is not None and total > max_entities:
+            individual, cells = density_cells(found, viewport, max_entities)
+            found = {kind: (slots[individual[kind]], positions[individual[kind]]) for kind, (slots, positions) in found.items()}
+
+        x, y, width, height = viewport
         return {
             "generation": self.generation,
             "steps": self.steps,
-            "prey": [p.get_state() for p in self.prey if p.alive],
-            "predators": [p.get_state() for p in self.predators if p.alive],
-            "food": [{"x": float(f[0]), "y": float(f[1])} for f in self.food]
+            "prey": [self.prey_pool.agents[s].get_state() for s in found["prey"][0].tolist()],
+            "predators": [self.predator_pool.agents[s].get_state() for s in found["predators"][0].tolist()],
+            "food": [{"x": fx, "y": fy} for fx, fy in found["food"][1].tolist()],
+            "density": cells,
+            "viewport": {"x": x, "y": y, "width": width, "height": height},
+            # Everything inside the viewport, including what the density cells summarize
+            "in_view": {kind: sum(c[kind] for c in cells) + len(found[kind][0]) for kind in KINDS}
         }
 
     def get_stats(self):
@@ -137,8 +332,8 @@ class Simulation:
         
         return {
             "generation": self.generation,
-            "prey_count": len([p for p in self.prey if p.alive]),
-            "predator_count": len([p for p in self.predators if p.alive]),
+            "prey_count": len(self.prey_pool),
+            "predator_count": len(self.predator_pool),
             "avg_fitness_prey": float(avg_fitness_prey),
             "avg_fitness_pred": float(avg_fitness_pred)
         }
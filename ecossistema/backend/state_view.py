@@ -0,0 +1,86 @@
+import numpy as np
+from .sensors import SpatialGrid
+
+# Entity kinds in the order their counts are reported for density cells
+KINDS = ("prey", "predators", "food")
+# The state index splits the world into about this many cells per side
+INDEX_CELLS = 32
+
+class StateIndex:
+    """Spatial grids over the live prey, predators and food of one step.
+
+    Built on the first viewport query after the simulation changed and then
+    reused, so polling clients with different viewports share one index.
+    """
+    def __init__(self, sim):
+        cell_size = max(sim.width, sim.height, 1) / INDEX_CELLS
+        self.slots = {
+            "prey": sim.prey_pool.live(),
+            "predators": sim.predator_pool.live(),
+            "food": sim.food.live()
+        }
+        self.grids = {
+            "prey": SpatialGrid(sim.prey_pool.positions[self.slots["prey"]], cell_size, sim.width, sim.height),
+            "predators": SpatialGrid(sim.predator_pool.positions[self.slots["predators"]], cell_size, sim.width, sim.height),
+            "food": SpatialGrid(sim.food.positions[self.slots["food"]], cell_size, sim.width, sim.height)
+        }
+
+    def query(self, x, y, width, height):
+        """Per kind, (pool slots, positions) of the entities inside the viewport."""
+        found = {}
+        for kind in KINDS:
+            grid = self.grids[kind]
+            items = grid.query_rect(x, y, x + width, y + height)
+            found[kind] = (self.slots[kind][items], grid.positions[items])
+        return found
+
+def density_cells(found, viewport, max_entities):
+    """Splits the viewport into a grid of at most max(1, max_entities // 4)
+    cells and decides which cells are sent entity by entity and which as one
+    density cell with per-kind counts.
+
+    Every cell starts aggregated (costing one entry of the budget); the
+    sparsest cells are then expanded into their entities while the total
+    stays within max_entities, so dense regions are the ones summarized.
+    Returns a per-kind mask of the entities to send individually and the
+    list of density cells.
+    """
+    x, y, width, height = viewport
+    n_cells = max(1, max_entities // 4)
+    # Cells about as wide as they are high, but never more than n_cells of them
+    aspect = width / height if height > 0 else n_cells
+    cols = int(np.clip(round(np.sqrt(n_cells * aspect)), 1, n_cells))
+    rows = max(1, n_cells // cols)
+    cell_width, cell_height = width / cols, height / rows
+
+    cell_of = {}
+    counts = np.zeros((len(KINDS), rows * cols), dtype=np.int64)
+    for k, kind in enumerate(KINDS):
+        positions = found[kind][1]
+        cx = np.zeros(len(positions), dtype=np.intp)
+        cy = np.zeros(len(positions), dtype=np.intp)
+        if cell_width > 0:
+            cx = np.clip(((positions[:, 0] - x) // cell_width).astype(np.intp), 0, cols - 1)
+        if cell_height > 0:
+            cy = np.clip(((positions[:, 1] - y) // cell_height).astype(np.intp), 0, rows - 1)
+        cell_of[kind] = cy * cols + cx
+        counts[k] = np.bincount(cell_of[kind], minlength=rows * cols)
+
+    totals = counts.sum(axis=0)
+    occupied = np.flatnonzero(totals)
+    # Expanding a cell of n entities adds n - 1 entries; the running cost only
+    # grows, so the cells that fit are a prefix of the sparsest-first order
+    order = occupied[np.argsort(totals[occupied], kind="stable")]
+    fits = len(occupied) + np.cumsum(totals[order] - 1) <= max_entities
+    expanded = np.zeros(rows * cols, dtype=bool)
+    expanded[order[fits]] = True
+
+    cells = []
+    for cell in occupied[~expanded[occupied]]:
+        cy, cx = divmod(int(cell), cols)
+        cells.append({
+            "x": float(x + cx * cell_width), "y": float(y + cy * cell_height),
+            "width": float(cell_width), "height": float(cell_height),
+            **{kind: int(counts[k, cell]) for k, kind in enumerate(KINDS)}
+        })
+    return {kind: expanded[cell_of[kind]] for kind in KINDS}, cells
@@ -0,0 +1,47 @@
+"""Steps/sec of Simulation.update for different sensor sector counts and hidden layer sizes.
+
+Run from the ecossistema directory:
+    python benchmarks/bench_brains.py --prey 200 --predators 50 --steps 300
+"""
+import argparse
+import os
+import sys
+import time
+
+# Add project root and repository root (shared evolution_core/instrumentation) to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend.simulation import Simulation
+
+def steps_per_second(steps, **kwargs):
+    sim = Simulation(**kwargs)
+    sim.max_food = kwargs["n_prey"] * 2
+    sim.max_steps_per_gen = steps + 1 # Keep evolution out of the measurement
+    sim.update() # Warm up
+    start = time.perf_counter()
+    for _ in range(steps):
+        sim.update()
+    return steps / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--prey", type=int, default=200)
+    parser.add_argument("--predators", type=int, default=50)
+    parser.add_argument("--steps", type=int, default=300)
+    parser.add_argument("--sectors", type=int, nargs="+", default=[0, 4, 8, 16, 32])
+    parser.add_argument("--hidden", type=int, nargs="+", default=[8, 32, 128])
+    args = parser.parse_args()
+
+    print(f"prey={args.prey} predators={args.predators} steps={args.steps}")
+    print(f"{'sectors':>8} {'hidden':>8} {'steps/sec':>10}")
+    for sectors in args.sectors:
+        for hidden in args.hidden:
+            rate = steps_per_second(
+                args.steps, n_prey=args.prey, n_predators=args.predators,
+                prey_hidden=(hidden,), predator_hidden=(hidden,), sensor_sectors=sectors
+            )
+            print(f"{sectors:>8} {hidden:>8} {rate:>10.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""How Simulation.update, evolve and get_state scale with agent/food counts and world size.
+
+Every case is seeded, so runs are comparable over time. Run from the ecossistema directory:
+    python benchmarks/bench_scaling.py --worlds 800x600 3200x2400 --counts 20,5,50 2000,500,5000 --json scaling.json
+Writing the results to benchmarks/baseline.json makes them the reference for
+the performance regression tests (python -m pytest --performance); the stored
+baseline was made with
+    python benchmarks/bench_scaling.py --worlds 1600x1200 --counts 200,50,500 1000,250,2500 --repeats 5 --json benchmarks/baseline.json
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import sys
+import time
+import numpy as np
+
+# Add project root and repository root (shared evolution_core/instrumentation) to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend.simulation import Simulation
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+# Keys of a result row that are run_case arguments; the rest are measurements
+CASE_PARAMS = ("width", "height", "prey", "predators", "food", "steps", "repeats", "seed")
+
+@contextlib.contextmanager
+def gc_paused():
+    # Like timeit: evolve and update allocate many objects, and where a
+    # collection lands would otherwise vary from run to run
+    enabled = gc.isenabled()
+    gc.collect()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+def best_time(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        with gc_paused():
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+    return min(times)
+
+def calibration_workload():
+    """Fixed work that does not touch the simulation code. Its time tells how
+    fast the machine is running right now; like evolve and get_state it
+    mostly creates small Python objects, which is what slows down the most
+    when a shared machine is busy."""
+    return [json.dumps([{"id": str(i), "x": float(i), "y": i * 0.5} for i in range(3000)]) for _ in range(3)]
+
+def measure(run, repeats):
+    """Calls run() (which returns the seconds of one timed run) `repeats`
+    times. Returns the best time and the best ratio of a run's time to the
+    calibration workload timed right before it (best of 3); the ratio stays
+    comparable when the machine as a whole runs slower for a while."""
+    best = relative = float("inf")
+    for _ in range(repeats):
+        calibration = best_time(calibration_workload, 3)
+        seconds = run()
+        best = min(best, seconds)
+        relative = min(relative, seconds / calibration)
+    return best, relative
+
+def make_simulation(width, height, prey, predators, food, steps, seed):
+    sim = Simulation(width, height, prey, predators, seed=seed)
+    sim.max_food = food
+    sim.max_steps_per_gen = steps + 1 # Keep evolution out of the update measurement
+    while len(sim.food) < food:
+        sim.spawn_food()
+    sim.update() # Warm up
+    return sim
+
+def run_case(width, height, prey, predators, food, steps=100, repeats=3, seed=0):
+    """Times one configuration; returns the measurements together with the
+    parameters (CASE_PARAMS), so a stored result row can be rerun. Every
+    timing is the best of `repeats` runs; "relative" holds the same timings
+    in units of the calibration workload (see measure)."""
+    sim = make_simulation(width, height, prey, predators, food, steps, seed)
+    # State is measured first, while every entity is still there
+    state, state_relative = measure(lambda: best_time(sim.get_state, 1), repeats)
+    serialize, serialize_relative = measure(lambda: best_time(lambda: json.dumps(sim.get_state()), 1), repeats)
+
+    # Each run steps a fresh simulation with the same seed, so all runs do the same work
+    def run_steps():
+        nonlocal sim
+        sim = make_simulation(width, height, prey, predators, food, steps, seed)
+        return best_time(lambda: [sim.update() for _ in range(steps)], 1)
+    update, update_relative = measure(run_steps, repeats)
+    # Predators thin out the prey quickly in crowded worlds, so also report what is left
+    stats = sim.get_stats()
+
+    with contextlib.redirect_stdout(io.StringIO()): # evolve prints the generation
+        evolve, evolve_relative = measure(lambda: best_time(sim.evolve, 1), repeats)
+
+    return {
+        "width": width, "height": height, "prey": prey, "predators": predators, "food": food,
+        "steps": steps, "repeats": repeats, "seed": seed,
+        "steps_per_sec": steps / update,
+        "evolve_seconds": evolve,
+        "get_state_seconds": state,
+        "serialize_seconds": serialize,
+        "relative": {
+            "update_seconds": update_relative,
+            "evolve_seconds": evolve_relative,
+            "get_state_seconds": state_relative,
+            "serialize_seconds": serialize_relative
+        },
+        "prey_left": stats["prey_count"],
+        "predators_left": stats["predator_count"]
+    }
+
+def parse_world(text):
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+def parse_counts(text):
+    prey, predators, food = text.split(",")
+    return int(prey), int(predators), int(food)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--worlds", type=parse_world, nargs="+", default=[(800, 600), (1600, 1200), (3200, 2400)],
+                        help="World sizes as WIDTHxHEIGHT")
+    parser.add_argument("--counts", type=parse_counts, nargs="+", default=[(20, 5, 50), (200, 50, 500), (2000, 500, 5000)],
+                        help="Entity counts as PREY,PREDATORS,FOOD")
+    parser.add_argument("--steps", type=int, default=100)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'world':>10} {'prey':>6} {'pred':>6} {'food':>6} {'steps/s':>9} {'evolve':>9} {'get_state':>10} {'serialize':>10}")
+    for width, height in args.worlds:
+        for prey, predators, food in args.counts:
+            row = run_case(width, height, prey, predators, food, args.steps, args.repeats, args.seed)
+            results.append(row)
+            print(f"{f'{width}x{height}':>10} {prey:>6} {predators:>6} {food:>6} {row['steps_per_sec']:>9.1f} "
+                  f"{row['evolve_seconds']:>9.4f} {row['get_state_seconds']:>10.4f} {row['serialize_seconds']:>10.4f}")
+
+    if args.json:
+        report = {
+            "benchmark": "ecossistema scaling",
+            "config": {k: v for k, v in vars(args).items() if k != "json"},
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "results": results
+        }
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,12 @@
 let prey = [];
 let predators = [];
 let food = [];
+let density = []; // Regions the server summarized instead of sending every entity
+const MAX_ENTITIES = 3000; // Entity budget per state request
 let selectedAgentId = null;
 let selectedAgentData = null;
 let canvas;
+let replayName = null; // When set, frames come from a recording instead of the live simulation
 
 function setup() {
     let container = document.getElementById('canvas-container');
@@ -17,6 +20,13 @@ function setup() {
     document.getElementById('pauseBtn').onclick = () => fetch('/simulation/pause', { method: 'POST' });
     document.getElementById('resetBtn').onclick = () => fetch('/simulation/reset', { method: 'POST' });
     
+    document.getElementById('replayLoadBtn').onclick = loadReplay;
+    document.getElementById('replayExitBtn').onclick = () => {
+        replayName = null;
+        document.getElementById('replaySlider').disabled = true;
+    };
+    document.getElementById('replaySlider').oninput = (e) => fetchReplayFrame(e.target.value);
+    
     // Poll stats occasionally
     setInterval(fetchStats, 1000);
 }
@@ -25,8 +35,18 @@ function draw() {
     background(20);
     
     // Fetch state
-    fetchState();
+    if (!replayName) {
+        fetchState();
+    }
     
+    // Draw density cells, shaded by how many entities they hold
+    noStroke();
+    for (let c of density) {
+        let count = c.prey + c.predators + c.food;
+        fill(255, 255, 255, min(200, 20 + count * 4));
+        rect(c.x, c.y, c.width, c.height);
+    }
+
     // Draw Food
     noStroke();
     fill(100, 255, 100, 150);
@@ -70,16 +90,48 @@ function draw() {
 
 async function fetchState() {
     try {
-        let response = await fetch('/simulation/state');
+        let response = await fetch(`/simulation/state?x=0&y=0&width=${width}&height=${height}&max_entities=${MAX_ENTITIES}`);
         let data = await response.json();
         prey = data.prey;
         predators = data.predators;
         food = data.food;
+        density = data.density || [];
     } catch (e) {
         console.error("Error fetching state:", e);
     }
 }
 
+async function loadReplay() {
+    let name = document.getElementById('replayName').value;
+    try {
+        let response = await fetch('/replay/' + encodeURIComponent(name));
+        if (!response.ok) return;
+        let data = await response.json();
+        replayName = name;
+        let slider = document.getElementById('replaySlider');
+        slider.max = Math.max(0, data.frames - 1);
+        slider.value = 0;
+        slider.disabled = false;
+        fetchReplayFrame(0);
+    } catch (e) {
+        console.error("Error loading replay:", e);
+    }
+}
+
+async function fetchReplayFrame(index) {
+    try {
+        let response = await fetch(`/replay/${encodeURIComponent(replayName)}/frame/${index}`);
+        let data = await response.json();
+        prey = data.prey;
+        predators = data.predators;
+        food = data.food;
+        density = [];
+        document.getElementById('replayFrame').innerText = `gen ${data.generation}, step ${data.steps}`;
+    } catch (e) {
+        console.error("Error fetching replay frame:", e);
+    }
+}
+
 async function fetchStats() {
     try {
         let response = await fetch('/simulation/stats');
@@ -145,8 +197,12 @@ function drawBrain(brain) {
     let h = 200;
     let svg = `<svg width="${w}" height="${h}">`;
     
-    let layerGap = w / 3;
-    let nodeGap = 20;
+    // Older responses only describe a single hidden layer
+    let sizes = brain.layer_sizes || [brain.input_size, brain.hidden_size, brain.output_size];
+    let layers = brain.layers || [{weights: brain.weights_ih}, {weights: brain.weights_ho}];
+    
+    let layerGap = w / sizes.length;
+    let nodeGap = Math.min(20, h / Math.max(...sizes));
     
     // Helper to get node pos
     function getNodePos(layer, index, total) {
@@ -155,27 +211,17 @@ function drawBrain(brain) {
         return {x, y};
     }
     
-    // Draw weights IH
-    for (let i = 0; i < brain.input_size; i++) {
-        for (let j = 0; j < brain.hidden_size; j++) {
-            let p1 = getNodePos(0, i, brain.input_size);
-            let p2 = getNodePos(1, j, brain.hidden_size);
-            let weight = brain.weights_ih[j][i];
-            let color = weight > 0 ? 'green' : 'red';
-            let width = Math.abs(weight) * 2;
-            svg += `<line x1="${p1.x}" y1="${p1.y}" x2="${p2.x}" y2="${p2.y}" stroke="${color}" stroke-width="${width}" opacity="0.5" />`;
-        }
-    }
-    
-    // Draw weights HO
-    for (let i = 0; i < brain.hidden_size; i++) {
-        for (let j = 0; j < brain.output_size; j++) {
-            let p1 = getNodePos(1, i, brain.hidden_size);
-            let p2 = getNodePos(2, j, brain.output_size);
-            let weight = brain.weights_ho[j][i];
-            let color = weight > 0 ? 'green' : 'red';
-            let width = Math.abs(weight) * 2;
-            svg += `<line x1="${p1.x}" y1="${p1.y}" x2="${p2.x}" y2="${p2.y}" stroke="${color}" stroke-width="${width}" opacity="0.5" />`;
+    // Draw weights between each pair of layers
+    for (let l = 0; l < layers.length; l++) {
+        for (let i = 0; i < sizes[l]; i++) {
+            for (let j = 0; j < sizes[l + 1]; j++) {
+                let p1 = getNodePos(l, i, sizes[l]);
+                let p2 = getNodePos(l + 1, j, sizes[l + 1]);
+                let weight = layers[l].weights[j][i];
+                let color = weight > 0 ? 'green' : 'red';
+                let width = Math.abs(weight) * 2;
+                svg += `<line x1="${p1.x}" y1="${p1.y}" x2="${p2.x}" y2="${p2.y}" stroke="${color}" stroke-width="${width}" opacity="0.5" />`;
+            }
         }
     }
     
@@ -187,9 +233,9 @@ function drawBrain(brain) {
         }
     }
     
-    drawNodes(0, brain.input_size);
-    drawNodes(1, brain.hidden_size);
-    drawNodes(2, brain.output_size);
+    for (let l = 0; l < sizes.length; l++) {
+        drawNodes(l, sizes[l]);
+    }
     
     svg += `</svg>`;
     container.innerHTML = svg;
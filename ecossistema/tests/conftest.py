@@ -0,0 +1,17 @@
+import pytest
+
+def pytest_addoption(parser):
+    parser.addoption("--performance", action="store_true",
+                     help="Run the performance regression tests against benchmarks/baseline.json")
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "performance: throughput regression test, only run with --performance")
+
+def pytest_collection_modifyitems(config, items):
+    # Timings depend on the machine, so these only run when asked for
+    if config.getoption("--performance"):
+        return
+    skip = pytest.mark.skip(reason="performance test, run with --performance")
+    for item in items:
+        if "performance" in item.keywords:
+            item.add_marker(skip)
@@ -0,0 +1,44 @@
+import sys
+import os
+import numpy as np
+
+# Add project root and repository root (shared evolution_core/instrumentation) to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend.agents import Prey
+from backend.evolution import Evolution
+
+def test_next_generation_genomes():
+    print("Testing vectorized evolution...")
+
+    agents = [Prey(0, 0) for _ in range(30)]
+    for i, a in enumerate(agents):
+        a.fitness = i
+    best = agents[-1].brain.genome.copy()
+
+    evo = Evolution(mutation_rate=0.5)
+    new_agents = evo.next_generation(agents, Prey, 50, 800, 600)
+
+    assert len(new_agents) == 50, "Population size should be respected"
+    assert np.array_equal(new_agents[0].brain.genome, best), "Best agent should be kept unchanged"
+
+    # Children must not alias each other or their parents
+    new_agents[1].brain.mutate(1.0)
+    assert np.array_equal(new_agents[0].brain.genome, best), "Elite should not share weights with other agents"
+    assert np.array_equal(agents[-1].brain.genome, best), "Parents should not be modified"
+
+    # Weight matrices are views of the genome
+    new_agents[2].brain.genome[0] = 42.0
+    assert new_agents[2].brain.weights_ih[0, 0] == 42.0, "Weights should be views into the genome"
+    print("PASS: Next generation built from genome matrix.")
+
+def test_blend_crossover_stays_between_parents():
+    evo = Evolution(mutation_rate=0.0, crossover="blend", elite_count=0)
+    genomes = np.vstack([np.zeros(10), np.ones(10)])
+    new_genomes = evo.evolve_genomes(genomes, np.array([1.0, 1.0]), 100)
+    assert new_genomes.min() >= 0.0 and new_genomes.max() <= 1.0, "Blend should interpolate between parents"
+
+if __name__ == "__main__":
+    test_next_generation_genomes()
+    test_blend_crossover_stays_between_parents()
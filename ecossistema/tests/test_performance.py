@@ -0,0 +1,43 @@
+import sys
+import os
+import json
+import pytest
+
+# Add project root and repository root (shared evolution_core/instrumentation) to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from benchmarks.bench_scaling import BASELINE_PATH, CASE_PARAMS, run_case
+
+# Allowed slowdown against the baseline before a test fails (0.25 = 25% less throughput)
+TOLERANCE = float(os.environ.get("PERF_TOLERANCE", "0.25"))
+# Timings compared; "update_seconds" is derived from steps_per_sec
+METRICS = ("update_seconds", "evolve_seconds", "serialize_seconds")
+
+def seconds(row, metric):
+    return row["steps"] / row["steps_per_sec"] if metric == "update_seconds" else row[metric]
+
+def baseline_cases():
+    if not os.path.exists(BASELINE_PATH):
+        return []
+    with open(BASELINE_PATH) as f:
+        return json.load(f)["results"]
+
+def case_id(case):
+    return f"{case['width']}x{case['height']}-{case['prey']}-{case['predators']}-{case['food']}"
+
+@pytest.mark.performance
+@pytest.mark.parametrize("baseline", baseline_cases(), ids=case_id)
+def test_throughput_has_not_regressed(baseline):
+    result = run_case(**{key: baseline[key] for key in CASE_PARAMS})
+    slower = []
+    for metric in METRICS:
+        # Shared machines slow down for minutes at a time. A real regression
+        # shows both in seconds and in units of the calibration workload (see
+        # bench_scaling.measure); noise rarely hits both, so both must be slower
+        ratios = (seconds(baseline, metric) / seconds(result, metric),
+                  baseline["relative"][metric] / result["relative"][metric])
+        if max(ratios) < 1 - TOLERANCE:
+            slower.append(f"{metric}: {seconds(result, metric):.4g}s vs baseline {seconds(baseline, metric):.4g}s, "
+                          f"{result['relative'][metric]:.4g} vs {baseline['relative'][metric]:.4g} in calibration units")
+    assert not slower, "Throughput regressed: " + "; ".join(slower)
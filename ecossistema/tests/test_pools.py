@@ -0,0 +1,56 @@
+import sys
+import os
+import numpy as np
+
+# Add project root and repository root (shared evolution_core/instrumentation) to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend.pools import SlotPool, FoodPool
+from backend.simulation import Simulation
+
+def test_slots_are_reused_without_growing():
+    pool = SlotPool(4)
+    slots = [pool.acquire() for _ in range(4)]
+    assert slots == [0, 1, 2, 3]
+
+    pool.release(1)
+    pool.release(1) # Releasing twice is a no-op
+    assert len(pool) == 3
+    assert pool.live().tolist() == [0, 2, 3]
+    assert pool.acquire() == 1
+    assert pool.capacity == 4
+
+    pool.grow(6)
+    assert [pool.acquire() for _ in range(2)] == [4, 5]
+
+def test_food_pool_positions():
+    food = FoodPool(3)
+    a = food.spawn(1, 2)
+    food.spawn(3, 4)
+    food.release(a)
+    food.spawn(5, 6)
+    assert food.live_positions().tolist() == [[5, 6], [3, 4]]
+
+def test_simulation_only_tracks_live_agents():
+    sim = Simulation(seed=7)
+    sim.max_steps_per_gen = 500
+    for _ in range(400):
+        sim.update()
+
+    alive = [p.alive for p in sim.prey]
+    assert len(sim.prey) == sim.n_prey, "Dead agents stay in the generation for evolution"
+    assert sim.prey_pool.alive.tolist() == alive
+    assert sim.get_stats()["prey_count"] == sum(alive)
+    assert len(sim.get_state()["prey"]) == sum(alive)
+
+    # Agent state is a view of the pool arrays
+    p = sim.prey[0]
+    assert np.shares_memory(p.position, sim.prey_pool.positions)
+    assert np.shares_memory(p.brain.genome, sim.prey_pool.genomes)
+    assert len(sim.food) <= sim.max_food
+
+if __name__ == "__main__":
+    test_slots_are_reused_without_growing()
+    test_food_pool_positions()
+    test_simulation_only_tracks_live_agents()
@@ -0,0 +1,51 @@
+import sys
+import os
+import tempfile
+import numpy as np
+
+# Add project root and repository root (shared evolution_core/instrumentation) to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend.simulation import Simulation
+from backend.recorder import Replayer
+
+def test_seeded_runs_are_identical():
+    sim1 = Simulation(seed=42)
+    sim2 = Simulation(seed=42)
+    sim1.max_steps_per_gen = sim2.max_steps_per_gen = 100
+    for _ in range(250):
+        sim1.update()
+        sim2.update()
+
+    assert sim1.generation == sim2.generation == 3
+    assert np.array_equal([p.position for p in sim1.prey], [p.position for p in sim2.prey])
+    assert np.array_equal(np.stack([p.brain.genome for p in sim1.predators]),
+                          np.stack([p.brain.genome for p in sim2.predators]))
+
+def test_replay_reproduces_recorded_generation():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "run.rec")
+        sim = Simulation(seed=3)
+        sim.max_steps_per_gen = 100
+        sim.start_recording(path)
+        for _ in range(150):
+            sim.update()
+        sim.stop_recording()
+
+        replayer = Replayer(path)
+        assert replayer.generations() == [1, 2]
+
+        # Last recorded frame of generation 1
+        index = int(np.flatnonzero(replayer.frame_index[:, 0] == 1)[-1])
+        recorded = replayer.frame(index)
+        replayed = replayer.replay_generation(1).get_state()
+        replayer.close()
+
+        assert recorded["steps"] == 100
+        assert np.allclose([[p["x"], p["y"]] for p in replayed["prey"]],
+                           [[p["x"], p["y"]] for p in recorded["prey"]], atol=1e-3)
+
+if __name__ == "__main__":
+    test_seeded_runs_are_identical()
+    test_replay_reproduces_recorded_generation()
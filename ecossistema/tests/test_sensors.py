@@ -0,0 +1,57 @@
+import sys
+import os
+import numpy as np
+
+# Add project root and repository root (shared evolution_core/instrumentation) to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend.agents import NeuralNetwork
+from backend.sensors import SpatialGrid, SectorSensor
+
+def test_grid_nearest_matches_brute_force():
+    rng = np.random.default_rng(0)
+    items = rng.uniform(0, [800, 600], (300, 2))
+    points = rng.uniform(0, [800, 600], (500, 2))
+
+    grid = SpatialGrid(items, 50, 800, 600)
+    idx, dist = grid.nearest(points)
+
+    brute = np.linalg.norm(points[:, None, :] - items[None, :, :], axis=2)
+    assert np.array_equal(idx, np.argmin(brute, axis=1)), "Grid nearest should match brute force"
+    assert np.allclose(dist, brute.min(axis=1))
+
+def test_grid_nearest_empty():
+    grid = SpatialGrid([], 50, 800, 600)
+    idx, dist = grid.nearest(np.array([[10.0, 10.0]]))
+    assert idx[0] == -1 and np.isinf(dist[0])
+
+def test_grid_query_rect_matches_brute_force():
+    rng = np.random.default_rng(1)
+    items = rng.uniform(0, [800, 600], (500, 2))
+    grid = SpatialGrid(items, 50, 800, 600)
+    found = grid.query_rect(120, 80, 430, 333)
+    inside = (items[:, 0] >= 120) & (items[:, 0] <= 430) & (items[:, 1] >= 80) & (items[:, 1] <= 333)
+    assert np.array_equal(found, np.flatnonzero(inside))
+
+def test_sector_sensor():
+    sensor = SectorSensor(4, 100)
+    grid = SpatialGrid([[150.0, 100.0], [100.0, 175.0], [400.0, 400.0]], 100, 800, 600)
+    readings = sensor.sense(np.array([[100.0, 100.0]]), np.array([0.0]), grid)
+
+    # Straight ahead at 50 units, 90 degrees (y grows downwards) at 75 units, the third is out of range
+    assert np.allclose(readings[0], [0.5, 0.25, 0.0, 0.0]), readings
+
+def test_forward_batch_matches_forward():
+    nets = [NeuralNetwork(6, (16, 8), 2) for _ in range(5)]
+    inputs = np.random.uniform(-1, 1, (5, 6))
+    batch = NeuralNetwork.forward_batch(nets[0].layer_sizes, np.stack([n.genome for n in nets]), inputs)
+    for net, x, out in zip(nets, inputs, batch):
+        assert np.allclose(net.forward(x), out)
+
+if __name__ == "__main__":
+    test_grid_nearest_matches_brute_force()
+    test_grid_nearest_empty()
+    test_grid_query_rect_matches_brute_force()
+    test_sector_sensor()
+    test_forward_batch_matches_forward()
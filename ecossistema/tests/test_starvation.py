@@ -2,8 +2,9 @@ import sys
 import os
 import numpy as np
 
-# Add project root to path
+# Add project root and repository root (shared evolution_core/instrumentation) to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
 from backend.agents import Predator
 
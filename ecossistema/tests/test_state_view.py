@@ -0,0 +1,72 @@
+import sys
+import os
+import numpy as np
+
+# Add project root and repository root (shared evolution_core/instrumentation) to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend.simulation import Simulation
+from backend.state_view import density_cells
+
+def crowded_simulation():
+    sim = Simulation(2000, 1500, n_prey=400, n_predators=100, seed=5)
+    sim.max_food = 1000
+    while len(sim.food) < sim.max_food:
+        sim.spawn_food()
+    sim.update()
+    return sim
+
+def test_viewport_returns_only_entities_inside():
+    sim = crowded_simulation()
+    state = sim.get_state(viewport=(300, 200, 500, 400))
+
+    prey = sim.prey_pool.positions[sim.prey_pool.live()]
+    inside = (prey[:, 0] >= 300) & (prey[:, 0] <= 800) & (prey[:, 1] >= 200) & (prey[:, 1] <= 600)
+    assert len(state["prey"]) == inside.sum() == state["in_view"]["prey"]
+    assert all(300 <= p["x"] <= 800 and 200 <= p["y"] <= 600 for p in state["prey"] + state["food"])
+    assert state["density"] == []
+
+    # Without arguments the response is unchanged: every live entity, no LOD fields
+    full = sim.get_state()
+    assert len(full["prey"]) == len(sim.prey_pool) and "density" not in full
+
+def test_budget_aggregates_dense_regions():
+    sim = crowded_simulation()
+    everything = sim.get_state(viewport=(0, 0, 2000, 1500))
+    state = sim.get_state(max_entities=200)
+
+    entries = len(state["prey"]) + len(state["predators"]) + len(state["food"]) + len(state["density"])
+    assert entries <= 200
+    assert state["density"], "Over budget, some regions should be summarized"
+    # Individual entities plus density counts still account for everything in view
+    assert state["in_view"] == everything["in_view"]
+    for kind in ("prey", "predators", "food"):
+        assert len(state[kind]) + sum(c[kind] for c in state["density"]) == len(everything[kind])
+
+def entry_count(state):
+    return len(state["prey"]) + len(state["predators"]) + len(state["food"]) + len(state["density"])
+
+def test_budget_holds_for_tiny_budgets_and_thin_viewports():
+    sim = crowded_simulation()
+    for max_entities in (1, 2, 3, 4, 7):
+        assert entry_count(sim.get_state(max_entities=max_entities)) <= max_entities
+    for viewport in ((0, 0, 2000, 20), (0, 0, 20, 1500), (0, 0, 2000, 1500)):
+        for max_entities in (1, 4, 9, 50):
+            state = sim.get_state(viewport=viewport, max_entities=max_entities)
+            assert entry_count(state) <= max_entities
+
+def test_density_cells_on_zero_sized_viewport():
+    # Agents wrap onto the world edge, so a zero-width viewport can hold entities
+    positions = np.array([[0.0, 10.0], [0.0, 300.0], [0.0, 590.0]])
+    found = {"prey": (np.arange(3), positions), "predators": (np.arange(0), np.zeros((0, 2))),
+             "food": (np.arange(0), np.zeros((0, 2)))}
+    individual, cells = density_cells(found, (0, 0, 0, 600), 2)
+    assert individual["prey"].sum() + len(cells) <= 2
+    assert sum(c["prey"] for c in cells) + individual["prey"].sum() == 3
+
+if __name__ == "__main__":
+    test_viewport_returns_only_entities_inside()
+    test_budget_aggregates_dense_regions()
+    test_budget_holds_for_tiny_budgets_and_thin_viewports()
+    test_density_cells_on_zero_sized_viewport()
@@ -0,0 +1,8 @@
+"""Evolutionary core shared by the projects in this repository: genetic
+operators over flat genome matrices, a GeneticAlgorithm built from them, and
+executors for evaluating fitness in batches serially, in threads or in
+worker processes."""
+from .operators import (elite_indices, tournament_select, truncation_select, uniform_crossover,
+                        blend_crossover, gaussian_mutation)
+from .engine import GeneticAlgorithm
+from .executors import SerialExecutor, ThreadExecutor, ProcessExecutor, make_executor, evaluate_batched
@@ -0,0 +1,67 @@
+"""Time of one GeneticAlgorithm generation and of batched evaluation per executor.
+
+Run from the repository root:
+    python evolution_core/benchmarks/bench_operators.py --populations 100 1000 10000 --genome-sizes 96 1000
+"""
+import argparse
+import functools
+import os
+import sys
+import time
+import numpy as np
+
+# Add repository root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from evolution_core import GeneticAlgorithm, make_executor, evaluate_batched
+
+def synthetic_fitness(genomes, rounds):
+    # Stand-in for a real evaluator: a few dense layers per genome (NumPy releases the GIL)
+    x = genomes
+    for _ in range(rounds):
+        x = np.tanh(x @ np.ones((x.shape[1], x.shape[1])) / x.shape[1])
+    return x.sum(axis=1)
+
+def best_time(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--populations", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--genome-sizes", type=int, nargs="+", default=[96, 1000])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'pop':>7} {'genes':>6} {'generation':>11}")
+    for population in args.populations:
+        for genome_size in args.genome_sizes:
+            genomes = rng.normal(size=(population, genome_size))
+            fitness = rng.random(population)
+            ga = GeneticAlgorithm(rng=rng)
+            out = np.empty_like(genomes)
+            seconds = best_time(lambda: ga.next_genomes(genomes, fitness, out=out), args.repeats)
+            print(f"{population:>7} {genome_size:>6} {seconds:>11.5f}")
+
+    population, genome_size = max(args.populations), min(args.genome_sizes)
+    genomes = rng.normal(size=(population, genome_size))
+    evaluator = functools.partial(synthetic_fitness, rounds=args.rounds)
+    print(f"\nbatched evaluation of {population} genomes, {args.workers} workers")
+    for kind in ("serial", "thread", "process"):
+        executor = make_executor(kind, args.workers)
+        try:
+            evaluate_batched(evaluator, genomes, executor) # Start the pool
+            seconds = best_time(lambda: evaluate_batched(evaluator, genomes, executor), args.repeats)
+        finally:
+            executor.close()
+        print(f"{kind:>8} {seconds:>9.4f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import numpy as np
+from .operators import (elite_indices, tournament_select, truncation_select, gaussian_mutation,
+                        SELECTIONS, CROSSOVERS)
+
+class GeneticAlgorithm:
+    """Elitism, selection, crossover and mutation for a population held as
+    one (n, genome_size) matrix.
+
+    Projects subclass it (or call its methods) and only translate between
+    their own individuals and genome rows.
+    """
+    def __init__(self, mutation_rate=0.1, mutation_scale=0.1, tournament_size=3, elite_count=2,
+                 crossover="uniform", selection="tournament", truncation_fraction=0.5, rng=None):
+        if crossover not in CROSSOVERS:
+            raise ValueError(f"crossover must be one of {tuple(CROSSOVERS)}")
+        if selection not in SELECTIONS:
+            raise ValueError(f"selection must be one of {SELECTIONS}")
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.mutation_rate = mutation_rate
+        self.mutation_scale = mutation_scale
+        self.tournament_size = tournament_size
+        self.elite_count = elite_count
+        self.crossover = crossover # "uniform" (pick each gene from a parent) or "blend" (random mix)
+        self.selection = selection # "tournament" or "truncation" (uniform among the fittest fraction)
+        self.truncation_fraction = truncation_fraction
+
+    def elite(self, fitness, count=None):
+        return elite_indices(fitness, self.elite_count if count is None else count)
+
+    def select(self, fitness, count):
+        """Parent indices for `count` slots."""
+        fitness = np.asarray(fitness, dtype=float)
+        if self.selection == "truncation":
+            return truncation_select(fitness, count, self.truncation_fraction, self.rng)
+        return tournament_select(fitness, count, self.tournament_size, self.rng)
+
+    def next_genomes(self, genomes, fitness, population_size=None, out=None):
+        """Builds the next generation's genome matrix from the current one.
+
+        The elite are copied unchanged into the first rows and the rest are
+        mutated children of selected parent pairs. Every row of the result is
+        a fresh copy (children never alias their parents); pass `out` to
+        write into a preallocated matrix, which must not overlap `genomes`.
+        """
+        fitness = np.asarray(fitness, dtype=float)
+        n_agents, genome_size = genomes.shape
+        population_size = n_agents if population_size is None else population_size
+
+        n_elite = min(self.elite_count, n_agents, population_size)
+        n_children = population_size - n_elite
+        new_genomes = np.empty((population_size, genome_size)) if out is None else out
+        new_genomes[:n_elite] = genomes[self.elite(fitness, n_elite)]
+        if n_children == 0:
+            return new_genomes
+
+        # One row of parents per child slot, both parents drawn at once
+        parents = self.select(fitness, 2 * n_children)
+        children = new_genomes[n_elite:]
+        CROSSOVERS[self.crossover](genomes[parents[:n_children]], genomes[parents[n_children:]], self.rng, out=children)
+        gaussian_mutation(children, self.mutation_rate, self.mutation_scale, self.rng)
+        return new_genomes
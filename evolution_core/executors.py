@@ -0,0 +1,67 @@
+import multiprocessing
+import os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import numpy as np
+
+# Fitness evaluators are plain callables taking a batch of individuals (a
+# slice of a genome matrix, or of a list of objects) and returning one
+# fitness value per individual. Executors decide where the batches run.
+
+class SerialExecutor:
+    workers = 1
+
+    def map(self, fn, batches):
+        return [fn(batch) for batch in batches]
+
+    def close(self):
+        pass
+
+class PoolExecutor:
+    """Runs batches on a concurrent.futures pool, created on first use."""
+    pool_class = None
+
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = None
+
+    def make_pool(self):
+        return self.pool_class(self.workers)
+
+    def map(self, fn, batches):
+        if self.pool is None:
+            self.pool = self.make_pool()
+        return list(self.pool.map(fn, batches))
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+class ThreadExecutor(PoolExecutor):
+    """For evaluators that spend their time in code that releases the GIL (NumPy, Pillow)."""
+    pool_class = ThreadPoolExecutor
+
+class ProcessExecutor(PoolExecutor):
+    """Worker processes; the evaluator and batches must be picklable."""
+    pool_class = ProcessPoolExecutor
+
+    def make_pool(self):
+        return ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+EXECUTORS = {"serial": SerialExecutor, "thread": ThreadExecutor, "process": ProcessExecutor}
+
+def make_executor(kind="serial", workers=None):
+    if kind not in EXECUTORS:
+        raise ValueError(f"executor must be one of {tuple(EXECUTORS)}")
+    return SerialExecutor() if kind == "serial" else EXECUTORS[kind](workers)
+
+def evaluate_batched(evaluator, population, executor=None, batch_size=None):
+    """Fitness of every individual as a (n,) array, evaluated in batches
+    (by default one per executor worker)."""
+    executor = executor if executor is not None else SerialExecutor()
+    n = len(population)
+    if n == 0:
+        return np.zeros(0)
+    batch_size = batch_size or -(-n // executor.workers)
+    batches = [population[lo:lo + batch_size] for lo in range(0, n, batch_size)]
+    return np.concatenate([np.asarray(f, dtype=float) for f in executor.map(evaluator, batches)])
@@ -0,0 +1,44 @@
+import numpy as np
+
+# Genetic operators over a whole population at once. Genomes are rows of a
+# (n, genome_size) float matrix and fitness is a (n,) array (higher is better).
+
+def elite_indices(fitness, count):
+    """Indices of the `count` fittest individuals, best first (ties keep their order)."""
+    return np.argsort(-np.asarray(fitness, dtype=float), kind="stable")[:count]
+
+def tournament_select(fitness, count, tournament_size, rng):
+    """`count` parent indices, each the fittest of `tournament_size` random contestants."""
+    contestants = rng.integers(0, len(fitness), (count, tournament_size))
+    return contestants[np.arange(count), np.argmax(fitness[contestants], axis=1)]
+
+def truncation_select(fitness, count, fraction, rng):
+    """`count` parent indices drawn uniformly from the fittest `fraction` of the population."""
+    top = elite_indices(fitness, max(1, int(len(fitness) * fraction)))
+    return top[rng.integers(0, len(top), count)]
+
+def uniform_crossover(parents1, parents2, rng, out=None):
+    """Each gene from either parent with equal probability."""
+    mask = rng.random(parents1.shape) < 0.5
+    if out is None:
+        return np.where(mask, parents1, parents2)
+    np.copyto(out, np.where(mask, parents1, parents2))
+    return out
+
+def blend_crossover(parents1, parents2, rng, out=None):
+    """A random mix of both parents, gene by gene."""
+    alpha = rng.random(parents1.shape)
+    if out is None:
+        out = np.empty(parents1.shape)
+    np.multiply(alpha, parents1, out=out)
+    out += (1 - alpha) * parents2
+    return out
+
+def gaussian_mutation(genomes, rate, scale, rng):
+    """Adds N(0, scale) noise to a `rate` fraction of the genes, in place."""
+    mask = rng.random(genomes.shape) < rate
+    genomes[mask] += rng.normal(0, scale, mask.sum())
+    return genomes
+
+SELECTIONS = ("tournament", "truncation")
+CROSSOVERS = {"uniform": uniform_crossover, "blend": blend_crossover}
@@ -0,0 +1,65 @@
+import sys
+import os
+import functools
+import numpy as np
+
+# Add repository root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from evolution_core import (GeneticAlgorithm, elite_indices, tournament_select, truncation_select,
+                            gaussian_mutation, make_executor, evaluate_batched)
+
+def test_next_genomes_elitism_and_aliasing():
+    rng = np.random.default_rng(0)
+    genomes = rng.normal(size=(30, 12))
+    fitness = np.arange(30.0)
+    before = genomes.copy()
+
+    ga = GeneticAlgorithm(mutation_rate=0.5, elite_count=2, rng=rng)
+    out = np.empty((30, 12))
+    new_genomes = ga.next_genomes(genomes, fitness, out=out)
+
+    assert new_genomes is out
+    assert np.array_equal(new_genomes[:2], genomes[[29, 28]]), "Elite should be copied unchanged, best first"
+    assert np.array_equal(genomes, before), "Parents should not be modified"
+    assert not np.shares_memory(new_genomes, genomes)
+    assert ga.next_genomes(genomes, fitness, population_size=50).shape == (50, 12)
+
+def test_selection_prefers_fitter_individuals():
+    rng = np.random.default_rng(1)
+    fitness = np.arange(100.0)
+    assert elite_indices(np.array([1.0, 3.0, 3.0, 2.0]), 3).tolist() == [1, 2, 3]
+    assert tournament_select(fitness, 5000, 5, rng).mean() > tournament_select(fitness, 5000, 1, rng).mean()
+    assert truncation_select(fitness, 5000, 0.25, rng).min() >= 75
+
+def test_crossover_and_mutation():
+    rng = np.random.default_rng(2)
+    genomes = np.vstack([np.zeros(20), np.ones(20)])
+    for crossover in ("uniform", "blend"):
+        ga = GeneticAlgorithm(mutation_rate=0.0, elite_count=0, crossover=crossover, rng=rng)
+        children = ga.next_genomes(genomes, np.ones(2), population_size=200)
+        assert children.min() >= 0.0 and children.max() <= 1.0
+    assert set(np.unique(children)) != {0.0, 1.0}, "Blend should mix genes"
+
+    mutated = gaussian_mutation(np.zeros((100, 100)), 0.1, 1.0, rng)
+    assert 0.05 < np.mean(mutated != 0) < 0.15
+
+def test_executors_match_serial():
+    genomes = np.random.default_rng(3).normal(size=(37, 5))
+    evaluator = functools.partial(np.sum, axis=1)
+    expected = genomes.sum(axis=1)
+    for kind in ("serial", "thread", "process"):
+        executor = make_executor(kind, workers=3)
+        try:
+            assert np.allclose(evaluate_batched(evaluator, genomes, executor), expected)
+            assert np.allclose(evaluate_batched(evaluator, genomes, executor, batch_size=4), expected)
+        finally:
+            executor.close()
+    # Lists of objects are batched the same way
+    assert evaluate_batched(lambda batch: [len(x) for x in batch], [[1, 2], [3]], batch_size=1).tolist() == [2.0, 1.0]
+
+if __name__ == "__main__":
+    test_next_genomes_elitism_and_aliasing()
+    test_selection_prefers_fitter_individuals()
+    test_crossover_and_mutation()
+    test_executors_match_serial()
@@ -1,12 +1,38 @@
 import numpy as np
 
+# Sensor ray directions (N, NE, E, SE, S, SW, W, NW) and how far they reach
+SENSOR_DIRECTIONS = np.array([
+    (0, -1), (1, -1), (1, 0), (1, 1),
+    (0, 1), (-1, 1), (-1, 0), (-1, -1)
+])
+SIGHT_DISTANCE = 10
+
+# Movement for each output neuron: 0: Up, 1: Down, 2: Left, 3: Right
+MOVES = np.array([(0, -1), (0, 1), (-1, 0), (1, 0)])
+
+# Brain layout: sensors -> hidden -> moves
+INPUT_SIZE, HIDDEN_SIZE, OUTPUT_SIZE = 8, 8, 4
+GENOME_SIZE = INPUT_SIZE * HIDDEN_SIZE + HIDDEN_SIZE * OUTPUT_SIZE
+
+def pack_genomes(weights1, weights2):
+    """Packs stacked weights into one (n, GENOME_SIZE) array."""
+    n = len(weights1)
+    return np.concatenate([np.reshape(weights1, (n, -1)), np.reshape(weights2, (n, -1))], axis=1)
+
+def unpack_genomes(genomes):
+    """(weights1, weights2) views into a packed (n, GENOME_SIZE) array."""
+    split = INPUT_SIZE * HIDDEN_SIZE
+    weights1 = genomes[:, :split].reshape(-1, INPUT_SIZE, HIDDEN_SIZE)
+    weights2 = genomes[:, split:].reshape(-1, HIDDEN_SIZE, OUTPUT_SIZE)
+    return weights1, weights2
+
 class Insect:
     def __init__(self, x, y, dna=None):
         self.x = x
         self.y = y
-        self.input_size = 8  # 8 directions
-        self.hidden_size = 8
-        self.output_size = 4 # Up, Down, Left, Right
+        self.input_size = INPUT_SIZE  # 8 directions
+        self.hidden_size = HIDDEN_SIZE
+        self.output_size = OUTPUT_SIZE # Up, Down, Left, Right
         
         if dna is None:
             self.weights1 = np.random.uniform(-1, 1, (self.input_size, self.hidden_size))
@@ -24,18 +50,15 @@ class Insect:
 
     def sense(self, maze):
         # Ray casting in 8 directions
-        directions = [
-            (0, -1), (1, -1), (1, 0), (1, 1),
-            (0, 1), (-1, 1), (-1, 0), (-1, -1)
-        ]
+        # Reference implementation; Simulation senses all insects at once
         readings = []
         
-        for dx, dy in directions:
+        for dx, dy in SENSOR_DIRECTIONS.tolist():
             dist = 0
             cx, cy = self.x, self.y
             
             # Max sight distance, e.g., 10 or until wall
-            max_dist = 10
+            max_dist = SIGHT_DISTANCE
             found_wall = False
             
             for _ in range(max_dist):
@@ -1,64 +1,46 @@
 import numpy as np
-from .agent import Insect
-import random
+from .agent import Insect, pack_genomes, unpack_genomes
+from evolution_core import GeneticAlgorithm
+from instrumentation import timed
 
-class Evolution:
-    def __init__(self, mutation_rate=0.05):
-        self.mutation_rate = mutation_rate
+class Evolution(GeneticAlgorithm):
+    """Evolves a population held as one (pop, GENOME_SIZE) genome array.
 
-    def selection(self, population):
-        # Tournament selection
-        tournament_size = 5
-        competitors = random.sample(population, tournament_size)
-        winner = max(competitors, key=lambda i: i.fitness)
-        return winner
+    Two such arrays are kept and used in turn: the next generation is written
+    into the one the current population does not live in, and its Insects
+    are views into rows of it. Selection, crossover and mutation come from
+    the shared GeneticAlgorithm, and every child gets its own row, so no two
+    insects ever share weights.
 
-    def crossover(self, parent1, parent2):
-        dna1 = parent1.get_dna()
-        dna2 = parent2.get_dna()
-        
-        # Crossover weights1
-        w1_shape = dna1[0].shape
-        mask1 = np.random.rand(*w1_shape) > 0.5
-        new_w1 = np.where(mask1, dna1[0], dna2[0])
-        
-        # Crossover weights2
-        w2_shape = dna1[1].shape
-        mask2 = np.random.rand(*w2_shape) > 0.5
-        new_w2 = np.where(mask2, dna1[1], dna2[1])
-        
-        return (new_w1, new_w2)
+    Because the buffers are reused, the insects from two generations back
+    must not be used after next_generation returns (copy their weights first).
+    """
+    def __init__(self, mutation_rate=0.05, mutation_scale=0.5, tournament_size=5, rng=None):
+        # Seeded from NumPy's global state by default, so np.random.seed still makes runs reproducible
+        rng = rng if rng is not None else np.random.default_rng(np.random.randint(0, 2**32))
+        super().__init__(mutation_rate, mutation_scale, tournament_size, elite_count=1, rng=rng)
+        self.buffers = [None, None]
+        self.front = 0 # Buffer the current population lives in
+        self.population = None
 
-    def mutate(self, dna):
-        w1, w2 = dna
-        
-        # Mutate w1
-        mutation_mask1 = np.random.rand(*w1.shape) < self.mutation_rate
-        noise1 = np.random.normal(0, 0.5, w1.shape)
-        w1 += mutation_mask1 * noise1
-        
-        # Mutate w2
-        mutation_mask2 = np.random.rand(*w2.shape) < self.mutation_rate
-        noise2 = np.random.normal(0, 0.5, w2.shape)
-        w2 += mutation_mask2 * noise2
-        
-        return (w1, w2)
+    def gather(self, population):
+        # The population this object produced last is already packed in the front buffer
+        if population is self.population:
+            return self.buffers[self.front]
+        return pack_genomes(np.stack([i.weights1 for i in population]), np.stack([i.weights2 for i in population]))
 
+    @timed("evolve")
     def next_generation(self, current_population, start_x, start_y):
-        new_population = []
-        pop_size = len(current_population)
-        
-        # Elitism: Keep best agent
-        best = max(current_population, key=lambda i: i.fitness)
-        new_population.append(Insect(start_x, start_y, best.get_dna()))
-        
-        while len(new_population) < pop_size:
-            p1 = self.selection(current_population)
-            p2 = self.selection(current_population)
-            
-            child_dna = self.crossover(p1, p2)
-            child_dna = self.mutate(child_dna)
-            
-            new_population.append(Insect(start_x, start_y, child_dna))
-            
-        return new_population
+        genomes = self.gather(current_population)
+        fitness = np.array([i.fitness for i in current_population], dtype=float)
+
+        back = 1 - self.front
+        if self.buffers[back] is None or self.buffers[back].shape != genomes.shape:
+            self.buffers[back] = np.empty_like(genomes)
+        # Elitism keeps a copy of the best genome, not a reference to it
+        new_genomes = self.next_genomes(genomes, fitness, out=self.buffers[back])
+
+        self.front = back
+        weights1, weights2 = unpack_genomes(new_genomes)
+        self.population = [Insect(start_x, start_y, (w1, w2)) for w1, w2 in zip(weights1, weights2)]
+        return self.population
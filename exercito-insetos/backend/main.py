@@ -1,10 +1,24 @@
-from fastapi import FastAPI, HTTPException
+import os
+import sys
+
+# The entry point makes the code shared by all projects (evolution_core,
+# instrumentation, at the repository root) importable; other modules and the
+# tests expect it on sys.path already
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from .simulation import Simulation
+from fastapi.responses import StreamingResponse
+from .simulation import Simulation, PATH_FORMATS, FITNESS_MODES
 from .evolution import Evolution
-import os
+from .training import TrainingJob
+from instrumentation.web import instrument_app
+from typing import List
 
 app = FastAPI()
+# Request latency histograms and GET /metrics (training workers run in their
+# own processes; their generations are recorded as their events arrive)
+instrument_app(app)
 
 app.add_middleware(
     CORSMiddleware,
@@ -17,6 +31,10 @@ app.add_middleware(
 # Global state
 sim = None
 evo = Evolution(mutation_rate=0.05)
+training_jobs = {}
+# Finished jobs kept for /training/{job_id} and /apply; older ones are dropped
+# (with their weights) when new jobs start
+MAX_FINISHED_JOBS = 10
 
 MAZE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'mazes')
 
@@ -24,54 +42,119 @@ MAZE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'mazes')
 def read_root():
     return {"message": "Insect Army Backend"}
 
+def check_fitness_mode(fitness_mode):
+    if fitness_mode not in FITNESS_MODES:
+        raise HTTPException(status_code=400, detail=f"fitness_mode must be one of {', '.join(FITNESS_MODES)}")
+
 @app.post("/simulation/start/{maze_name}")
-def start_simulation(maze_name: str, population_size: int = 50):
+def start_simulation(maze_name: str, population_size: int = 50, fitness_mode: str = "euclidean", include_maze: bool = True):
     global sim
     maze_path = os.path.join(MAZE_DIR, f"{maze_name}.txt")
     
     if not os.path.exists(maze_path):
         raise HTTPException(status_code=404, detail="Maze not found")
+    check_fitness_mode(fitness_mode)
         
-    sim = Simulation(maze_path, population_size)
+    sim = Simulation(maze_path, population_size, fitness_mode)
     return {
         "message": f"Simulation started with {maze_name}",
-        "maze": sim.maze,
+        # The grid is a NumPy array; it is only turned into nested lists for the client when asked for
+        "maze": sim.maze.tolist() if include_maze else None,
         "start": sim.start_pos,
         "end": sim.end_pos
     }
 
 @app.post("/simulation/step")
-def simulation_step():
+def simulation_step(path_format: str = "points", top_k: int = Query(None, ge=0), sample: int = Query(None, ge=0)):
     global sim
     if not sim:
         raise HTTPException(status_code=400, detail="Simulation not started")
+    if path_format not in PATH_FORMATS:
+        raise HTTPException(status_code=400, detail=f"path_format must be one of {', '.join(PATH_FORMATS)}")
         
-    # Run full generation until completion or max steps
-    while sim.run_step():
-        pass
-        
-    # Evaluate fitness
-    sim.evaluate_fitness()
-    best_agent = sim.get_best_agent()
-    stats = {
-        "generation": sim.generation,
-        "max_fitness": best_agent.fitness,
-        "reached_goal": sum(1 for i in sim.insects if i.reached_goal)
-    }
+    stats = sim.run_generation()
     
-    population_data = sim.get_population_data()
+    # Paths can be sent as move letters and/or only for some insects to keep responses small
+    population_data = sim.get_population_data(path_format, top_k, sample)
     
     # Evolve next generation
     new_insects = evo.next_generation(sim.insects, sim.start_pos[0], sim.start_pos[1])
-    sim.insects = new_insects
+    sim.set_population(new_insects)
     sim.generation += 1
-    sim.current_step = 0
     
     return {
         "stats": stats,
         "population": population_data
     }
 
+# --- Background training ---
+
+def prune_training_jobs():
+    finished = [job_id for job_id, job in training_jobs.items() if job.status != "running"]
+    for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+        del training_jobs[job_id]
+
+def get_job(job_id):
+    if job_id not in training_jobs:
+        raise HTTPException(status_code=404, detail="Training job not found")
+    return training_jobs[job_id]
+
+@app.post("/training/start/{maze_name}")
+async def start_training(maze_name: str, population_size: int = 50, generations: int = 100, goal_threshold: float = None,
+                         fitness_mode: str = "euclidean", eval_mazes: List[str] = Query(None), eval_workers: int = None):
+    # Trains in a worker process so the server stays responsive; stops after
+    # `generations` or once `goal_threshold` of the population reaches the exit.
+    # eval_mazes (repeatable) also scores every generation on those mazes, in
+    # eval_workers processes, to train insects that generalize
+    maze_paths = [os.path.join(MAZE_DIR, f"{name}.txt") for name in [maze_name] + (eval_mazes or [])]
+    if not all(os.path.exists(path) for path in maze_paths):
+        raise HTTPException(status_code=404, detail="Maze not found")
+    check_fitness_mode(fitness_mode)
+
+    job = TrainingJob(maze_name, maze_paths[0], population_size, generations, goal_threshold, evo.mutation_rate, fitness_mode,
+                      maze_paths[1:], eval_workers)
+    job.start()
+    prune_training_jobs()
+    training_jobs[job.id] = job
+    return job.progress()
+
+@app.get("/training/{job_id}")
+async def get_training(job_id: str):
+    return get_job(job_id).progress()
+
+@app.post("/training/{job_id}/cancel")
+async def cancel_training(job_id: str):
+    job = get_job(job_id)
+    job.cancel()
+    return job.progress()
+
+@app.get("/training/{job_id}/events")
+async def training_events(job_id: str):
+    return StreamingResponse(get_job(job_id).stream(), media_type="text/event-stream")
+
+@app.post("/training/{job_id}/apply")
+async def apply_training(job_id: str, include_maze: bool = True):
+    # Continue the interactive simulation from the trained population
+    global sim
+    job = get_job(job_id)
+    if job.weights is None:
+        raise HTTPException(status_code=409, detail="Training job has not finished")
+
+    sim = Simulation(job.maze_path, job.population_size, job.fitness_mode)
+    sim.set_population(job.trained_insects(sim.start_pos[0], sim.start_pos[1]))
+    sim.generation = job.generation
+    return {
+        "message": f"Simulation continued from training job {job_id}",
+        "maze": sim.maze.tolist() if include_maze else None,
+        "start": sim.start_pos,
+        "end": sim.end_pos
+    }
+
+@app.on_event("shutdown")
+def stop_training_jobs():
+    for job in training_jobs.values():
+        job.terminate()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8002)
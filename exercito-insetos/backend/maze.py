@@ -0,0 +1,142 @@
+import os
+import numpy as np
+from .agent import SENSOR_DIRECTIONS, SIGHT_DISTANCE
+
+# Tables saved in a maze's binary sidecar; the rest are cheap to rebuild from them
+CACHED_TABLES = ("grid", "wall_distances", "exit_distances")
+# Bump when the sidecar contents change so old sidecars are rebuilt
+CACHE_VERSION = 1
+
+class Maze:
+    """A parsed maze plus the lookup tables derived from it.
+
+    Mazes never change during a run, so everything the simulation reads from
+    them every step is computed here once.
+    """
+    def __init__(self, grid, start, end):
+        # (height, width) uint8, 1 = wall
+        self.grid = np.asarray(grid, dtype=np.uint8)
+        self.start = start
+        self.end = end
+        self.height, self.width = self.grid.shape
+        self.walls = self.pad_walls(self.grid)
+
+        self.wall_distances = self.compute_wall_distances()
+        # What Insect.sense would read at every cell (1 = close, 0 = far)
+        self.sensor_readings = 1.0 / self.wall_distances
+        self.exit_distances = self.compute_exit_distances()
+
+    @staticmethod
+    def pad_walls(grid):
+        # Walls padded with a border of walls as wide as the sensor range so
+        # rays and moves never need bounds checks
+        return np.pad(grid.astype(bool), SIGHT_DISTANCE, constant_values=True)
+
+    @classmethod
+    def from_tables(cls, start, end, tables):
+        """A maze rebuilt from already computed lookup tables (a binary
+        sidecar, or arrays shared with a worker process)."""
+        maze = cls.__new__(cls)
+        maze.start = start
+        maze.end = end
+        for name, array in tables.items():
+            setattr(maze, name, array)
+        maze.height, maze.width = maze.grid.shape
+        if "walls" not in tables:
+            maze.walls = cls.pad_walls(maze.grid)
+        if "sensor_readings" not in tables:
+            maze.sensor_readings = 1.0 / maze.wall_distances
+        return maze
+
+    def compute_wall_distances(self):
+        """(height, width, 8) distance to the nearest wall along each sensor
+        ray, capped at SIGHT_DISTANCE."""
+        h, w, pad = self.height, self.width, SIGHT_DISTANCE
+        distances = np.full((h, w, len(SENSOR_DIRECTIONS)), SIGHT_DISTANCE, dtype=np.uint8)
+        for d, (dx, dy) in enumerate(SENSOR_DIRECTIONS.tolist()):
+            no_wall_yet = np.ones((h, w), dtype=bool)
+            for k in range(1, SIGHT_DISTANCE + 1):
+                hit = self.walls[pad + dy * k:pad + dy * k + h, pad + dx * k:pad + dx * k + w]
+                distances[no_wall_yet & hit, d] = k
+                no_wall_yet &= ~hit
+        return distances
+
+    def compute_exit_distances(self):
+        """(height, width) number of moves from each cell to the exit along
+        open cells (breadth-first search from the exit), -1 where the exit
+        cannot be reached or the cell is a wall."""
+        pad = SIGHT_DISTANCE
+        padded_width = self.walls.shape[1]
+        blocked = self.walls.ravel().copy()
+        distances = np.full(self.walls.size, -1, dtype=np.int32)
+        neighbours = np.array([-padded_width, padded_width, -1, 1])
+
+        exit_cell = (self.end[1] + pad) * padded_width + self.end[0] + pad
+        frontier = np.array([exit_cell])
+        blocked[frontier] = True
+        distance = 0
+        while frontier.size:
+            distances[frontier] = distance
+            candidates = (frontier[:, None] + neighbours).ravel()
+            frontier = np.unique(candidates[~blocked[candidates]])
+            blocked[frontier] = True
+            distance += 1
+
+        return distances.reshape(self.walls.shape)[pad:pad + self.height, pad:pad + self.width]
+
+def parse_maze(maze_file):
+    """(grid, start, end) from a text maze: 1 = wall, 0 = open, S = start,
+    E = end; any other character is a wall and short rows are padded with walls."""
+    with open(maze_file, 'rb') as f:
+        lines = [line.strip() for line in f.read().splitlines()]
+
+    width = max((len(line) for line in lines), default=0)
+    chars = np.frombuffer(b"".join(line.ljust(width, b"1") for line in lines), dtype=np.uint8).reshape(len(lines), width)
+    grid = ~np.isin(chars, np.frombuffer(b"0SE", dtype=np.uint8))
+
+    def find(char):
+        # The last occurrence wins, as when scanning the file line by line
+        found = np.argwhere(chars == ord(char))
+        return (int(found[-1, 1]), int(found[-1, 0])) if len(found) else (0, 0)
+
+    return grid.astype(np.uint8), find("S"), find("E")
+
+def sidecar_path(maze_file):
+    return os.path.join(os.path.dirname(maze_file), ".cache", os.path.basename(maze_file) + ".npz")
+
+def load_maze_file(maze_file):
+    """Loads a maze from its binary sidecar if it was written for the current
+    version of the text file, otherwise parses the text and (re)writes it."""
+    stat = os.stat(maze_file)
+    key = np.array([CACHE_VERSION, stat.st_mtime_ns, stat.st_size], dtype=np.int64)
+    sidecar = sidecar_path(maze_file)
+    try:
+        with np.load(sidecar) as cached:
+            if np.array_equal(cached["key"], key):
+                tables = {name: cached[name] for name in CACHED_TABLES}
+                return Maze.from_tables(tuple(cached["start"].tolist()), tuple(cached["end"].tolist()), tables)
+    except (OSError, KeyError, ValueError):
+        pass # Missing, stale or unreadable sidecar
+
+    maze = Maze(*parse_maze(maze_file))
+    try:
+        os.makedirs(os.path.dirname(sidecar), exist_ok=True)
+        # Written under a temporary name and renamed, so concurrent readers never see half a file
+        tmp = f"{sidecar}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, key=key, start=maze.start, end=maze.end, **{name: getattr(maze, name) for name in CACHED_TABLES})
+        os.replace(tmp, sidecar)
+    except OSError:
+        pass # Read-only maze directory: just go without the sidecar
+    return maze
+
+# Loaded mazes by file path, with the file's mtime so edited files are reloaded
+_maze_cache = {}
+
+def get_maze(maze_file):
+    path = os.path.abspath(maze_file)
+    mtime = os.path.getmtime(path)
+    cached = _maze_cache.get(path)
+    if cached is None or cached[0] != mtime:
+        cached = _maze_cache[path] = (mtime, load_maze_file(path))
+    return cached[1]
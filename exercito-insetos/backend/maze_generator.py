@@ -0,0 +1,112 @@
+import random
+import numpy as np
+
+ALGORITHMS = ("backtracker", "prim")
+
+# Neighbouring cells two grid squares away; the square in between is the wall
+CELL_STEPS = ((0, -1), (0, 1), (-1, 0), (1, 0))
+
+def carve_backtracker(rows, cols, rng):
+    """Recursive backtracker (depth-first search with an explicit stack):
+    long winding corridors with few branches."""
+    visited = [[False] * cols for _ in range(rows)]
+    passages = []
+    stack = [(0, 0)]
+    visited[0][0] = True
+    while stack:
+        r, c = stack[-1]
+        options = [(r + dr, c + dc) for dc, dr in CELL_STEPS
+                   if 0 <= r + dr < rows and 0 <= c + dc < cols and not visited[r + dr][c + dc]]
+        if not options:
+            stack.pop()
+            continue
+        nr, nc = options[rng.randrange(len(options))]
+        visited[nr][nc] = True
+        passages.append((r, c, nr, nc))
+        stack.append((nr, nc))
+    return passages
+
+def carve_prim(rows, cols, rng):
+    """Randomized Prim's algorithm: grows from the start cell by opening a
+    random wall on the frontier, giving many short dead ends."""
+    visited = [[False] * cols for _ in range(rows)]
+    passages = []
+    visited[0][0] = True
+    frontier = [(0, 0, dr, dc) for dc, dr in CELL_STEPS if 0 <= dr < rows and 0 <= dc < cols]
+    while frontier:
+        # Swap-remove a random frontier wall
+        i = rng.randrange(len(frontier))
+        frontier[i], frontier[-1] = frontier[-1], frontier[i]
+        r, c, nr, nc = frontier.pop()
+        if visited[nr][nc]:
+            continue
+        visited[nr][nc] = True
+        passages.append((r, c, nr, nc))
+        for dc, dr in CELL_STEPS:
+            if 0 <= nr + dr < rows and 0 <= nc + dc < cols and not visited[nr + dr][nc + dc]:
+                frontier.append((nr, nc, nr + dr, nc + dc))
+    return passages
+
+def generate_maze(width, height, seed=None, algorithm="backtracker", loopiness=0.0):
+    """A random maze as a (height, width) uint8 grid (1 = wall) plus start
+    and end positions.
+
+    Cells sit on odd coordinates and are joined into a perfect maze (exactly
+    one route between any two cells); `loopiness` then knocks down that
+    fraction of the remaining inner walls to add alternative routes. The same
+    seed always gives the same maze.
+    """
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"algorithm must be one of {ALGORITHMS}")
+    if width < 3 or height < 3:
+        raise ValueError("mazes must be at least 3x3")
+    rng = random.Random(seed)
+    rows, cols = (height - 1) // 2, (width - 1) // 2
+
+    carve = carve_backtracker if algorithm == "backtracker" else carve_prim
+    passages = np.array(carve(rows, cols, rng), dtype=np.int64).reshape(-1, 4)
+
+    grid = np.ones((height, width), dtype=np.uint8)
+    grid[1:2 * rows:2, 1:2 * cols:2] = 0
+    # The wall square between two joined cells
+    grid[passages[:, 0] + passages[:, 2] + 1, passages[:, 1] + passages[:, 3] + 1] = 0
+
+    if loopiness > 0:
+        # Walls between two horizontally or vertically adjacent cells that are still standing
+        ys, xs = np.mgrid[1:2 * rows:2, 1:2 * cols:2]
+        inner = np.concatenate([
+            np.stack([ys[:, :-1].ravel(), xs[:, :-1].ravel() + 1], axis=1),
+            np.stack([ys[:-1].ravel() + 1, xs[:-1].ravel()], axis=1)
+        ])
+        inner = inner[grid[inner[:, 0], inner[:, 1]] == 1]
+        picked = np.random.default_rng(rng.getrandbits(64)).random(len(inner)) < loopiness
+        grid[inner[picked, 0], inner[picked, 1]] = 0
+
+    start = (1, 1)
+    end = (2 * cols - 1, 2 * rows - 1)
+    return grid, start, end
+
+def maze_to_text(grid, start, end):
+    """The maze in the mazes/*.txt format: 1 = wall, 0 = open, S = start, E = end."""
+    chars = np.where(np.asarray(grid) == 1, ord("1"), ord("0")).astype(np.uint8)
+    chars[start[1], start[0]] = ord("S")
+    chars[end[1], end[0]] = ord("E")
+    return "\n".join(row.tobytes().decode() for row in chars) + "\n"
+
+def save_maze(path, width, height, seed=None, algorithm="backtracker", loopiness=0.0):
+    grid, start, end = generate_maze(width, height, seed, algorithm, loopiness)
+    with open(path, "w") as f:
+        f.write(maze_to_text(grid, start, end))
+    return path
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Write a random maze in the mazes/*.txt format.")
+    parser.add_argument("path")
+    parser.add_argument("--width", type=int, default=41)
+    parser.add_argument("--height", type=int, default=21)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--algorithm", choices=ALGORITHMS, default="backtracker")
+    parser.add_argument("--loopiness", type=float, default=0.0)
+    args = parser.parse_args()
+    save_maze(args.path, args.width, args.height, args.seed, args.algorithm, args.loopiness)
@@ -0,0 +1,153 @@
+import math
+import multiprocessing
+import os
+from multiprocessing import shared_memory
+import numpy as np
+from .agent import Insect, GENOME_SIZE, pack_genomes, unpack_genomes
+from .maze import Maze, get_maze
+from .simulation import Simulation
+
+# Maze lookup tables the workers read (never written after the maze is built)
+SHARED_TABLES = ("grid", "walls", "wall_distances", "sensor_readings", "exit_distances")
+# How per-maze fitness is combined into one score per genome
+AGGREGATES = {"mean": np.mean, "min": np.min}
+
+def share_array(array):
+    """Copies an array into a new shared memory block; returns the block and
+    a picklable spec that attach_array turns back into a view."""
+    block = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+    np.ndarray(array.shape, array.dtype, buffer=block.buf)[...] = array
+    return block, (block.name, array.shape, array.dtype.str)
+
+def attach_array(spec):
+    name, shape, dtype = spec
+    block = shared_memory.SharedMemory(name=name)
+    array = np.ndarray(shape, dtype, buffer=block.buf)
+    array.flags.writeable = False
+    return block, array
+
+def evaluate_genomes(maze, genomes, fitness_mode="euclidean", sim=None):
+    """Runs one generation of the given packed genomes on a maze and returns
+    their fitness and whether each reached the exit."""
+    if sim is None:
+        sim = Simulation(maze, 1, fitness_mode)
+    weights1, weights2 = unpack_genomes(genomes)
+    x, y = maze.start
+    sim.set_population([Insect(x, y, (w1, w2)) for w1, w2 in zip(weights1, weights2)])
+    sim.run_generation()
+    return sim.fitness, sim.reached_goal
+
+# Per-process state of a pool worker, set by init_worker
+_worker = {}
+
+def init_worker(maze_specs, genome_spec, fitness_mode):
+    blocks, simulations = [], []
+    for start, end, specs in maze_specs:
+        tables = {}
+        for name, spec in specs.items():
+            block, tables[name] = attach_array(spec)
+            blocks.append(block)
+        simulations.append(Simulation(Maze.from_tables(start, end, tables), 1, fitness_mode))
+    block, genomes = attach_array(genome_spec)
+    blocks.append(block)
+    _worker.update(blocks=blocks, simulations=simulations, genomes=genomes)
+
+def evaluate_task(maze_index, lo, hi):
+    sim = _worker["simulations"][maze_index]
+    return evaluate_genomes(sim.maze_data, _worker["genomes"][lo:hi], sim=sim)
+
+class MultiMazeEvaluator:
+    """Scores every genome of a generation on several mazes.
+
+    With workers > 0 the mazes are evaluated in a pool of worker processes.
+    Maze tables and the generation's genomes live in shared memory: workers
+    map them read-only, so per generation only the (maze, genome range) of
+    each task and the resulting fitness arrays cross process boundaries.
+    """
+    def __init__(self, mazes, population_size, workers=None, fitness_mode="euclidean", aggregate="mean"):
+        if aggregate not in AGGREGATES:
+            raise ValueError(f"aggregate must be one of {tuple(AGGREGATES)}")
+        self.mazes = [m if isinstance(m, Maze) else get_maze(m) for m in mazes]
+        self.population_size = population_size
+        self.fitness_mode = fitness_mode
+        self.aggregate = aggregate
+        if workers is None:
+            workers = min(len(self.mazes), os.cpu_count() or 1)
+        self.workers = workers
+        self.blocks = []
+        self.pool = None
+
+        if workers == 0:
+            self.simulations = [Simulation(maze, 1, fitness_mode) for maze in self.mazes]
+            return
+
+        maze_specs = []
+        for maze in self.mazes:
+            specs = {}
+            for name in SHARED_TABLES:
+                block, specs[name] = share_array(getattr(maze, name))
+                self.blocks.append(block)
+            maze_specs.append((maze.start, maze.end, specs))
+        block, genome_spec = share_array(np.zeros((population_size, GENOME_SIZE)))
+        self.blocks.append(block)
+        self.genomes = np.ndarray((population_size, GENOME_SIZE), buffer=block.buf)
+
+        # Large populations on few mazes are also split by genome range so every worker gets work
+        chunks = math.ceil(workers / len(self.mazes))
+        bounds = np.linspace(0, population_size, chunks + 1).astype(int)
+        self.tasks = [(m, lo, hi) for m in range(len(self.mazes)) for lo, hi in zip(bounds[:-1], bounds[1:]) if hi > lo]
+
+        context = multiprocessing.get_context("spawn")
+        self.pool = context.Pool(workers, initializer=init_worker, initargs=(maze_specs, genome_spec, fitness_mode))
+
+    def evaluate(self, genomes):
+        """(n_mazes, n) fitness and goal flags for a packed (n, GENOME_SIZE) genome array."""
+        genomes = np.asarray(genomes, dtype=float)
+        if len(genomes) != self.population_size:
+            raise ValueError(f"expected {self.population_size} genomes, got {len(genomes)}")
+
+        fitness = np.empty((len(self.mazes), len(genomes)))
+        reached_goal = np.empty((len(self.mazes), len(genomes)), dtype=bool)
+        if self.pool is None:
+            for m, (maze, sim) in enumerate(zip(self.mazes, self.simulations)):
+                fitness[m], reached_goal[m] = evaluate_genomes(maze, genomes, sim=sim)
+        else:
+            self.genomes[...] = genomes
+            for (m, lo, hi), (f, r) in zip(self.tasks, self.pool.starmap(evaluate_task, self.tasks)):
+                fitness[m, lo:hi], reached_goal[m, lo:hi] = f, r
+        return fitness, reached_goal
+
+    def score(self, sim):
+        """Scores the finished generation of `sim` on these mazes as well and
+        replaces its fitness with the aggregate over all of them (sim's own
+        maze first); returns the combined stats."""
+        fitness, reached_goal = self.evaluate(pack_genomes(sim.weights1, sim.weights2))
+        fitness = np.vstack([sim.fitness, fitness])
+        reached_goal = np.vstack([sim.reached_goal, reached_goal])
+
+        sim.fitness = AGGREGATES[self.aggregate](fitness, axis=0)
+        for insect, value in zip(sim.insects, sim.fitness.tolist()):
+            insect.fitness = value
+        return {
+            "max_fitness": float(sim.fitness.max()),
+            "avg_fitness": float(sim.fitness.mean()),
+            "reached_goal_per_maze": reached_goal.sum(axis=1).tolist(),
+            "solved_all": int(reached_goal.all(axis=0).sum())
+        }
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+        self.genomes = None # Views must be released before their block is closed
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
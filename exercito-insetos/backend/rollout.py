@@ -0,0 +1,151 @@
+import os
+import threading
+import numpy as np
+from .agent import SIGHT_DISTANCE, MOVES, INPUT_SIZE, HIDDEN_SIZE, OUTPUT_SIZE
+
+# Numba is optional: without it Simulation steps generations with NumPy (run_step)
+try:
+    import numba
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+    # The server runs generations on worker threads; a TBB pool started from
+    # one keeps the process from exiting, so TBB is the last choice unless a
+    # layer is picked through NUMBA_THREADING_LAYER
+    if "NUMBA_THREADING_LAYER" not in os.environ:
+        numba.config.THREADING_LAYER_PRIORITY = ["omp", "workqueue", "tbb"]
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+# Not every threading layer allows kernels launched from several threads at once
+KERNEL_LOCK = threading.Lock()
+
+# "auto" uses the compiled kernel when Numba is installed
+ROLLOUT_BACKENDS = ("auto", "numba", "numpy")
+
+# Decisions whose two best outputs are closer than this are left to the NumPy
+# reference. The kernel's tanh may differ from NumPy's in the last bit, which
+# could only change the argmax of (near-)ties.
+AMBIGUOUS_GAP = 1e-9
+
+MOVES_X = np.ascontiguousarray(MOVES[:, 0])
+MOVES_Y = np.ascontiguousarray(MOVES[:, 1])
+
+def rollout_kernel(sensor_readings, walls, maze_width, end_x, end_y, weights1, weights2,
+                   indices, forced, positions, paths, path_lengths, steps_taken,
+                   is_dead, reached_goal, is_looping, loop_start, loop_length, pending,
+                   max_steps, detect_loops, ambiguous_gap):
+    """Moves each insect in `indices` until it dies, reaches the exit, enters
+    a cycle or has taken max_steps steps, with the same rules as
+    Simulation.run_step. An insect whose next decision is a near-tie stops
+    with pending set; forced[n] >= 0 makes its next move that one."""
+    walls_width = walls.shape[1]
+    flat_walls = walls.ravel()
+    # Open-addressing table of visited cell -> first index in the path
+    table_size = 1
+    while table_size < 2 * (max_steps + 2):
+        table_size *= 2
+    mask = table_size - 1
+
+    for k in prange(len(indices)):
+        n = indices[k]
+        pending[n] = False
+        keys = np.full(table_size, -1, dtype=np.int64)
+        first = np.empty(table_size, dtype=np.int64)
+        if detect_loops:
+            for j in range(path_lengths[n]):
+                cell = np.int64(paths[n, j, 1]) * maze_width + paths[n, j, 0]
+                slot = (cell * 2654435761) & mask
+                while keys[slot] != -1 and keys[slot] != cell:
+                    slot = (slot + 1) & mask
+                if keys[slot] == -1:
+                    keys[slot] = cell
+                    first[slot] = j
+
+        x, y = positions[n, 0], positions[n, 1]
+        move = forced[n]
+        forced[n] = -1
+        hidden = np.empty(HIDDEN_SIZE)
+        while steps_taken[n] < max_steps:
+            if move < 0:
+                # Sense (precomputed per cell), then the two tanh layers
+                sensors = sensor_readings[y * maze_width + x]
+                for j in range(HIDDEN_SIZE):
+                    acc = 0.0
+                    for i in range(INPUT_SIZE):
+                        acc += sensors[i] * weights1[n, i, j]
+                    hidden[j] = np.tanh(acc)
+                best, best_value, second_value = 0, -np.inf, -np.inf
+                for o in range(OUTPUT_SIZE):
+                    acc = 0.0
+                    for j in range(HIDDEN_SIZE):
+                        acc += hidden[j] * weights2[n, j, o]
+                    value = np.tanh(acc)
+                    if value > best_value:
+                        best, second_value, best_value = o, best_value, value
+                    elif value > second_value:
+                        second_value = value
+                if best_value - second_value < ambiguous_gap:
+                    pending[n] = True
+                    break
+                move = best
+
+            steps_taken[n] += 1
+            nx, ny = x + MOVES_X[move], y + MOVES_Y[move]
+            move = -1
+            if flat_walls[(ny + SIGHT_DISTANCE) * walls_width + nx + SIGHT_DISTANCE]:
+                is_dead[n] = True # Hit a wall
+                break
+
+            x, y = nx, ny
+            length = path_lengths[n]
+            paths[n, length, 0] = x
+            paths[n, length, 1] = y
+            path_lengths[n] = length + 1
+            if x == end_x and y == end_y:
+                reached_goal[n] = True
+
+            if detect_loops:
+                cell = np.int64(y) * maze_width + x
+                slot = (cell * 2654435761) & mask
+                while keys[slot] != -1 and keys[slot] != cell:
+                    slot = (slot + 1) & mask
+                if keys[slot] == cell:
+                    is_looping[n] = True
+                    loop_start[n] = first[slot]
+                    loop_length[n] = length - first[slot]
+                else:
+                    keys[slot] = cell
+                    first[slot] = length
+
+            if reached_goal[n] or is_looping[n]:
+                break
+        positions[n, 0] = x
+        positions[n, 1] = y
+
+if NUMBA_AVAILABLE:
+    rollout_kernel = njit(cache=True, parallel=True)(rollout_kernel)
+
+def run_rollout(sim):
+    """Runs the rest of sim's current generation in the compiled kernel and
+    returns how many steps each insect took (in total, counting any taken
+    before). Results are identical to stepping with Simulation.run_step:
+    near-tie decisions are made by Simulation.think, between kernel calls."""
+    n = len(sim.insects)
+    steps_taken = np.full(n, sim.current_step, dtype=np.int64)
+    forced = np.full(n, -1, dtype=np.int64)
+    pending = np.zeros(n, dtype=bool)
+    end_x, end_y = sim.end_pos
+    indices = np.flatnonzero(~sim.is_dead & ~sim.reached_goal & ~sim.is_looping)
+    while indices.size:
+        with KERNEL_LOCK:
+            rollout_kernel(sim.sensor_readings, sim.walls, sim.maze_data.width, end_x, end_y,
+                           sim.weights1, sim.weights2, indices, forced, sim.positions, sim.paths, sim.path_lengths,
+                           steps_taken, sim.is_dead, sim.reached_goal, sim.is_looping, sim.loop_start, sim.loop_length,
+                           pending, sim.max_steps, sim.detect_loops, AMBIGUOUS_GAP)
+        indices = np.flatnonzero(pending)
+        if indices.size:
+            positions = sim.positions[indices]
+            decision = sim.think(sim.sense(positions), sim.weights1[indices], sim.weights2[indices])
+            forced[indices] = np.argmax(decision, axis=1)
+    return steps_taken
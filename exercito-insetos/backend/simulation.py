@@ -1,86 +1,310 @@
-from .agent import Insect
+from .agent import Insect, SIGHT_DISTANCE, MOVES
+from .maze import Maze, get_maze
+from .rollout import NUMBA_AVAILABLE, ROLLOUT_BACKENDS, run_rollout
+from instrumentation import timer, rate
 import numpy as np
+import re
+
+# One letter per move in compact path formats, indexed like MOVES
+MOVE_CODES = np.frombuffer(b"UDLR", dtype=np.uint8)
+PATH_FORMATS = ("points", "directions", "rle", "none")
+# Distance to the exit used by evaluate_fitness: straight line, or moves
+# along open cells (see Maze.exit_distances)
+FITNESS_MODES = ("euclidean", "geodesic")
+
+# Largest visited-cell bitset (in bytes) allocated per generation; above it,
+# revisits are found by scanning each insect's own path instead
+VISITED_BITSET_BUDGET = 32 * 1024 * 1024
+
+STEP_RATE = rate("simulation_steps_per_second", "Simulation steps per second")
+INSECT_STEP_RATE = rate("insect_steps_per_second", "Insect moves simulated per second")
+GENERATION_RATE = rate("generations_per_second", "Generations per second")
 
 class Simulation:
-    def __init__(self, maze_file, population_size=50):
+    def __init__(self, maze_file, population_size=50, fitness_mode="euclidean", rollout="auto"):
+        if fitness_mode not in FITNESS_MODES:
+            raise ValueError(f"fitness_mode must be one of {FITNESS_MODES}")
+        if rollout not in ROLLOUT_BACKENDS:
+            raise ValueError(f"rollout must be one of {ROLLOUT_BACKENDS}")
+        if rollout == "numba" and not NUMBA_AVAILABLE:
+            raise ValueError("the numba rollout needs Numba installed")
+        self.fitness_mode = fitness_mode
+        # run_generation runs whole generations in one compiled call (see
+        # rollout.py) when Numba is available, or steps them with NumPy
+        self.use_kernel = rollout == "numba" or (rollout == "auto" and NUMBA_AVAILABLE)
         self.maze, self.start_pos, self.end_pos = self.load_maze(maze_file)
         self.population_size = population_size
-        self.insects = [Insect(self.start_pos[0], self.start_pos[1]) for _ in range(population_size)]
         self.generation = 1
         self.max_steps = 200 # Max steps per generation
-        self.current_step = 0
+        # An insect's move depends only on its cell, so revisiting a cell means it
+        # will repeat the same cycle until max_steps. Such insects are stopped
+        # and fast-forwarded, which gives the same result without simulating
+        # the remaining steps. loop_penalty (1.0 = none) scales their fitness.
+        self.detect_loops = True
+        self.loop_penalty = 1.0
+        self.set_population([Insect(self.start_pos[0], self.start_pos[1]) for _ in range(population_size)])
 
     def load_maze(self, maze_file):
-        with open(maze_file, 'r') as f:
-            lines = f.readlines()
-        
-        grid = []
-        start = (0, 0)
-        end = (0, 0)
-        
-        for y, line in enumerate(lines):
-            row = []
-            for x, char in enumerate(line.strip()):
-                if char == '1':
-                    row.append(1)
-                elif char == '0':
-                    row.append(0)
-                elif char == 'S':
-                    start = (x, y)
-                    row.append(0)
-                elif char == 'E':
-                    end = (x, y)
-                    row.append(0)
-                else:
-                    row.append(1) # Default to wall
-            grid.append(row)
-            
-        return grid, start, end
+        # Parsed mazes and their lookup tables are cached per file
+        self.maze_data = maze_file if isinstance(maze_file, Maze) else get_maze(maze_file)
+        self.walls = self.maze_data.walls
+        self.sensor_readings = self.maze_data.sensor_readings.reshape(-1, self.maze_data.sensor_readings.shape[2])
+        return self.maze_data.grid, self.maze_data.start, self.maze_data.end
+
+    def set_population(self, insects):
+        """Starts a generation: the state of every insect is held in arrays
+        while it runs and copied back to the Insect objects when it ends."""
+        self.insects = insects
+        self.current_step = 0
+
+        self.weights1 = np.stack([i.weights1 for i in insects])
+        self.weights2 = np.stack([i.weights2 for i in insects])
+        self.positions = np.array([(i.x, i.y) for i in insects], dtype=np.int64)
+        self.is_dead = np.array([i.is_dead for i in insects], dtype=bool)
+        self.reached_goal = np.array([i.reached_goal for i in insects], dtype=bool)
+        self.fitness = np.zeros(len(insects))
+
+        # Paths for the whole generation in one preallocated array; each
+        # insect's path is paths[i, :path_lengths[i]]
+        self.paths = np.empty((len(insects), self.max_steps + 1, 2), dtype=np.int16)
+        self.paths[:, 0] = self.positions
+        self.path_lengths = np.ones(len(insects), dtype=np.int64)
+
+        # Loop detection: where each looping insect's cycle starts in its path and how long it is
+        self.is_looping = np.zeros(len(insects), dtype=bool)
+        self.loop_start = np.zeros(len(insects), dtype=np.int64)
+        self.loop_length = np.zeros(len(insects), dtype=np.int64)
+        n_cells = self.maze_data.width * self.maze_data.height
+        # Only the NumPy stepper reads it; the compiled rollout keeps its own visited set
+        if (self.detect_loops and not self.use_kernel
+                and len(insects) * ((n_cells + 7) // 8) <= VISITED_BITSET_BUDGET):
+            # One bit per maze cell per insect
+            self.visited = np.zeros((len(insects), (n_cells + 7) // 8), dtype=np.uint8)
+            self.mark_visited(np.arange(len(insects)), self.positions)
+        else:
+            self.visited = None
+
+        # Insect-steps actually simulated vs. skipped by fast-forwarding loops
+        self.steps_simulated = 0
+        self.steps_skipped = 0
+
+    def flat_index(self, positions):
+        return (positions[:, 1] + SIGHT_DISTANCE) * self.walls.shape[1] + positions[:, 0] + SIGHT_DISTANCE
+
+    def mark_visited(self, indices, positions):
+        """Sets the visited bit of each position and returns whether it was already set."""
+        cells = positions[:, 1] * self.maze_data.width + positions[:, 0]
+        byte, bit = cells >> 3, (1 << (cells & 7)).astype(np.uint8)
+        seen = (self.visited[indices, byte] & bit) != 0
+        self.visited[indices, byte] |= bit
+        return seen
+
+    def find_loops(self, indices, positions):
+        """Marks insects that just moved onto a cell they had already visited."""
+        if self.visited is not None:
+            seen = self.mark_visited(indices, positions)
+            looping, positions = indices[seen], positions[seen]
+        else:
+            looping = indices
+        if not looping.size:
+            return
+
+        # Where the new position first appears in each path (the new position itself is last)
+        lengths = self.path_lengths[looping] - 1
+        paths = self.paths[looping, :lengths.max(initial=0)]
+        matches = np.all(paths == positions[:, None, :], axis=2) & (np.arange(paths.shape[1]) < lengths[:, None])
+        found = matches.any(axis=1)
+        looping, lengths = looping[found], lengths[found]
+        self.loop_start[looping] = matches[found].argmax(axis=1)
+        self.loop_length[looping] = lengths - self.loop_start[looping]
+        self.is_looping[looping] = True
+
+    def fast_forward_loops(self):
+        """Moves looping insects to where they would be after max_steps moves,
+        filling in their paths by repeating the cycle."""
+        looping = np.flatnonzero(self.is_looping)
+        if not looping.size:
+            return
+        step = np.arange(self.max_steps + 1)
+        start, length = self.loop_start[looping, None], self.loop_length[looping, None]
+        source = np.where(step < start, step, start + (step - start) % length)
+        self.paths[looping] = np.take_along_axis(self.paths[looping], source[..., None], axis=1)
+        self.steps_skipped += int(np.sum(self.max_steps + 1 - self.path_lengths[looping]))
+        self.path_lengths[looping] = self.max_steps + 1
+        self.positions[looping] = self.paths[looping, self.max_steps]
+
+    def sense(self, positions):
+        # Wall distances along every ray were precomputed for the whole maze
+        return self.sensor_readings[positions[:, 1] * self.maze_data.width + positions[:, 0]]
+
+    def think(self, sensors, weights1, weights2):
+        hidden = np.tanh(np.einsum('ni,nij->nj', sensors, weights1))
+        return np.tanh(np.einsum('ni,nij->nj', hidden, weights2))
 
     def run_step(self):
-        active_insects = False
-        for insect in self.insects:
-            if not insect.is_dead and not insect.reached_goal:
-                insect.move(self.maze)
-                
+        active = np.flatnonzero(~self.is_dead & ~self.reached_goal & ~self.is_looping)
+        self.steps_simulated += active.size
+        if active.size:
+            positions = self.positions[active]
+            with timer("sense"):
+                sensors = self.sense(positions)
+            with timer("think"):
+                decision = self.think(sensors, self.weights1[active], self.weights2[active])
+
+            with timer("move"):
+                new_positions = positions + MOVES[np.argmax(decision, axis=1)]
+
+                # Check collision
+                hit_wall = self.walls.ravel().take(self.flat_index(new_positions))
+                self.is_dead[active[hit_wall]] = True # Hit a wall
+
+                moved = active[~hit_wall]
+                self.positions[moved] = new_positions[~hit_wall]
+                self.paths[moved, self.path_lengths[moved]] = new_positions[~hit_wall]
+                self.path_lengths[moved] += 1
+
                 # Check goal
-                if (insect.x, insect.y) == self.end_pos:
-                    insect.reached_goal = True
-                    
-                active_insects = True
-        
+                self.reached_goal[moved] = np.all(self.positions[moved] == self.end_pos, axis=1)
+
+                if self.detect_loops:
+                    self.find_loops(moved, self.positions[moved])
+
         self.current_step += 1
-        return active_insects and self.current_step < self.max_steps
+        STEP_RATE.tick()
+        INSECT_STEP_RATE.tick(active.size)
+        running = active.size > 0 and self.current_step < self.max_steps
+        if not running:
+            # Ends early once every insect is dead, at the exit or in a cycle
+            self.fast_forward_loops()
+            self.sync_insects()
+        return running
+
+    def run_compiled(self):
+        """Runs the rest of the generation in one compiled call; the results,
+        step counts included, are the same as calling run_step until it ends."""
+        start_step = self.current_step
+        with timer("rollout"):
+            steps_taken = run_rollout(self)
+        simulated = int(np.sum(steps_taken - start_step))
+        self.steps_simulated += simulated
+        self.current_step = min(int(steps_taken.max(initial=start_step)) + 1, self.max_steps)
+        STEP_RATE.tick(self.current_step - start_step)
+        INSECT_STEP_RATE.tick(simulated)
+        self.fast_forward_loops()
+        self.sync_insects()
+
+    def sync_insects(self):
+        for i, insect in enumerate(self.insects):
+            insect.x, insect.y = self.positions[i].tolist()
+            insect.is_dead = bool(self.is_dead[i])
+            insect.reached_goal = bool(self.reached_goal[i])
+            # A view into the generation's path array, not a copy
+            insect.path = self.paths[i, :self.path_lengths[i]]
+
+    def distance_to_exit(self):
+        if self.fitness_mode == "geodesic":
+            exit_distances = self.maze_data.exit_distances
+            dist = exit_distances[self.positions[:, 1], self.positions[:, 0]].astype(float)
+            # Cells cut off from the exit count as farther than any reachable one
+            return np.where(dist >= 0, dist, exit_distances.max() + 1)
+        return np.sqrt(np.sum((self.positions - self.end_pos) ** 2, axis=1))
 
     def evaluate_fitness(self):
-        for insect in self.insects:
-            dist = np.sqrt((insect.x - self.end_pos[0])**2 + (insect.y - self.end_pos[1])**2)
-            # Basic fitness: Closer is better
-            score = 1.0 / (dist + 1.0)
-            
-            if insect.reached_goal:
-                score *= 10.0 # Big bonus
-                # Better if faster
-                score += (1.0 / len(insect.path)) * 5.0
-                
-            if insect.is_dead:
-                score *= 0.1 # Penalty
-                
-            insect.fitness = score
-            
+        dist = self.distance_to_exit()
+        # Basic fitness: Closer is better
+        score = 1.0 / (dist + 1.0)
+
+        # Big bonus for reaching the goal, better if faster
+        score = np.where(self.reached_goal, score * 10.0 + (1.0 / self.path_lengths) * 5.0, score)
+        score = np.where(self.is_dead, score * 0.1, score) # Penalty
+        score = np.where(self.is_looping, score * self.loop_penalty, score)
+
+        self.fitness = score
+        for insect, fitness in zip(self.insects, score.tolist()):
+            insect.fitness = fitness
+
+    def run_generation(self):
+        """Runs the current generation to the end, scores it and returns its stats."""
+        # Run full generation until completion or max steps
+        if self.use_kernel:
+            self.run_compiled()
+        else:
+            while self.run_step():
+                pass
+
+        # Evaluate fitness
+        with timer("fitness"):
+            self.evaluate_fitness()
+        GENERATION_RATE.tick()
+        return {
+            "generation": self.generation,
+            "max_fitness": float(self.fitness.max()),
+            "avg_fitness": float(self.fitness.mean()),
+            "reached_goal": int(self.reached_goal.sum()),
+            "looping": int(self.is_looping.sum()),
+            "steps_saved": self.steps_skipped / max(1, self.steps_simulated + self.steps_skipped)
+        }
+
     def get_best_agent(self):
         best_agent = max(self.insects, key=lambda i: i.fitness)
         return best_agent
 
-    def get_population_data(self):
-        return [
-            {
+    def select_insects(self, top_k=None, sample=None):
+        """Indices of the insects to report: the top_k by fitness, a random
+        sample of `sample` insects, or everyone."""
+        if (top_k is not None and top_k < 0) or (sample is not None and sample < 0):
+            raise ValueError("top_k and sample must not be negative")
+        n = len(self.insects)
+        if top_k is not None:
+            return np.argsort(-self.fitness, kind="stable")[:top_k]
+        if sample is not None and sample < n:
+            return np.sort(np.random.choice(n, sample, replace=False))
+        return np.arange(n)
+
+    def encode_paths(self, indices, path_format):
+        """Paths of the given insects as move letters (U/D/L/R) from the start,
+        either one letter per move ("directions") or run-length encoded ("rle",
+        e.g. "3R2D" for RRRDD)."""
+        paths = self.paths[indices]
+        steps = np.diff(paths.astype(np.int64), axis=1)
+        # Each step is exactly one of MOVES: (0,-1)->U, (0,1)->D, (-1,0)->L, (1,0)->R
+        # (entries past each path's end are garbage and only clipped into range)
+        move_index = np.where(steps[..., 0] == 0, (steps[..., 1] + 1) // 2, 2 + (steps[..., 0] + 1) // 2)
+        codes = MOVE_CODES[np.clip(move_index, 0, len(MOVE_CODES) - 1)]
+        encoded = []
+        for row, length in zip(codes, self.path_lengths[indices].tolist()):
+            moves = row[:length - 1].tobytes().decode()
+            if path_format == "rle":
+                moves = "".join(f"{len(m.group())}{m.group()[0]}" for m in re.finditer(r"(.)\1*", moves))
+            encoded.append(moves)
+        return encoded
+
+    def get_population_data(self, path_format="points", top_k=None, sample=None):
+        if path_format not in PATH_FORMATS:
+            raise ValueError(f"path_format must be one of {PATH_FORMATS}")
+
+        indices = self.select_insects(top_k, sample)
+        if path_format == "points":
+            paths = [self.paths[i, :self.path_lengths[i]].tolist() for i in indices]
+        elif path_format == "none":
+            paths = [None] * len(indices)
+        else:
+            paths = self.encode_paths(indices, path_format)
+
+        data = []
+        for i, path in zip(indices.tolist(), paths):
+            agent = self.insects[i]
+            entry = {
                 "id": i,
                 "x": agent.x,
                 "y": agent.y,
                 "is_dead": agent.is_dead,
-                "reached_goal": agent.reached_goal,
-                "path": agent.path
+                "reached_goal": agent.reached_goal
             }
-            for i, agent in enumerate(self.insects)
-        ]
+            if path_format == "points":
+                entry["path"] = path
+            elif path_format != "none":
+                entry["start"] = self.paths[i, 0].tolist()
+                entry["path"] = path
+            data.append(entry)
+        return data
@@ -0,0 +1,191 @@
+import asyncio
+import json
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import uuid
+from .agent import Insect
+from .simulation import Simulation, GENERATION_RATE, STEP_RATE, INSECT_STEP_RATE
+from .evolution import Evolution
+from .multi_maze import MultiMazeEvaluator
+from instrumentation import record_duration
+
+def train_worker(maze_path, population_size, generations, goal_threshold, mutation_rate, fitness_mode, events, cancel_event,
+                 eval_mazes=(), eval_workers=None):
+    """Trains for up to `generations` generations, or until at least
+    `goal_threshold` (a fraction of the population) reaches the exit.
+
+    With `eval_mazes`, every generation is also scored on those mazes (in
+    `eval_workers` processes) and fitness is averaged over all mazes, so the
+    population is trained to generalize; the goal threshold then counts
+    insects that solved every maze.
+
+    Runs in its own process and reports through the `events` queue: one
+    "generation" event per generation, then a final "done" (with the trained
+    weights) or "error" event.
+    """
+    evaluator = None
+    try:
+        sim = Simulation(maze_path, population_size, fitness_mode)
+        evo = Evolution(mutation_rate=mutation_rate)
+        if eval_mazes:
+            evaluator = MultiMazeEvaluator(eval_mazes, population_size, eval_workers, fitness_mode)
+        status = "completed"
+        for i in range(generations):
+            if cancel_event.is_set():
+                status = "cancelled"
+                break
+
+            start = time.perf_counter()
+            stats = sim.run_generation()
+            if evaluator is not None:
+                stats.update(evaluator.score(sim))
+            stats["seconds"] = time.perf_counter() - start
+            stats["steps"], stats["insect_steps"] = sim.current_step, sim.steps_simulated
+            best = sim.get_population_data("directions", top_k=1)[0]
+            events.put({"type": "generation", "stats": stats, "best": best})
+
+            solved = stats["solved_all"] if evaluator is not None else stats["reached_goal"]
+            if goal_threshold is not None and solved >= goal_threshold * population_size:
+                status = "goal_reached"
+                break
+            if i < generations - 1:
+                sim.set_population(evo.next_generation(sim.insects, sim.start_pos[0], sim.start_pos[1]))
+                sim.generation += 1
+
+        events.put({
+            "type": "done",
+            "status": status,
+            "generation": sim.generation,
+            "weights1": sim.weights1,
+            "weights2": sim.weights2
+        })
+    except Exception as e:
+        events.put({"type": "error", "status": "failed", "error": repr(e)})
+    finally:
+        if evaluator is not None:
+            evaluator.close()
+
+class TrainingJob:
+    """A training run in a worker process.
+
+    A reader thread forwards the worker's events to the event loop, where they
+    update the job's progress and are fanned out to any stream subscribers.
+    The worker's own metrics are not exported, so the reader thread also
+    records each generation in the server's rate gauges and timings.
+    """
+    def __init__(self, maze_name, maze_path, population_size, generations, goal_threshold, mutation_rate, fitness_mode="euclidean",
+                 eval_mazes=(), eval_workers=None):
+        self.id = uuid.uuid4().hex
+        self.maze_name = maze_name
+        self.maze_path = maze_path
+        self.population_size = population_size
+        self.generations = generations
+        self.goal_threshold = goal_threshold
+        self.fitness_mode = fitness_mode
+        self.eval_mazes = list(eval_mazes)
+        self.status = "running"
+        self.error = None
+        self.history = []
+        self.best = None
+        self.weights = None
+        # Generation number of the weights: the next, unevaluated one when cancelled
+        self.generation = None
+        self.subscribers = set()
+
+        context = multiprocessing.get_context("spawn")
+        self.events = context.Queue()
+        self.cancel_event = context.Event()
+        self.process = context.Process(
+            target=train_worker,
+            args=(maze_path, population_size, generations, goal_threshold, mutation_rate, fitness_mode, self.events, self.cancel_event,
+                  self.eval_mazes, eval_workers),
+            # Daemon processes cannot start the evaluator's worker pool
+            daemon=not self.eval_mazes
+        )
+
+    def start(self):
+        self.loop = asyncio.get_running_loop()
+        self.process.start()
+        threading.Thread(target=self.read_events, daemon=True).start()
+
+    def read_events(self):
+        while True:
+            try:
+                event = self.events.get(timeout=1.0)
+            except queue.Empty:
+                if self.process.is_alive():
+                    continue
+                # The worker exited without reporting back (crashed or was terminated)
+                event = {"type": "error", "status": "failed", "error": f"Worker exited with code {self.process.exitcode}"}
+            if event["type"] == "generation":
+                self.record_metrics(event["stats"])
+            self.loop.call_soon_threadsafe(self.handle_event, event)
+            if event["type"] != "generation":
+                break
+        self.process.join()
+
+    def record_metrics(self, stats):
+        GENERATION_RATE.tick()
+        STEP_RATE.tick(stats["steps"])
+        INSECT_STEP_RATE.tick(stats["insect_steps"])
+        record_duration("training_generation", stats["seconds"])
+
+    def handle_event(self, event):
+        if event["type"] == "generation":
+            self.history.append(event["stats"])
+            self.best = event["best"]
+        else:
+            self.status = event["status"]
+            self.error = event.get("error")
+            if event["type"] == "done":
+                self.weights = (event.pop("weights1"), event.pop("weights2"))
+                self.generation = event["generation"]
+
+        for subscriber in self.subscribers:
+            subscriber.put_nowait(event)
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def terminate(self):
+        if self.process.is_alive():
+            self.process.terminate()
+
+    def trained_insects(self, start_x, start_y):
+        weights1, weights2 = self.weights
+        return [Insect(start_x, start_y, (w1.copy(), w2.copy())) for w1, w2 in zip(weights1, weights2)]
+
+    def progress(self):
+        return {
+            "id": self.id,
+            "maze": self.maze_name,
+            "status": self.status,
+            "error": self.error,
+            "generations_done": len(self.history),
+            "generations": self.generations,
+            "goal_threshold": self.goal_threshold,
+            "fitness_mode": self.fitness_mode,
+            "eval_mazes": [os.path.splitext(os.path.basename(m))[0] for m in self.eval_mazes],
+            "latest": self.history[-1] if self.history else None,
+            "best": self.best
+        }
+
+    async def stream(self):
+        """Server-Sent Events: the current progress, then one event per
+        generation until the job finishes."""
+        subscriber = asyncio.Queue()
+        self.subscribers.add(subscriber)
+        try:
+            yield f"event: progress\ndata: {json.dumps(self.progress())}\n\n"
+            if self.status != "running":
+                return
+            while True:
+                event = await subscriber.get()
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+                if event["type"] != "generation":
+                    break
+        finally:
+            self.subscribers.discard(subscriber)
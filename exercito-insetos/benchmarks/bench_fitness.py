@@ -0,0 +1,58 @@
+"""Generations until an insect first reaches the exit, per fitness mode.
+
+Run from the exercito-insetos directory:
+    python benchmarks/bench_fitness.py --population 200 --generations 200 --runs 10
+"""
+import argparse
+import os
+import sys
+import numpy as np
+
+# Add project root and repository root (shared evolution_core/instrumentation) to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend.simulation import Simulation, FITNESS_MODES
+from backend.evolution import Evolution
+
+MAZE_DIR = os.path.join(os.path.dirname(__file__), '..', 'mazes')
+
+def first_goal(maze, fitness_mode, population, generations, seed):
+    """Generation at which the exit was first reached (or None) and the fewest
+    moves from the exit any insect ended a generation at."""
+    np.random.seed(seed)
+    sim = Simulation(os.path.join(MAZE_DIR, f"{maze}.txt"), population, fitness_mode)
+    evo = Evolution(mutation_rate=0.05)
+    exit_distances = sim.maze_data.exit_distances
+    closest = int(exit_distances.max())
+    for _ in range(generations):
+        stats = sim.run_generation()
+        dist = exit_distances[sim.positions[:, 1], sim.positions[:, 0]]
+        closest = int(dist[dist >= 0].min(initial=closest))
+        if stats["reached_goal"]:
+            return sim.generation, closest
+        sim.set_population(evo.next_generation(sim.insects, sim.start_pos[0], sim.start_pos[1]))
+        sim.generation += 1
+    return None, closest
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mazes", nargs="+", default=["easy", "hard"])
+    parser.add_argument("--population", type=int, default=200)
+    parser.add_argument("--generations", type=int, default=200)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'maze':<8} {'fitness':<10} {'solved':>7} {'median gen':>11} {'mean gen':>9} {'closest':>8}")
+    for maze in args.mazes:
+        for fitness_mode in FITNESS_MODES:
+            # Same seeds for both modes, so runs start from the same random population
+            results = [first_goal(maze, fitness_mode, args.population, args.generations, seed) for seed in range(args.runs)]
+            solved = [g for g, _ in results if g is not None]
+            closest = np.median([c for _, c in results])
+            median = f"{np.median(solved):.0f}" if solved else "-"
+            mean = f"{np.mean(solved):.1f}" if solved else "-"
+            print(f"{maze:<8} {fitness_mode:<10} {len(solved):>3}/{args.runs:<3} {median:>11} {mean:>9} {closest:>8.0f}")
+
+if __name__ == "__main__":
+    main()
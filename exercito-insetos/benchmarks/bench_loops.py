@@ -0,0 +1,50 @@
+"""Fraction of insect-steps saved by loop detection while evolving on each maze.
+
+Run from the exercito-insetos directory:
+    python benchmarks/bench_loops.py --population 1000 --generations 30
+"""
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+# Add project root and repository root (shared evolution_core/instrumentation) to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend.simulation import Simulation
+from backend.evolution import Evolution
+
+MAZE_DIR = os.path.join(os.path.dirname(__file__), '..', 'mazes')
+
+def run(maze, population, generations, seed):
+    np.random.seed(seed)
+    sim = Simulation(os.path.join(MAZE_DIR, f"{maze}.txt"), population)
+    evo = Evolution(mutation_rate=0.05)
+    simulated = skipped = 0
+    start = time.perf_counter()
+    for _ in range(generations):
+        sim.run_generation()
+        simulated += sim.steps_simulated
+        skipped += sim.steps_skipped
+        sim.set_population(evo.next_generation(sim.insects, sim.start_pos[0], sim.start_pos[1]))
+        sim.generation += 1
+    return skipped / (simulated + skipped), time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mazes", nargs="+", default=["easy", "hard"])
+    parser.add_argument("--population", type=int, default=1000)
+    parser.add_argument("--generations", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"population={args.population} generations={args.generations}")
+    print(f"{'maze':>8} {'steps saved':>12} {'seconds':>8}")
+    for maze in args.mazes:
+        saved, seconds = run(maze, args.population, args.generations, args.seed)
+        print(f"{maze:>8} {saved:>12.1%} {seconds:>8.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Generation time of the NumPy step loop against the compiled Numba rollout.
+
+Each generation is timed from set_population, which allocates its state.
+
+Run from the exercito-insetos directory (needs Numba for the numba column):
+    python benchmarks/bench_rollout.py --populations 100 1000 5000 --sizes 21 61 121
+"""
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+# Add project root and repository root (shared evolution_core/instrumentation) to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend.maze import Maze
+from backend.maze_generator import generate_maze
+from backend.rollout import NUMBA_AVAILABLE
+from backend.simulation import Simulation
+
+def generation_time(maze, population, rollout, repeats, seed):
+    times = []
+    for _ in range(repeats):
+        np.random.seed(seed)
+        sim = Simulation(maze, population, rollout=rollout)
+        start = time.perf_counter()
+        sim.set_population(sim.insects)
+        sim.run_generation()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--populations", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[21, 61, 121], help="Square maze sizes")
+    parser.add_argument("--loopiness", type=float, default=0.1)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    backends = ["numpy", "numba"] if NUMBA_AVAILABLE else ["numpy"]
+    if NUMBA_AVAILABLE:
+        # Compile outside the measurements
+        grid, start, end = generate_maze(21, 21, seed=args.seed)
+        Simulation(Maze(grid, start, end), 2, rollout="numba").run_generation()
+
+    print(f"{'size':>6} {'population':>11} " + " ".join(f"{b:>9}" for b in backends) + (f" {'speedup':>8}" if len(backends) > 1 else ""))
+    for size in args.sizes:
+        grid, start, end = generate_maze(size, size, seed=args.seed, loopiness=args.loopiness)
+        maze = Maze(grid, start, end)
+        for population in args.populations:
+            times = [generation_time(maze, population, b, args.repeats, args.seed) for b in backends]
+            line = f"{size:>6} {population:>11} " + " ".join(f"{t:>9.4f}" for t in times)
+            if len(times) > 1:
+                line += f" {times[0] / times[1]:>7.1f}x"
+            print(line)
+
+if __name__ == "__main__":
+    main()
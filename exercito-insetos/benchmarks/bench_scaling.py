@@ -0,0 +1,117 @@
+"""How generation time scales with maze size and population size.
+
+Mazes are generated from a fixed seed, so runs are comparable over time.
+Run from the exercito-insetos directory:
+    python benchmarks/bench_scaling.py --sizes 21 101 501 1001 --populations 100 1000 10000 --json scaling.json
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import numpy as np
+
+# Add project root and repository root (shared evolution_core/instrumentation) to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend.maze import load_maze_file
+from backend.maze_generator import generate_maze, maze_to_text, ALGORITHMS
+from backend.simulation import Simulation
+
+def best_time(fn, repeats, setup=None):
+    times = []
+    for _ in range(repeats):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def bench_population(maze, population, repeats, seed):
+    np.random.seed(seed)
+    start = time.perf_counter()
+    sim = Simulation(maze, population)
+    setup = time.perf_counter() - start
+    insects = sim.insects
+
+    # A whole generation of random insects (most die within a few steps)
+    generation = best_time(sim.run_generation, repeats, lambda: sim.set_population(insects))
+    generation_steps = sim.current_step
+
+    # One step with every insect alive, spread over random open cells
+    open_cells = np.argwhere(maze.exit_distances >= 0)[:, ::-1]
+    cells = open_cells[np.random.randint(len(open_cells), size=population)]
+    def scatter():
+        sim.set_population(insects)
+        sim.positions[:] = cells
+        sim.paths[:, 0] = cells
+    step = best_time(sim.run_step, repeats, scatter)
+    sense = best_time(lambda: sim.sense(sim.positions), repeats, scatter)
+    fitness = best_time(sim.evaluate_fitness, repeats, scatter)
+
+    return {
+        "population": population,
+        "setup_seconds": setup,
+        "generation_seconds": generation,
+        "generation_steps": generation_steps,
+        "step_seconds": step,
+        "steps_per_sec": 1.0 / step,
+        "insect_steps_per_sec": population / step,
+        "sense_seconds": sense,
+        "evaluate_fitness_seconds": fitness
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[21, 101, 501, 1001])
+    parser.add_argument("--populations", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--algorithm", choices=ALGORITHMS, default="backtracker")
+    parser.add_argument("--loopiness", type=float, default=0.05)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'size':>6} {'generate':>9} {'load':>8} {'cached':>8} {'pop':>7} {'gen (s)':>8} {'steps/s':>9} {'insect-steps/s':>15} {'sense':>9} {'fitness':>9}")
+    for size in args.sizes:
+        start = time.perf_counter()
+        grid, maze_start, maze_end = generate_maze(size, size, args.seed, args.algorithm, args.loopiness)
+        generate = time.perf_counter() - start
+        # Loading from text (parse + lookup tables), then from the binary sidecar that wrote
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, f"maze{size}.txt")
+            with open(path, "w") as f:
+                f.write(maze_to_text(grid, maze_start, maze_end))
+            start = time.perf_counter()
+            load_maze_file(path)
+            load = time.perf_counter() - start
+            start = time.perf_counter()
+            maze = load_maze_file(path)
+            cached_load = time.perf_counter() - start
+
+        for population in args.populations:
+            row = bench_population(maze, population, args.repeats, args.seed)
+            row.update(size=size, generate_seconds=generate, load_seconds=load, cached_load_seconds=cached_load)
+            results.append(row)
+            print(f"{size:>6} {generate:>9.3f} {load:>8.3f} {cached_load:>8.4f} {population:>7} {row['generation_seconds']:>8.3f} "
+                  f"{row['steps_per_sec']:>9.0f} {row['insect_steps_per_sec']:>15.0f} "
+                  f"{row['sense_seconds']:>9.5f} {row['evaluate_fitness_seconds']:>9.5f}")
+
+    if args.json:
+        report = {
+            "benchmark": "exercito-insetos scaling",
+            "config": vars(args),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "results": results
+        }
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -68,6 +68,21 @@ function drawAgents() {
     }
 }
 
+// Paths arrive as one move letter per step (U/D/L/R) from the start cell
+const MOVE_DELTAS = {U: [0, -1], D: [0, 1], L: [-1, 0], R: [1, 0]};
+
+function decodePath(start, moves) {
+    let x = start[0];
+    let y = start[1];
+    const points = [[x, y]];
+    for (const move of moves) {
+        x += MOVE_DELTAS[move][0];
+        y += MOVE_DELTAS[move][1];
+        points.push([x, y]);
+    }
+    return points;
+}
+
 async function startSimulation() {
     const mazeName = select('#mazeSelect').value();
     const response = await fetch(`http://localhost:8003/simulation/start/${mazeName}`, {
@@ -94,12 +109,12 @@ async function loopSimulation() {
     if (!isRunning) return;
 
     try {
-        const response = await fetch('http://localhost:8003/simulation/step', {
+        const response = await fetch('http://localhost:8003/simulation/step?path_format=directions', {
             method: 'POST'
         });
         const data = await response.json();
 
-        agents = data.population;
+        agents = data.population.map(agent => ({...agent, path: decodePath(agent.start, agent.path)}));
 
         select('#stats').html(`Generation: ${data.stats.generation} | Best Fitness: ${data.stats.max_fitness.toFixed(4)} | Reached Goal: ${data.stats.reached_goal}`);
 
@@ -0,0 +1,157 @@
+import sys
+import os
+import copy
+import re
+from collections import deque
+import numpy as np
+
+# Add project root and repository root (shared evolution_core/instrumentation) to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend import simulation
+from backend.simulation import Simulation
+from backend.maze import get_maze
+
+MAZE_DIR = os.path.join(os.path.dirname(__file__), '..', 'mazes')
+
+def run_reference(sim, insects):
+    # Per-insect loop the batched engine replaces
+    for _ in range(sim.max_steps):
+        active = False
+        for insect in insects:
+            if not insect.is_dead and not insect.reached_goal:
+                insect.move(sim.maze)
+                if (insect.x, insect.y) == sim.end_pos:
+                    insect.reached_goal = True
+                active = True
+        if not active:
+            break
+
+def test_batch_matches_reference():
+    for maze in ("easy", "hard"):
+        np.random.seed(1)
+        sim = Simulation(os.path.join(MAZE_DIR, f"{maze}.txt"), population_size=300)
+        reference = copy.deepcopy(sim.insects)
+
+        while sim.run_step():
+            pass
+        run_reference(sim, reference)
+
+        for batched, ref in zip(sim.insects, reference):
+            assert (batched.x, batched.y) == (ref.x, ref.y)
+            assert batched.is_dead == ref.is_dead
+            assert batched.reached_goal == ref.reached_goal
+            assert [tuple(p) for p in batched.path] == ref.path
+    print("PASS: Batched run_step matches per-insect moves.")
+
+def test_sense_matches_reference():
+    sim = Simulation(os.path.join(MAZE_DIR, "hard.txt"), population_size=1)
+    insect = sim.insects[0]
+    free = np.argwhere(~sim.walls[10:-10, 10:-10])
+    readings = sim.sense(free[:, ::-1])
+    for (y, x), reading in zip(free, readings):
+        insect.x, insect.y = x, y
+        assert np.allclose(insect.sense(sim.maze), reading)
+
+def test_compact_paths():
+    np.random.seed(2)
+    sim = Simulation(os.path.join(MAZE_DIR, "hard.txt"), population_size=200)
+    while sim.run_step():
+        pass
+    sim.evaluate_fitness()
+
+    points = sim.get_population_data()
+    directions = sim.get_population_data("directions")
+    rle = sim.get_population_data("rle")
+    deltas = {"U": (0, -1), "D": (0, 1), "L": (-1, 0), "R": (1, 0)}
+    for full, moves, runs in zip(points, directions, rle):
+        x, y = moves["start"]
+        decoded = [[x, y]]
+        for move in moves["path"]:
+            x, y = x + deltas[move][0], y + deltas[move][1]
+            decoded.append([x, y])
+        assert decoded == full["path"]
+        expanded = "".join(int(count) * move for count, move in re.findall(r"(\d+)(\D)", runs["path"]))
+        assert expanded == moves["path"]
+
+    top = sim.get_population_data("none", top_k=5)
+    assert [a["id"] for a in top] == list(np.argsort(-sim.fitness, kind="stable")[:5])
+    assert len(sim.get_population_data(sample=10)) == 10
+    for bad in ({"top_k": -1}, {"sample": -1}):
+        try:
+            sim.get_population_data(**bad)
+            assert False, f"{bad} should be rejected"
+        except ValueError:
+            pass
+
+def test_loop_detection_gives_same_results():
+    for budget in (simulation.VISITED_BITSET_BUDGET, 0): # Bitset and path scan
+        original_budget = simulation.VISITED_BITSET_BUDGET
+        simulation.VISITED_BITSET_BUDGET = budget
+        try:
+            np.random.seed(3)
+            fast = Simulation(os.path.join(MAZE_DIR, "hard.txt"), population_size=500)
+            slow = Simulation(os.path.join(MAZE_DIR, "hard.txt"), population_size=1)
+            slow.detect_loops = False
+            slow.set_population(copy.deepcopy(fast.insects))
+
+            fast_stats = fast.run_generation()
+            slow_stats = slow.run_generation()
+        finally:
+            simulation.VISITED_BITSET_BUDGET = original_budget
+
+        assert fast_stats["looping"] > 0
+        assert fast_stats["steps_saved"] > 0
+        assert fast.current_step < slow.current_step
+        assert np.array_equal(fast.positions, slow.positions)
+        assert np.array_equal(fast.fitness, slow.fitness)
+        assert fast.get_population_data() == slow.get_population_data()
+
+def test_maze_tables_are_cached():
+    path = os.path.join(MAZE_DIR, "easy.txt")
+    sim1 = Simulation(path, population_size=1)
+    sim2 = Simulation(path, population_size=1)
+    assert sim1.maze_data is sim2.maze_data is get_maze(path)
+    assert sim1.maze_data.wall_distances.shape == (7, 10, 8)
+
+def test_exit_distances():
+    for maze in ("easy", "hard"):
+        data = get_maze(os.path.join(MAZE_DIR, f"{maze}.txt"))
+        # Plain breadth-first search from the exit
+        expected = np.full((data.height, data.width), -1)
+        expected[data.end[1], data.end[0]] = 0
+        queue = deque([data.end])
+        while queue:
+            x, y = queue.popleft()
+            for dx, dy in ((0, -1), (0, 1), (-1, 0), (1, 0)):
+                nx, ny = x + dx, y + dy
+                if 0 <= nx < data.width and 0 <= ny < data.height and data.grid[ny][nx] != 1 and expected[ny, nx] < 0:
+                    expected[ny, nx] = expected[y, x] + 1
+                    queue.append((nx, ny))
+        assert np.array_equal(data.exit_distances, expected)
+
+def test_geodesic_fitness():
+    path = os.path.join(MAZE_DIR, "hard.txt")
+    sim = Simulation(path, population_size=3, fitness_mode="geodesic")
+    data = sim.maze_data
+    # (18, 1) is 8 cells from the exit in a straight line but 16 moves away
+    sim.positions[:] = [(1, 9), (18, 1), data.start]
+    sim.evaluate_fitness()
+    expected = 1.0 / (data.exit_distances[[9, 1, data.start[1]], [1, 18, data.start[0]]] + 1.0)
+    assert np.allclose(sim.fitness, expected)
+
+    try:
+        Simulation(path, population_size=1, fitness_mode="manhattan")
+        assert False, "unknown fitness_mode accepted"
+    except ValueError:
+        pass
+
+if __name__ == "__main__":
+    test_batch_matches_reference()
+    test_sense_matches_reference()
+    test_compact_paths()
+    test_loop_detection_gives_same_results()
+    test_maze_tables_are_cached()
+    test_exit_distances()
+    test_geodesic_fitness()
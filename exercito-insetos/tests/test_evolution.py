@@ -0,0 +1,68 @@
+import sys
+import os
+import numpy as np
+
+# Add project root and repository root (shared evolution_core/instrumentation) to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend.agent import Insect, pack_genomes
+from backend.evolution import Evolution
+
+def population(n):
+    insects = [Insect(1, 1) for _ in range(n)]
+    for i, insect in enumerate(insects):
+        insect.fitness = float(i)
+    return insects
+
+def genomes(insects):
+    return pack_genomes(np.stack([i.weights1 for i in insects]), np.stack([i.weights2 for i in insects]))
+
+def test_children_do_not_alias():
+    np.random.seed(0)
+    old = population(20)
+    before = genomes(old)
+    evo = Evolution(mutation_rate=0.5)
+    new = evo.next_generation(old, 1, 1)
+
+    # The elite is a copy of the best insect's genome
+    assert np.array_equal(genomes(new[:1])[0], before[-1])
+    assert not np.shares_memory(new[0].weights1, old[-1].weights1)
+    new[0].weights1 += 1.0
+    assert np.array_equal(genomes(old), before)
+
+    # Every insect is a view into its own row of the genome buffer
+    buffer = evo.buffers[evo.front]
+    for i, insect in enumerate(new):
+        assert np.shares_memory(insect.weights1, buffer[i])
+        assert np.shares_memory(insect.weights2, buffer[i])
+        if i:
+            assert not np.shares_memory(insect.weights1, new[i - 1].weights1)
+
+def test_double_buffering():
+    np.random.seed(1)
+    evo = Evolution()
+    gen1 = evo.next_generation(population(10), 1, 1)
+    for insect in gen1:
+        insect.fitness = np.random.rand()
+    gen2 = evo.next_generation(gen1, 1, 1)
+    for insect in gen2:
+        insect.fitness = np.random.rand()
+    gen3 = evo.next_generation(gen2, 1, 1)
+
+    assert evo.buffers[0] is not evo.buffers[1]
+    assert np.shares_memory(gen1[0].weights1, gen3[0].weights1)
+    assert not np.shares_memory(gen2[0].weights1, gen3[0].weights1)
+
+def test_crossover_takes_genes_from_the_population():
+    np.random.seed(2)
+    old = population(30)
+    before = genomes(old)
+    new = genomes(Evolution(mutation_rate=0.0).next_generation(old, 1, 1))
+    # Without mutation every gene of a child comes from some parent at the same position
+    assert all(np.isin(new[:, j], before[:, j]).all() for j in range(new.shape[1]))
+
+if __name__ == "__main__":
+    test_children_do_not_alias()
+    test_double_buffering()
+    test_crossover_takes_genes_from_the_population()
@@ -0,0 +1,45 @@
+import sys
+import os
+import tempfile
+import numpy as np
+
+# Add project root and repository root (shared evolution_core/instrumentation) to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend.maze import Maze, parse_maze
+from backend.maze_generator import generate_maze, save_maze, ALGORITHMS
+
+def test_generated_mazes_are_connected():
+    for algorithm in ALGORITHMS:
+        grid, start, end = generate_maze(41, 21, seed=7, algorithm=algorithm)
+        maze = Maze(grid, start, end)
+        # Every open square can reach the exit
+        assert np.array_equal(maze.exit_distances >= 0, grid == 0)
+        # A perfect maze on 20x10 cells opens 200 cells and 199 walls between them
+        assert (grid == 0).sum() == 200 + 199
+        assert grid[0].all() and grid[-1].all() and grid[:, 0].all() and grid[:, -1].all()
+
+def test_seed_and_loopiness():
+    grid1, _, _ = generate_maze(31, 31, seed=1)
+    grid2, _, _ = generate_maze(31, 31, seed=1)
+    grid3, _, _ = generate_maze(31, 31, seed=2)
+    assert np.array_equal(grid1, grid2)
+    assert not np.array_equal(grid1, grid3)
+
+    loopy, _, _ = generate_maze(31, 31, seed=1, loopiness=0.3)
+    assert (loopy == 0).sum() > (grid1 == 0).sum()
+    assert np.all(loopy <= grid1)
+
+def test_text_format_roundtrip():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = save_maze(os.path.join(tmp, "generated.txt"), 15, 9, seed=3, algorithm="prim", loopiness=0.2)
+        grid, start, end = parse_maze(path)
+    expected, expected_start, expected_end = generate_maze(15, 9, seed=3, algorithm="prim", loopiness=0.2)
+    assert np.array_equal(np.array(grid), expected)
+    assert (start, end) == (expected_start, expected_end) == ((1, 1), (13, 7))
+
+if __name__ == "__main__":
+    test_generated_mazes_are_connected()
+    test_seed_and_loopiness()
+    test_text_format_roundtrip()
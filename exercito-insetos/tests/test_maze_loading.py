@@ -0,0 +1,70 @@
+import sys
+import os
+import shutil
+import tempfile
+import numpy as np
+
+# Add project root and repository root (shared evolution_core/instrumentation) to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend.maze import parse_maze, load_maze_file, sidecar_path, CACHED_TABLES
+
+MAZE_DIR = os.path.join(os.path.dirname(__file__), '..', 'mazes')
+
+def parse_reference(maze_file):
+    # Character-by-character parser the vectorized one replaces
+    grid, start, end = [], (0, 0), (0, 0)
+    with open(maze_file) as f:
+        for y, line in enumerate(f.readlines()):
+            row = []
+            for x, char in enumerate(line.strip()):
+                if char == 'S':
+                    start = (x, y)
+                elif char == 'E':
+                    end = (x, y)
+                row.append(0 if char in '0SE' else 1)
+            grid.append(row)
+    return grid, start, end
+
+def test_parse_matches_reference():
+    for maze in ("easy", "hard"):
+        path = os.path.join(MAZE_DIR, f"{maze}.txt")
+        grid, start, end = parse_maze(path)
+        expected_grid, expected_start, expected_end = parse_reference(path)
+        assert grid.dtype == np.uint8
+        assert grid.tolist() == expected_grid
+        assert (start, end) == (expected_start, expected_end)
+
+def test_ragged_rows_are_padded_with_walls():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "ragged.txt")
+        with open(path, "w") as f:
+            f.write("1111\n1S0\n10E1\n1111\n")
+        grid, start, end = parse_maze(path)
+    assert grid.tolist() == [[1, 1, 1, 1], [1, 0, 0, 1], [1, 0, 0, 1], [1, 1, 1, 1]]
+    assert (start, end) == ((1, 1), (2, 2))
+
+def test_sidecar_is_used_and_refreshed():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "hard.txt")
+        shutil.copy(os.path.join(MAZE_DIR, "hard.txt"), path)
+
+        parsed = load_maze_file(path)
+        assert os.path.exists(sidecar_path(path))
+        cached = load_maze_file(path)
+        for name in CACHED_TABLES + ("walls", "sensor_readings"):
+            assert np.array_equal(getattr(cached, name), getattr(parsed, name))
+        assert (cached.start, cached.end) == (parsed.start, parsed.end)
+
+        # Editing the file invalidates the sidecar
+        with open(path, "w") as f:
+            f.write("1111\n1SE1\n1111\n")
+        os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1))
+        edited = load_maze_file(path)
+        assert edited.grid.shape == (3, 4) and edited.end == (2, 1)
+
+if __name__ == "__main__":
+    test_parse_matches_reference()
+    test_ragged_rows_are_padded_with_walls()
+    test_sidecar_is_used_and_refreshed()
@@ -0,0 +1,62 @@
+import sys
+import os
+import queue
+import threading
+import numpy as np
+
+# Add project root and repository root (shared evolution_core/instrumentation) to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend.agent import Insect, GENOME_SIZE, pack_genomes, unpack_genomes
+from backend.multi_maze import MultiMazeEvaluator
+from backend.simulation import Simulation
+from backend.training import train_worker
+
+MAZE_DIR = os.path.join(os.path.dirname(__file__), '..', 'mazes')
+MAZES = [os.path.join(MAZE_DIR, f"{name}.txt") for name in ("easy", "hard")]
+
+def test_pack_genomes_roundtrip():
+    genomes = np.random.uniform(-1, 1, (5, GENOME_SIZE))
+    weights1, weights2 = unpack_genomes(genomes)
+    assert weights1.shape == (5, 8, 8) and weights2.shape == (5, 8, 4)
+    assert np.shares_memory(weights1, genomes)
+    assert np.array_equal(pack_genomes(weights1, weights2), genomes)
+
+def test_evaluator_matches_single_maze_runs():
+    np.random.seed(3)
+    genomes = np.random.uniform(-1, 1, (40, GENOME_SIZE))
+    weights1, weights2 = unpack_genomes(genomes)
+
+    expected = []
+    for path in MAZES:
+        sim = Simulation(path, 1)
+        sim.set_population([Insect(*sim.start_pos, (w1.copy(), w2.copy())) for w1, w2 in zip(weights1, weights2)])
+        sim.run_generation()
+        expected.append(sim.fitness)
+
+    with MultiMazeEvaluator(MAZES, 40, workers=0) as evaluator:
+        serial, _ = evaluator.evaluate(genomes)
+    # More workers than mazes: each maze is also split by genome range
+    with MultiMazeEvaluator(MAZES, 40, workers=3) as evaluator:
+        parallel, _ = evaluator.evaluate(genomes)
+        assert len(evaluator.tasks) == 4
+    assert np.array_equal(serial, expected)
+    assert np.array_equal(parallel, expected)
+
+def test_train_worker_on_several_mazes():
+    events = queue.Queue()
+    train_worker(MAZES[0], 30, 3, None, 0.05, "euclidean", events, threading.Event(), eval_mazes=MAZES[1:], eval_workers=0)
+    result = []
+    while not events.empty():
+        result.append(events.get())
+
+    assert [e["type"] for e in result] == ["generation"] * 3 + ["done"]
+    stats = result[0]["stats"]
+    assert len(stats["reached_goal_per_maze"]) == 2
+    assert stats["solved_all"] <= min(stats["reached_goal_per_maze"])
+
+if __name__ == "__main__":
+    test_pack_genomes_roundtrip()
+    test_evaluator_matches_single_maze_runs()
+    test_train_worker_on_several_mazes()
@@ -0,0 +1,101 @@
+import sys
+import os
+import subprocess
+import textwrap
+import numpy as np
+import pytest
+
+# Add project root and repository root (shared evolution_core/instrumentation) to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend.agent import Insect
+from backend.maze_generator import generate_maze
+from backend.maze import Maze
+from backend.rollout import NUMBA_AVAILABLE
+from backend.simulation import Simulation
+
+MAZE_DIR = os.path.join(os.path.dirname(__file__), '..', 'mazes')
+
+pytestmark = pytest.mark.skipif(not NUMBA_AVAILABLE, reason="Numba is not installed")
+
+def run_both(maze, population_size, seed, prepare=None):
+    results = []
+    for rollout in ("numpy", "numba"):
+        np.random.seed(seed)
+        sim = Simulation(maze, population_size, rollout=rollout)
+        if prepare is not None:
+            prepare(sim)
+        results.append((sim, sim.run_generation()))
+    return results
+
+def assert_same(numpy_run, numba_run):
+    (ref, ref_stats), (sim, stats) = numpy_run, numba_run
+    assert stats == ref_stats
+    assert sim.current_step == ref.current_step
+    assert (sim.steps_simulated, sim.steps_skipped) == (ref.steps_simulated, ref.steps_skipped)
+    for name in ("positions", "is_dead", "reached_goal", "is_looping", "loop_start", "loop_length", "path_lengths", "fitness"):
+        assert np.array_equal(getattr(sim, name), getattr(ref, name)), name
+    for i in range(len(sim.insects)):
+        assert np.array_equal(sim.paths[i, :sim.path_lengths[i]], ref.paths[i, :ref.path_lengths[i]])
+
+def test_kernel_matches_numpy_rollout():
+    for maze in ("easy", "hard"):
+        for seed in range(3):
+            assert_same(*run_both(os.path.join(MAZE_DIR, f"{maze}.txt"), 500, seed))
+
+    grid, start, end = generate_maze(61, 41, seed=4, loopiness=0.2)
+    assert_same(*run_both(Maze(grid, start, end), 2000, 4))
+
+def test_kernel_ties_and_loop_settings():
+    # All-zero weights tie every output; NumPy's argmax decides those moves
+    def zero_weights(sim):
+        sim.set_population([Insect(*sim.start_pos, (np.zeros((8, 8)), np.zeros((8, 4)))) for _ in range(3)])
+    assert_same(*run_both(os.path.join(MAZE_DIR, "easy.txt"), 3, 0, zero_weights))
+
+    def no_loop_detection(sim):
+        sim.detect_loops = False
+        sim.max_steps = 50
+        sim.set_population(sim.insects)
+    assert_same(*run_both(os.path.join(MAZE_DIR, "hard.txt"), 300, 5, no_loop_detection))
+
+def test_kernel_resumes_a_started_generation():
+    runs = []
+    for rollout in ("numpy", "numba"):
+        np.random.seed(6)
+        sim = Simulation(os.path.join(MAZE_DIR, "hard.txt"), 300, rollout=rollout)
+        for _ in range(5):
+            sim.run_step()
+        runs.append((sim, sim.run_generation()))
+    assert_same(*runs)
+
+def test_kernel_skips_the_visited_bitset():
+    # Only the NumPy stepper reads the bitset; the kernel keeps its own visited set
+    sims = run_both(os.path.join(MAZE_DIR, "hard.txt"), 300, 7)
+    (ref, _), (sim, _) = sims
+    assert ref.visited is not None
+    assert sim.visited is None
+    assert_same(*sims)
+    sim.set_population(sim.insects)
+    assert sim.visited is None
+
+def test_kernel_on_a_worker_thread_lets_the_process_exit():
+    # The server runs generations on a thread pool
+    script = textwrap.dedent(f"""
+        import sys, threading
+        sys.path[:0] = [{os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))!r},
+                        {os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))!r}]
+        from backend.simulation import Simulation
+        sim = Simulation({os.path.join(MAZE_DIR, "easy.txt")!r}, 50, rollout="numba")
+        thread = threading.Thread(target=sim.run_generation)
+        thread.start()
+        thread.join()
+    """)
+    subprocess.run([sys.executable, "-c", script], check=True, timeout=60)
+
+if __name__ == "__main__":
+    test_kernel_matches_numpy_rollout()
+    test_kernel_ties_and_loop_settings()
+    test_kernel_resumes_a_started_generation()
+    test_kernel_skips_the_visited_bitset()
+    test_kernel_on_a_worker_thread_lets_the_process_exit()
@@ -0,0 +1,109 @@
+import sys
+import os
+import queue
+import threading
+import time
+from types import SimpleNamespace
+
+# Add project root and repository root (shared evolution_core/instrumentation) to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from fastapi.testclient import TestClient
+from backend.training import train_worker, TrainingJob
+from backend import main
+
+MAZE_DIR = os.path.join(os.path.dirname(__file__), '..', 'mazes')
+
+def collect(events):
+    result = []
+    while not events.empty():
+        result.append(events.get())
+    return result
+
+def test_train_worker_reports_each_generation():
+    events = queue.Queue()
+    train_worker(os.path.join(MAZE_DIR, "easy.txt"), 30, 5, None, 0.05, "euclidean", events, threading.Event())
+    result = collect(events)
+
+    assert [e["type"] for e in result] == ["generation"] * 5 + ["done"]
+    assert [e["stats"]["generation"] for e in result[:-1]] == [1, 2, 3, 4, 5]
+    assert result[-1]["status"] == "completed"
+    assert result[-1]["weights1"].shape == (30, 8, 8)
+    assert set(result[0]["best"]["path"]) <= set("UDLR")
+
+def test_train_worker_cancel():
+    events = queue.Queue()
+    cancel = threading.Event()
+    cancel.set()
+    train_worker(os.path.join(MAZE_DIR, "easy.txt"), 30, 5, None, 0.05, "euclidean", events, cancel)
+    result = collect(events)
+    assert [e["type"] for e in result] == ["done"]
+    assert result[0]["status"] == "cancelled"
+
+class CancelAfter(queue.Queue):
+    """Event queue that cancels the run once `count` generations reported."""
+    def __init__(self, count, cancel):
+        super().__init__()
+        self.count, self.cancel = count, cancel
+
+    def put(self, event):
+        super().put(event)
+        if event["type"] == "generation":
+            self.count -= 1
+            if self.count == 0:
+                self.cancel.set()
+
+def test_cancelled_run_reports_the_generation_of_its_weights():
+    cancel = threading.Event()
+    events = CancelAfter(2, cancel)
+    train_worker(os.path.join(MAZE_DIR, "easy.txt"), 30, 5, None, 0.05, "euclidean", events, cancel)
+    result = collect(events)
+    assert [e["type"] for e in result] == ["generation"] * 2 + ["done"]
+    # Generation 2 was evaluated and evolved; the weights sent are generation 3's
+    assert result[-1]["status"] == "cancelled"
+    assert result[-1]["generation"] == 3
+
+    # /training/{id}/apply labels the applied population with that generation
+    job = TrainingJob("easy", os.path.join(MAZE_DIR, "easy.txt"), 30, 5, None, 0.05)
+    for event in result:
+        job.handle_event(event)
+    assert job.generation == 3 and job.progress()["generations_done"] == 2
+
+def test_finished_jobs_are_pruned():
+    jobs = {f"job{i}": SimpleNamespace(status="completed") for i in range(main.MAX_FINISHED_JOBS + 3)}
+    jobs["running"] = SimpleNamespace(status="running")
+    main.training_jobs.clear()
+    main.training_jobs.update(jobs)
+    main.prune_training_jobs()
+    assert list(main.training_jobs) == [f"job{i}" for i in range(3, main.MAX_FINISHED_JOBS + 3)] + ["running"]
+    main.training_jobs.clear()
+
+def metric(text, name):
+    for line in text.splitlines():
+        if line.startswith(name + " "):
+            return float(line.split()[-1])
+    return 0.0
+
+def test_training_generations_show_in_metrics():
+    # The worker process's own metrics are not exported; the server records its generations
+    count = 'hot_path_duration_seconds_count{path="training_generation"}'
+    with TestClient(main.app) as client:
+        before = metric(client.get("/metrics").text, count)
+        job = client.post("/training/start/easy", params={"population_size": 20, "generations": 3}).json()
+        deadline = time.monotonic() + 60
+        while client.get(f"/training/{job['id']}").json()["status"] == "running":
+            assert time.monotonic() < deadline
+            time.sleep(0.05)
+        text = client.get("/metrics").text
+    main.training_jobs.clear()
+    assert metric(text, count) == before + 3
+    assert metric(text, "generations_per_second") > 0
+    assert metric(text, "insect_steps_per_second") > 0
+
+if __name__ == "__main__":
+    test_train_worker_reports_each_generation()
+    test_train_worker_cancel()
+    test_cancelled_run_reports_the_generation_of_its_weights()
+    test_finished_jobs_are_pruned()
+    test_training_generations_show_in_metrics()
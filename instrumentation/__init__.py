@@ -0,0 +1,4 @@
+"""Performance telemetry shared by the projects in this repository: hot path
+timers, per-second rate gauges and, for the FastAPI apps, request latency
+histograms and a Prometheus /metrics endpoint (see web.instrument_app)."""
+from .metrics import ENABLED, REGISTRY, timer, timed, record_duration, rate, histogram
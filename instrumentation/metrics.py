@@ -0,0 +1,165 @@
+import bisect
+import collections
+import functools
+import os
+import threading
+import time
+
+# Set METRICS=0 in the environment to turn instrumentation off: timers and
+# rate meters then do nothing and decorated functions are left unwrapped.
+ENABLED = os.environ.get("METRICS", "1") != "0"
+
+# Histogram bucket upper bounds, in seconds
+HOT_PATH_BUCKETS = (1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+REQUEST_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+class Histogram:
+    """Counts of observed values per bucket, per label set."""
+    def __init__(self, name, help, buckets):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        i = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                # Per-bucket counts (the last one is +Inf), sum
+                series = self.series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][i] += 1
+            series[1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            series = [(key, list(counts), total) for key, (counts, total) in self.series.items()]
+        for key, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{format_labels(key + (('le', bound),))} {cumulative}")
+            lines.append(f"{self.name}_sum{format_labels(key)} {total}")
+            lines.append(f"{self.name}_count{format_labels(key)} {cumulative}")
+        return lines
+
+class Rate:
+    """Events per second over a sliding window, reported as a gauge.
+
+    Events are summed into slots of window/20 seconds, so memory stays
+    bounded however often tick() is called.
+    """
+    def __init__(self, name, help, window=5.0):
+        self.name = name
+        self.help = help
+        self.window = window
+        self.resolution = window / 20
+        self.slots = collections.deque() # [slot number, count]
+        self.lock = threading.Lock()
+
+    def tick(self, count=1):
+        if not ENABLED:
+            return
+        slot = int(time.monotonic() / self.resolution)
+        with self.lock:
+            if self.slots and self.slots[-1][0] == slot:
+                self.slots[-1][1] += count
+            else:
+                self.slots.append([slot, count])
+                self.expire(slot)
+
+    def expire(self, slot):
+        while self.slots and self.slots[0][0] <= slot - 20:
+            self.slots.popleft()
+
+    def value(self):
+        with self.lock:
+            self.expire(int(time.monotonic() / self.resolution))
+            return sum(count for _, count in self.slots) / self.window
+
+    def render(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge", f"{self.name} {self.value()}"]
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+        self.lock = threading.Lock()
+
+    def get_or_create(self, name, factory):
+        with self.lock:
+            if name not in self.metrics:
+                self.metrics[name] = factory()
+            return self.metrics[name]
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in list(self.metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+REGISTRY = Registry()
+
+def histogram(name, help, buckets=HOT_PATH_BUCKETS):
+    return REGISTRY.get_or_create(name, lambda: Histogram(name, help, buckets))
+
+def rate(name, help="", window=5.0):
+    """A per-second rate gauge named `name`; call .tick(n) as events happen."""
+    return REGISTRY.get_or_create(name, lambda: Rate(name, help or f"{name} over the last {window:g}s", window))
+
+HOT_PATHS = histogram("hot_path_duration_seconds", "Time spent in instrumented hot paths")
+
+class Timer:
+    __slots__ = ("path", "start")
+
+    def __init__(self, path):
+        self.path = path
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        HOT_PATHS.observe(time.perf_counter() - self.start, path=self.path)
+
+class NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+NULL_TIMER = NullTimer()
+
+def timer(path):
+    """Context manager recording how long its block takes under hot_path_duration_seconds{path=...}."""
+    return Timer(path) if ENABLED else NULL_TIMER
+
+def record_duration(path, seconds):
+    """Records a duration measured elsewhere (e.g. in a worker process, whose
+    own metrics are not exported) under hot_path_duration_seconds{path=...}."""
+    if ENABLED:
+        HOT_PATHS.observe(seconds, path=path)
+
+def timed(path):
+    """Decorator form of timer(); a no-op (the function itself) when instrumentation is off."""
+    def decorate(fn):
+        if not ENABLED:
+            return fn
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with Timer(path):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
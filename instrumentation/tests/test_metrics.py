@@ -0,0 +1,80 @@
+import sys
+import os
+
+# Add repository root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from instrumentation import metrics
+from instrumentation.metrics import Histogram, Rate, timer, timed, record_duration
+
+def test_histogram_render():
+    h = Histogram("test_seconds", "Test", (0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 5.0):
+        h.observe(value, path="a")
+    h.observe(0.01, path="b")
+    lines = h.render()
+    assert 'test_seconds_bucket{path="a",le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{path="a",le="1.0"} 3' in lines
+    assert 'test_seconds_bucket{path="a",le="+Inf"} 4' in lines
+    assert 'test_seconds_count{path="a"} 4' in lines
+    assert 'test_seconds_count{path="b"} 1' in lines
+
+def test_rate():
+    r = Rate("test_per_second", "Test", window=10.0)
+    for _ in range(50):
+        r.tick()
+    r.tick(50)
+    assert r.value() == 10.0
+
+def test_timers():
+    before = sum(metrics.HOT_PATHS.series.get((("path", "test.block"),), [[0]])[0])
+    with timer("test.block"):
+        pass
+
+    @timed("test.block")
+    def work(x):
+        return x * 2
+    assert work(21) == 42
+    record_duration("test.block", 0.5) # Measured elsewhere
+    assert sum(metrics.HOT_PATHS.series[(("path", "test.block"),)][0]) == before + 3
+
+def test_disabled_is_a_no_op():
+    enabled = metrics.ENABLED
+    metrics.ENABLED = False
+    try:
+        def work():
+            return 1
+        assert timed("test.disabled")(work) is work
+        assert timer("test.disabled") is metrics.NULL_TIMER
+        r = Rate("test_disabled", "Test")
+        r.tick()
+        assert r.value() == 0
+        record_duration("test.disabled", 1.0)
+        assert (("path", "test.disabled"),) not in metrics.HOT_PATHS.series
+    finally:
+        metrics.ENABLED = enabled
+
+def test_metrics_endpoint():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from instrumentation.web import instrument_app
+
+    app = FastAPI()
+    instrument_app(app)
+
+    @app.get("/items/{item_id}")
+    def get_item(item_id: int):
+        return {"id": item_id}
+
+    client = TestClient(app)
+    client.get("/items/1")
+    client.get("/items/2")
+    text = client.get("/metrics").text
+    assert 'http_request_duration_seconds_count{method="GET",route="/items/{item_id}",status="200"} 2' in text
+
+if __name__ == "__main__":
+    test_histogram_render()
+    test_rate()
+    test_timers()
+    test_disabled_is_a_no_op()
+    test_metrics_endpoint()
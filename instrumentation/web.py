@@ -0,0 +1,25 @@
+import time
+from fastapi import Request
+from fastapi.responses import PlainTextResponse
+from . import metrics
+
+def instrument_app(app):
+    """Adds request latency histograms and a GET /metrics endpoint (Prometheus
+    text format) to a FastAPI app. With instrumentation off only the
+    endpoint is added, reporting nothing."""
+    if metrics.ENABLED:
+        requests = metrics.histogram("http_request_duration_seconds", "HTTP request latency", metrics.REQUEST_BUCKETS)
+
+        @app.middleware("http")
+        async def record_latency(request: Request, call_next):
+            start = time.perf_counter()
+            response = await call_next(request)
+            # Label by route template (e.g. /replay/{name}) so paths with ids don't explode the series
+            route = request.scope.get("route")
+            requests.observe(time.perf_counter() - start, method=request.method,
+                             route=getattr(route, "path", "unmatched"), status=response.status_code)
+            return response
+
+    @app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+    def get_metrics():
+        return metrics.REGISTRY.render() if metrics.ENABLED else ""